@@ -0,0 +1,128 @@
+"""
+Admin page for facilitators, opened with ?admin=<key> when the server has
+BIAS_SIMULATOR_ADMIN_KEY set; without it there is no admin page.
+"""
+import os
+
+import streamlit as st
+
+from core.profiling import flame_rows, folded_stacks
+from ui_helpers import allocation_tracker, profile_store, query_param, session_cpu, session_memory, toggle
+
+ADMIN_KEY_ENV = "BIAS_SIMULATOR_ADMIN_KEY"
+
+# Width in characters of the longest bar in the flame view
+FLAME_WIDTH = 40
+
+
+def admin_requested():
+    key = os.environ.get(ADMIN_KEY_ENV)
+    return bool(key) and query_param("admin") == key
+
+
+def format_flame_rows(rows):
+    if not rows:
+        return ""
+    longest = max(seconds for _, _, seconds in rows)
+    lines = []
+    for depth, label, seconds in rows:
+        bar = "█" * max(1, round(FLAME_WIDTH * seconds / longest))
+        lines.append(f"{seconds * 1000:9.1f} ms {bar:<{FLAME_WIDTH}} {'  ' * depth}{label}")
+    return "\n".join(lines)
+
+
+def display_session_cpu():
+    st.subheader("Most Expensive Sessions")
+    tracker = session_cpu()
+    totals = tracker.totals()
+    st.caption(f"{totals['sessions']:,} sessions, {totals['reruns']:,} reruns, "
+               f"{totals['cpu_seconds']:,.1f} s CPU in total; {totals['slow_reruns']:,} reruns took longer than "
+               f"{tracker.slow_seconds * 1000:,.0f} ms (set BIAS_SIMULATOR_SLOW_RERUN_MS to change) "
+               f"and were logged with their state sizes.")
+    n = st.number_input("Sessions to show", min_value=1, max_value=100, value=10)
+    rows = tracker.top(int(n))
+    if not rows:
+        st.info("No reruns recorded yet.")
+        return
+    st.table([{
+        "Session": row["session_id"][:8],
+        "Reruns": row["reruns"],
+        "CPU (s)": round(row["cpu_seconds"], 2),
+        "CPU per rerun (ms)": round(row["cpu_ms_per_rerun"], 1),
+        "Slowest rerun (ms)": round(row["slowest_ms"], 1),
+        "Slowest stage": row["slowest_stage"],
+        "Slow reruns": row["slow_reruns"],
+        "Current stage": row["stage"]
+    } for row in rows])
+
+
+def display_profiles():
+    st.subheader("Rerun Profiles")
+    store = profile_store()
+
+    store.profile_all = toggle("Profile every session's reruns", value=store.profile_all, key="admin_profile_all")
+    st.caption(f"A single session can be profiled by adding ?profile=1 to its URL. "
+               f"The newest {store.retention} profiles of each stage are kept in {store.directory}.")
+
+    stages = store.stages()
+    if not stages:
+        st.info("No profiles saved yet.")
+        return
+
+    stage = st.selectbox("Stage", list(stages), format_func=lambda name: f"{name} ({stages[name]} reruns)")
+    stats = store.load(stage)
+    if stats is None:
+        st.info("This stage's profiles were replaced while loading; try again.")
+        return
+    min_percent = st.slider("Hide calls below (% of total time)", 0.1, 10.0, 1.0, 0.1)
+
+    st.markdown(f"Combined call tree of the last {stages[stage]} reruns of **{stage}**:")
+    st.code(format_flame_rows(flame_rows(stats, min_percent / 100)), language=None)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("Download folded stacks", folded_stacks(stats), file_name=f"{stage}.folded",
+                           help="For flamegraph.pl or speedscope")
+    with col2:
+        profile = store.latest_profile(stage)
+        if profile is not None:
+            st.download_button("Download latest profile", profile, file_name=f"{stage}.prof",
+                               help="pstats format, for snakeviz or python -m pstats")
+
+
+def display_allocations():
+    st.subheader("Memory Retained by Stage")
+    tracker = allocation_tracker()
+    if tracker is None:
+        st.info("Allocation tracking is off; set BIAS_SIMULATOR_ALLOCATION_LOG to a log file to turn it on.")
+        return
+    totals = tracker.totals()
+    if not totals:
+        st.info("No stages tracked yet.")
+        return
+    st.table([{"Stage function": name, "Calls": calls, "Retained (KiB)": round(size / 1024, 1)}
+              for name, calls, size in totals])
+    st.caption("Allocation sites for each call are in the allocation log.")
+
+
+def display_session_memory():
+    st.subheader("Session Memory")
+    stats = session_memory().stats()
+    st.table([{
+        "Sessions": stats["sessions"],
+        "Offloaded now": stats["offloaded_sessions"],
+        "Resident (MiB)": round(stats["resident_bytes"] / 2 ** 20, 1),
+        "Budget (MiB)": round(stats["budget_bytes"] / 2 ** 20, 1),
+        "Offloads": stats["offloads"],
+        "Reloads": stats["reloads"]
+    }])
+    st.caption("Completed work of idle sessions is offloaded to the database while resident memory is over budget "
+               "(BIAS_SIMULATOR_MEMORY_BUDGET_MB).")
+
+
+def display_admin_page():
+    st.title("🧠 Cognitive Bias Simulator: Admin")
+    display_session_cpu()
+    display_session_memory()
+    display_profiles()
+    display_allocations()
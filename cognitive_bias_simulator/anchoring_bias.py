@@ -1,138 +1,42 @@
 import streamlit as st
-import random
 import pandas as pd
-import matplotlib.pyplot as plt
 import seaborn as sns
-
-# Define the tasks for anchoring bias experiment
-tasks = [
-    {
-        "id": "budapest",
-        "name": "Population of Budapest",
-        "question": "What is the population of Budapest, Hungary?",
-        "actual_value": 1756000,  # Approximate population
-        "unit": "people",
-        "higher_lower_text": "The actual population is {} than the random number."
-    },
-    {
-        "id": "un_africa",
-        "name": "African Nations in UN",
-        "question": "What percentage of United Nations member states are African nations?",
-        "actual_value": 28,  # Approximate percentage
-        "unit": "%",
-        "higher_lower_text": "The actual percentage is {} than the random number."
-    },
-    {
-        "id": "dev_salary",
-        "name": "Software Engineer Salary",
-        "question": "What is the average annual salary of a software engineer in Germany?",
-        "actual_value": 65000,  # Approximate salary in EUR
-        "unit": "€",
-        "higher_lower_text": "The actual salary is {} than the random number."
-    },
-    {
-        "id": "earth_sun",
-        "name": "Earth-Sun Distance",
-        "question": "What is the average distance between Earth and the Sun in kilometers?",
-        "actual_value": 149600000,  # Approximate distance in km
-        "unit": "km",
-        "higher_lower_text": "The actual distance is {} than the random number."
-    },
-    {
-        "id": "amazon_length",
-        "name": "Length of Amazon River",
-        "question": "What is the length of the Amazon River in kilometers?",
-        "actual_value": 6400,  # Approximate length in km
-        "unit": "km",
-        "higher_lower_text": "The actual length is {} than the random number."
-    }
-]
-
-
-tasks_dict = {task["id"]: task for task in tasks}
+from core import anchoring
+from core.flow import Stage, anchoring_flow, go_to_main_menu
+from core.catalogs import tasks, tasks_dict
+from ui_helpers import fragment, persist_result, results_table, run_stage_view, show_chart, show_cohort_percentile, show_section
 
 def init_anchoring_bias_state():
-    if 'anchor' not in st.session_state:
-        st.session_state.anchor = None
-    if 'current_task' not in st.session_state:
-        st.session_state.current_task = None
-    if 'results' not in st.session_state:
-        st.session_state.results = []
-    if 'completed_tasks' not in st.session_state:
-        st.session_state.completed_tasks = set()
-    if 'higher_lower_guess' not in st.session_state:
-        st.session_state.higher_lower_guess = None
-    if 'guess_correct' not in st.session_state:
-        st.session_state.guess_correct = None
+    anchoring.init_state(st.session_state)
 
 def reset_anchoring_experiment():
-    st.session_state.anchor = None
-    st.session_state.current_task = None
-    st.session_state.results = []
-    st.session_state.completed_tasks = set()
-    st.session_state.higher_lower_guess = None
-    st.session_state.guess_correct = None
+    anchoring.reset_state(st.session_state)
 
 def go_to_task_selection():
-    st.session_state.stage = 'task_selection'
-    st.session_state.anchor = None
-    st.session_state.current_task = None
-    st.session_state.higher_lower_guess = None
-    st.session_state.guess_correct = None
+    anchoring.go_to_task_selection(st.session_state)
 
 def retry_current_task():
-    st.session_state.stage = 'generate_anchor'
-    st.session_state.anchor = None
-    st.session_state.higher_lower_guess = None
-    st.session_state.guess_correct = None
+    anchoring.retry_current_task(st.session_state)
 
 def next_anchoring_task():
-    # Find a task that hasn't been completed yet
-    available_tasks = [task["id"] for task in tasks if task["id"] not in st.session_state.completed_tasks]
-    if available_tasks:
-        st.session_state.current_task = available_tasks[0]
-        st.session_state.stage = 'generate_anchor'
-        st.session_state.anchor = None
-        st.session_state.higher_lower_guess = None
-        st.session_state.guess_correct = None
-    else:
-        st.session_state.stage = 'task_selection'
-        st.session_state.current_task = None
-        st.session_state.higher_lower_guess = None
-        st.session_state.guess_correct = None
+    anchoring.next_task(st.session_state)
 
 def display_anchoring_intro():
     st.subheader("Anchoring Bias Experiment")
     
-    st.markdown("""
-    ## Welcome to the Anchoring Bias Simulator!
-    
-    **What is anchoring bias?**
-    
-    Anchoring bias is a cognitive bias where people rely too heavily on the first piece of information they encounter (the "random number") 
-    when making decisions or estimates.
-    
-    **How this experiment works:**
-    1. You'll be given a random number
-    2. You'll guess if the actual value is higher or lower than this random number
-    3. You'll make your best estimate of the actual value
-    4. We'll show you how the random number might have influenced your estimate
-    
-    Let's see how susceptible you are to anchoring bias!
-    """)
+    show_section("anchoring_intro")
     
     
     col1, col2 = st.columns(2)
     
     with col1:
         if st.button("Start Experiment"):
-            st.session_state.stage = 'task_selection'
+            anchoring_flow.fire(st.session_state, "start")
             st.rerun()
     
     with col2:
         if st.button("Back to Main Menu"):
-            st.session_state.stage = "intro"
-            st.session_state.bias_type = None
+            go_to_main_menu(st.session_state)
             st.rerun()
 
 def display_task_selection():
@@ -148,22 +52,20 @@ def display_task_selection():
             task_id = task["id"]
             completed = "✅ " if task_id in st.session_state.completed_tasks else ""
             if st.button(f"{completed}{task['name']}", key=f"task_{task_id}"):
-                st.session_state.current_task = task_id
-                st.session_state.stage = 'generate_anchor'
+                anchoring.select_task(st.session_state, task_id)
                 st.rerun()
     
     # Show results button if at least one task has been completed
     if st.session_state.completed_tasks:
         st.markdown("---")
         if st.button("View All Results"):
-            st.session_state.stage = 'all_results'
+            anchoring_flow.fire(st.session_state, "view_results")
             st.rerun()
     
     
     st.markdown("---")
     if st.button("Back to Main Menu"):
-        st.session_state.stage = "intro"
-        st.session_state.bias_type = None
+        go_to_main_menu(st.session_state)
         st.rerun()
 
 def display_generate_anchor():
@@ -177,10 +79,7 @@ def display_generate_anchor():
     
     # Generate a random anchor that's significantly different from the actual value
     if st.button("Generate Random Number"):
-        lower_bound = int(current_task['actual_value'] * 0.3)
-        upper_bound = int(current_task['actual_value'] * 2.5)
-        st.session_state.anchor = random.randint(lower_bound, upper_bound)
-        st.session_state.stage = 'show_anchor'
+        anchoring.generate_anchor(st.session_state)
         st.rerun()
     
     
@@ -202,18 +101,12 @@ def display_show_anchor():
     
     with col1:
         if st.button("HIGHER than the random number"):
-            st.session_state.higher_lower_guess = "higher"
-            actual_comparison = "higher" if current_task['actual_value'] > st.session_state.anchor else "lower"
-            st.session_state.guess_correct = (st.session_state.higher_lower_guess == actual_comparison)
-            st.session_state.stage = 'estimate'
+            anchoring.submit_guess(st.session_state, "higher")
             st.rerun()
     
     with col2:
         if st.button("LOWER than the random number"):
-            st.session_state.higher_lower_guess = "lower"
-            actual_comparison = "higher" if current_task['actual_value'] > st.session_state.anchor else "lower"
-            st.session_state.guess_correct = (st.session_state.higher_lower_guess == actual_comparison)
-            st.session_state.stage = 'estimate'
+            anchoring.submit_guess(st.session_state, "lower")
             st.rerun()
     
     
@@ -230,7 +123,7 @@ def display_show_guess_result():
     st.markdown(f"### Your random number: {st.session_state.anchor:,}")
     
     
-    actual_comparison = "higher" if current_task['actual_value'] > st.session_state.anchor else "lower"
+    actual_comparison = anchoring.actual_comparison(current_task['actual_value'], st.session_state.anchor)
     
     if st.session_state.guess_correct:
         st.success(f"✅ You were correct! The actual value is {actual_comparison} than the random number.")
@@ -238,7 +131,7 @@ def display_show_guess_result():
         st.error(f"❌ Actually, the true value is {actual_comparison} than the random number.")
     
     if st.button("Continue to Estimation"):
-        st.session_state.stage = 'estimate'
+        anchoring_flow.fire(st.session_state, "continue")
         st.rerun()
     
     
@@ -260,44 +153,15 @@ def display_estimate():
     user_estimate = st.number_input(
         f"Your estimate ({current_task['unit']})",
         min_value=0,
-        max_value=int(current_task['actual_value'] * 5),
+        max_value=int(current_task['actual_value'] * anchoring.MAX_ESTIMATE_FACTOR),
         step=1,
         format="%d"
     )
     
     if st.button("Submit Estimate"):
-        # Calculate the percentage difference from actual value
-        percentage_diff = abs(user_estimate - current_task['actual_value']) / current_task['actual_value'] * 100
-        
-        # Calculate the anchor influence (how close the estimate is to the anchor vs. actual value)
-        if st.session_state.anchor != current_task['actual_value']:  
-            anchor_pull = abs(user_estimate - current_task['actual_value']) / abs(st.session_state.anchor - current_task['actual_value'])
-            anchor_pull = min(anchor_pull, 1.0)  
-        else:
-            anchor_pull = 0
-            
-        
-        st.session_state.results = [r for r in st.session_state.results if r["task_id"] != current_task["id"]]
-        
-        # Add the new result
-        st.session_state.results.append({
-            "task_id": current_task['id'],
-            "task": current_task['name'],
-            "anchor": st.session_state.anchor,
-            "actual_value": current_task['actual_value'],
-            "estimate": user_estimate,
-            "percentage_diff": percentage_diff,
-            "anchor_pull": anchor_pull,
-            "unit": current_task['unit'],
-            "higher_lower_guess": st.session_state.higher_lower_guess,
-            "guess_correct": st.session_state.guess_correct
-        })
-        
-        
-        st.session_state.completed_tasks.add(current_task['id'])
-        
-        
-        st.session_state.stage = 'task_result'
+        result = anchoring.submit_estimate(st.session_state, user_estimate)
+        persist_result("anchoring", result)
+        anchoring_results_table(st.session_state.results)
         st.rerun()
     
     
@@ -309,7 +173,7 @@ def display_task_result():
     current_task = tasks_dict[st.session_state.current_task]
     
     
-    result = next((r for r in st.session_state.results if r["task_id"] == current_task["id"]), None)
+    result = anchoring.find_result(st.session_state, current_task["id"])
     
     if not result:
         st.error("Something went wrong. Result not found.")
@@ -339,48 +203,26 @@ def display_task_result():
             st.markdown(f"**Higher/Lower Guess:** {result.get('higher_lower_guess', 'Not provided')} (was {guess_result})")
             
             
-            error_percentage = abs(result['estimate'] - result['actual_value']) / result['actual_value'] * 100
+            error_percentage = anchoring.percentage_diff(result['estimate'], result['actual_value'])
             
             st.markdown(f"### Estimation Error: {error_percentage:.1f}%")
             
             
-            distance_to_anchor = abs(result['estimate'] - result['anchor'])
-            distance_to_actual = abs(result['estimate'] - result['actual_value'])
-            
+            effect = anchoring.classify_anchoring_effect(result['anchor'], result['estimate'], result['actual_value'])
             
-            if distance_to_anchor < distance_to_actual:
+            if effect == "strong":
                 st.markdown("**Strong Anchoring Effect Detected**: Your estimate was closer to the random number than to the actual value.")
-            elif (result['anchor'] < result['actual_value'] and result['estimate'] < result['actual_value']) or \
-                 (result['anchor'] > result['actual_value'] and result['estimate'] > result['actual_value']):
+            elif effect == "moderate":
                 st.markdown("**Moderate Anchoring Effect Detected**: Your estimate was biased in the direction of the random number.")
             else:
                 st.markdown("**No Clear Anchoring Effect**: Your estimate did not follow the direction of the random number.")
+            
+            st.markdown("### Compared with Other Participants")
+            show_cohort_percentile(("anchor_pull", current_task["id"]), result["anchor_pull"], "anchor pull on this task")
         
         with col2:
             st.markdown("### Visualization")
-            
-            
-            fig, ax = plt.subplots(figsize=(10, 6))
-            
-            
-            labels = ['Random Number', 'Your Estimate', 'Actual Value']
-            values = [result['anchor'], result['estimate'], result['actual_value']]
-            colors = ['#ff9999', '#66b3ff', '#99ff99']
-            
-            
-            bars = ax.bar(labels, values, color=colors)
-            ax.set_title(current_task['name'])
-            ax.set_ylabel(result['unit'])
-            
-            
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height + 0.05 * max(values),
-                        f'{int(height):,}',
-                        ha='center', va='bottom', rotation=0)
-            
-            plt.tight_layout()
-            st.pyplot(fig)
+            show_chart("task_result", result)
         
         st.markdown("""
         ### Understanding Anchoring Bias
@@ -413,147 +255,126 @@ def display_task_result():
                 go_to_task_selection()
                 st.rerun()
 
+# Columns of the summary table, in display order
+display_columns = ['task', 'anchor', 'higher_lower_guess', 'estimate', 'actual_value', 'percentage_diff']
+
+def format_result_row(result):
+    """Format one result for the summary table."""
+    row = dict(result)
+    row['anchor'] = f"{int(result['anchor']):,} {result['unit']}"
+    row['actual_value'] = f"{int(result['actual_value']):,} {result['unit']}"
+    row['estimate'] = f"{int(result['estimate']):,} {result['unit']}"
+    row['percentage_diff'] = f"{result['percentage_diff']:.1f}%"
+    
+    if 'higher_lower_guess' in result and 'guess_correct' in result:
+        guess_result = "✅" if result['guess_correct'] else "❌"
+        row['higher_lower_guess'] = f"{result['higher_lower_guess']} {guess_result}"
+    else:
+        row['higher_lower_guess'] = "N/A"
+    
+    return {column: row[column] for column in display_columns if column in row}
+
+def anchoring_results_table(results):
+    """The session's anchoring results table; only results added since the last rerun are formatted."""
+    return results_table("anchoring", results, format_row=format_result_row)
+
+@fragment
+def display_results_summary(results):
+    display_df = anchoring_results_table(results).display_frame()
+    
+    st.markdown("### Summary of Your Estimates")
+    st.table(display_df)
+
+@fragment
+def display_results_visualization(results):
+    table = anchoring_results_table(results)
+    
+    st.markdown("### Visualization of Anchoring Effect")
+    
+    
+    show_chart("anchoring_results", table.rows)
+
+@fragment
+def display_results_analysis(results):
+    results_df = anchoring_results_table(results).frame()
+    
+    st.markdown("### Analysis of Anchoring Effect")
+    
+    avg_error = results_df['percentage_diff'].mean()
+    
+    strong_effect_count, moderate_effect_count, no_effect_count = anchoring.count_anchoring_effects(results)
+    
+    total_tasks = len(results_df)
+    strong_percent = (strong_effect_count / total_tasks) * 100
+    moderate_percent = (moderate_effect_count / total_tasks) * 100
+    no_effect_percent = (no_effect_count / total_tasks) * 100
+    
+    # Create a pie chart of anchoring effects
+    show_chart("anchoring_effects", strong_effect_count, moderate_effect_count, no_effect_count, cached=True)
+    
+    # Calculate higher/lower guess accuracy
+    if 'guess_correct' in results_df.columns:
+        correct_guesses = results_df['guess_correct'].sum()
+        guess_accuracy = (correct_guesses / len(results_df)) * 100
+        st.markdown(f"**Higher/Lower Guess Accuracy:** {guess_accuracy:.1f}%")
+    
+    st.markdown(f"**Average Estimation Error:** {avg_error:.1f}%")
+    st.markdown(f"**Strong Anchoring Effect:** {strong_percent:.1f}% of tasks (estimate closer to anchor than actual value)")
+    st.markdown(f"**Moderate Anchoring Effect:** {moderate_percent:.1f}% of tasks (estimate biased in same direction as anchor)")
+    st.markdown(f"**No Clear Anchoring Effect:** {no_effect_percent:.1f}% of tasks")
+    
+    # Interpretation
+    st.markdown("### What This Means")
+    
+    if strong_percent + moderate_percent > 75:
+        st.markdown("""
+        **Strong Anchoring Effect Detected**
+        
+        Your estimates were strongly influenced by the random number values. This is a common cognitive bias 
+        that affects most people, even when they're aware of it.
+        """)
+    elif strong_percent + moderate_percent > 50:
+        st.markdown("""
+        **Moderate Anchoring Effect Detected**
+        
+        Your estimates show some influence from the random number values, though you were able to 
+        resist the effect in some cases.
+        """)
+    else:
+        st.markdown("""
+        **Minimal Anchoring Effect Detected**
+        
+        You showed resistance to the anchoring effect in most tasks. This is uncommon and suggests 
+        you may be less susceptible to this particular cognitive bias.
+        """)
+
+@fragment
+def display_all_results_navigation():
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        if st.button("Back to Task Selection"):
+            go_to_task_selection()
+            st.rerun()
+    
+    with col2:
+        if st.button("Start Over"):
+            reset_anchoring_experiment()
+            go_to_main_menu(st.session_state, clear_bias=False)
+            st.rerun()
+
 def display_all_results():
     st.markdown("## All Results")
     
     if not st.session_state.results:
         st.warning("You haven't completed any tasks yet.")
     else:
+        # Each section is a fragment, so interacting with one only reruns that section
+        results = st.session_state.results
         
-        results_df = pd.DataFrame(st.session_state.results)
-        
-        
-        st.markdown("### Summary of Your Estimates")
-        
-        # Format the table 
-        display_df = results_df.copy()
-        for i, row in display_df.iterrows():
-            display_df.loc[i, 'anchor'] = f"{int(row['anchor']):,} {row['unit']}"
-            display_df.loc[i, 'actual_value'] = f"{int(row['actual_value']):,} {row['unit']}"
-            display_df.loc[i, 'estimate'] = f"{int(row['estimate']):,} {row['unit']}"
-            display_df.loc[i, 'percentage_diff'] = f"{row['percentage_diff']:.1f}%"
-            
-            
-            if 'higher_lower_guess' in row and 'guess_correct' in row:
-                guess_result = "✅" if row['guess_correct'] else "❌"
-                display_df.loc[i, 'higher_lower_guess'] = f"{row['higher_lower_guess']} {guess_result}"
-            else:
-                display_df.loc[i, 'higher_lower_guess'] = "N/A"
-        
-        
-        display_columns = ['task', 'anchor', 'higher_lower_guess', 'estimate', 'actual_value', 'percentage_diff']
-        available_columns = [col for col in display_columns if col in display_df.columns]
-        
-        st.table(display_df[available_columns])
-        
-        
-        st.markdown("### Visualization of Anchoring Effect")
-        
-        
-        num_tasks = len(results_df)
-        fig, axes = plt.subplots(1, num_tasks, figsize=(5*num_tasks, 5))
-        
-        
-        if num_tasks == 1:
-            axes = [axes]
-            
-        for i, (_, result) in enumerate(results_df.iterrows()):
-            # Create data for the plot
-            labels = ['Random Number', 'Your Estimate', 'Actual Value']
-            values = [result['anchor'], result['estimate'], result['actual_value']]
-            colors = ['#ff9999', '#66b3ff', '#99ff99']
-            
-            
-            bars = axes[i].bar(labels, values, color=colors)
-            axes[i].set_title(result['task'])
-            axes[i].set_ylabel(result['unit'])
-            
-            for bar in bars:
-                height = bar.get_height()
-                axes[i].text(bar.get_x() + bar.get_width()/2., height + 0.05 * max(values),
-                        f'{int(height):,}',
-                        ha='center', va='bottom', rotation=0)
-        
-        plt.tight_layout()
-        st.pyplot(fig)
-                
-        st.markdown("### Analysis of Anchoring Effect")
-        
-        avg_error = results_df['percentage_diff'].mean()
-        
-        strong_effect_count = 0
-        moderate_effect_count = 0
-        no_effect_count = 0
-        
-        for _, row in results_df.iterrows():
-            distance_to_anchor = abs(row['estimate'] - row['anchor'])
-            distance_to_actual = abs(row['estimate'] - row['actual_value'])
-            
-            if distance_to_anchor < distance_to_actual:
-                strong_effect_count += 1
-            elif (row['anchor'] < row['actual_value'] and row['estimate'] < row['actual_value']) or \
-                 (row['anchor'] > row['actual_value'] and row['estimate'] > row['actual_value']):
-                moderate_effect_count += 1
-            else:
-                no_effect_count += 1
-        
-        total_tasks = len(results_df)
-        strong_percent = (strong_effect_count / total_tasks) * 100
-        moderate_percent = (moderate_effect_count / total_tasks) * 100
-        no_effect_percent = (no_effect_count / total_tasks) * 100
-        
-        # Create a pie chart of anchoring effects
-        fig, ax = plt.subplots(figsize=(8, 6))
-        effect_labels = ['Strong Effect', 'Moderate Effect', 'No Clear Effect']
-        effect_sizes = [strong_effect_count, moderate_effect_count, no_effect_count]
-        effect_colors = ['#ff6666', '#ffcc66', '#66cc66']
-        
-
-        if sum(effect_sizes) > 0:
-            effect_labels = [f"{label} ({size/sum(effect_sizes)*100:.1f}%)" for label, size in zip(effect_labels, effect_sizes)]
-            
-            ax.pie(effect_sizes, labels=effect_labels, colors=effect_colors, autopct='%1.1f%%',
-                   startangle=90, shadow=True)
-            ax.axis('equal')  
-            plt.title('Types of Anchoring Effects Observed')
-            
-            st.pyplot(fig)
-        
-        # Calculate higher/lower guess accuracy
-        if 'guess_correct' in results_df.columns:
-            correct_guesses = results_df['guess_correct'].sum()
-            guess_accuracy = (correct_guesses / len(results_df)) * 100
-            st.markdown(f"**Higher/Lower Guess Accuracy:** {guess_accuracy:.1f}%")
-        
-        st.markdown(f"**Average Estimation Error:** {avg_error:.1f}%")
-        st.markdown(f"**Strong Anchoring Effect:** {strong_percent:.1f}% of tasks (estimate closer to anchor than actual value)")
-        st.markdown(f"**Moderate Anchoring Effect:** {moderate_percent:.1f}% of tasks (estimate biased in same direction as anchor)")
-        st.markdown(f"**No Clear Anchoring Effect:** {no_effect_percent:.1f}% of tasks")
-        
-        # Interpretation
-        st.markdown("### What This Means")
-        
-        if strong_percent + moderate_percent > 75:
-            st.markdown("""
-            **Strong Anchoring Effect Detected**
-            
-            Your estimates were strongly influenced by the random number values. This is a common cognitive bias 
-            that affects most people, even when they're aware of it.
-            """)
-        elif strong_percent + moderate_percent > 50:
-            st.markdown("""
-            **Moderate Anchoring Effect Detected**
-            
-            Your estimates show some influence from the random number values, though you were able to 
-            resist the effect in some cases.
-            """)
-        else:
-            st.markdown("""
-            **Minimal Anchoring Effect Detected**
-            
-            You showed resistance to the anchoring effect in most tasks. This is uncommon and suggests 
-            you may be less susceptible to this particular cognitive bias.
-            """)
+        display_results_summary(results)
+        display_results_visualization(results)
+        display_results_analysis(results)
         
         st.markdown("""
         ### Understanding Anchoring Bias
@@ -574,36 +395,24 @@ def display_all_results():
         - Seek information from diverse sources
         """)
         
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            if st.button("Back to Task Selection"):
-                go_to_task_selection()
-                st.rerun()
-        
-        with col2:
-            if st.button("Start Over"):
-                reset_anchoring_experiment()
-                st.session_state.stage = "intro"
-                st.rerun()
+        display_all_results_navigation()
+
+# Page shown for each stage of the anchoring flow
+stage_views = {
+    Stage.BIAS_INTRO: display_anchoring_intro,
+    Stage.TASK_SELECTION: display_task_selection,
+    Stage.GENERATE_ANCHOR: display_generate_anchor,
+    Stage.SHOW_ANCHOR: display_show_anchor,
+    Stage.SHOW_GUESS_RESULT: display_show_guess_result,
+    Stage.ESTIMATE: display_estimate,
+    Stage.TASK_RESULT: display_task_result,
+    Stage.ALL_RESULTS: display_all_results
+}
 
 def run_anchoring_bias_simulator():
     init_anchoring_bias_state()
     
     # Run the appropriate function based on the current stage
-    if st.session_state.stage == "bias_intro" and st.session_state.bias_type == "anchoring":
-        display_anchoring_intro()
-    elif st.session_state.stage == "task_selection":
-        display_task_selection()
-    elif st.session_state.stage == "generate_anchor":
-        display_generate_anchor()
-    elif st.session_state.stage == "show_anchor":
-        display_show_anchor()
-    elif st.session_state.stage == "show_guess_result":
-        display_show_guess_result()
-    elif st.session_state.stage == "estimate":
-        display_estimate()
-    elif st.session_state.stage == "task_result":
-        display_task_result()
-    elif st.session_state.stage == "all_results":
-        display_all_results()
\ No newline at end of file
+    view = stage_views.get(st.session_state.stage)
+    if view is not None:
+        run_stage_view(view)
@@ -0,0 +1,450 @@
+"""
+JSON HTTP API for running the experiments without the Streamlit frontend.
+
+`app` is a plain ASGI application, so any ASGI server can host it:
+
+    uvicorn api:app
+
+The API is stateless: clients keep track of the anchor or frame they were
+given and send it back with the response, and the server scores it with the
+same `core` functions the Streamlit app uses.
+"""
+import asyncio
+import functools
+import json
+import math
+import uuid
+
+import warmup
+from core import anchor_design, anchoring, cohort, confirmation, framing, sketch
+from core.results_store import ResultsStore, configured_path
+from core.write_behind import WriteBehindQueue
+from core.catalogs import classical_findings, frame_types, framing_dicts, framing_scenarios, scenarios, \
+    scenarios_dict, tasks, tasks_dict
+
+# Larger request bodies are rejected before they are parsed
+MAX_BODY_BYTES = 64 * 1024
+
+RATING_RANGE = (1, 10)
+RISK_OPTIONS = ("A", "B")
+
+# The API doesn't render charts, so it only needs the catalog lookups warmed
+API_WARMUP_STEPS = ("catalogs",)
+
+JSON_HEADERS = [(b"content-type", b"application/json")]
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def encode(data):
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+# Catalog fields hidden from participants until they have answered
+def public_task(task):
+    return {key: value for key, value in task.items() if key != "actual_value"}
+
+
+def public_scenario(scenario):
+    return {
+        "id": scenario["id"],
+        "title": scenario["title"],
+        "description": scenario["description"],
+        "stance_question": scenario["stance_question"],
+        "stance_options": scenario["stance_options"],
+        "hypothesis": scenario["hypothesis"],
+        # Evidence in the same fixed order the Streamlit app shows it
+        "evidence": [{"id": evidence["id"], "text": evidence["text"]}
+                     for evidence in confirmation.get_shuffled_evidence(scenario["id"])]
+    }
+
+
+def public_framing_scenario(scenario):
+    return {"id": scenario["id"], "title": scenario["title"], "description": scenario["description"]}
+
+
+# The catalogs never change while the server runs, so their responses are encoded once
+CATALOG_RESPONSES = {
+    "/anchoring/tasks": encode({"tasks": [public_task(task) for task in tasks]}),
+    "/anchoring/designs": encode({"designs": anchor_design.DESIGNS, "default": anchor_design.DEFAULT_DESIGN}),
+    "/confirmation/scenarios": encode({"scenarios": [public_scenario(scenario) for scenario in scenarios]}),
+    "/framing/scenarios": encode({
+        experiment_type: [public_framing_scenario(scenario) for scenario in experiment_scenarios]
+        for experiment_type, experiment_scenarios in framing_scenarios.items()
+    }),
+    "/health": encode({"status": "ok"})
+}
+
+
+def require(payload, field, kind=None):
+    if field not in payload:
+        raise ApiError(400, f"Missing field '{field}'")
+    value = payload[field]
+    # bool is an int subclass, but true/false is never a valid number here
+    if kind is not None and (not isinstance(value, kind) or isinstance(value, bool)):
+        raise ApiError(400, f"Field '{field}' has the wrong type")
+    if isinstance(value, (int, float)) and not is_finite(value):
+        raise ApiError(400, f"Field '{field}' must be a finite number")
+    return value
+
+
+def is_finite(value):
+    try:
+        return math.isfinite(value)
+    except OverflowError:
+        # An integer too large for a float
+        return False
+
+
+def is_number(value):
+    """A finite int or float that isn't a bool."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and is_finite(value)
+
+
+def parse_finite_float(text):
+    """json.loads parse_float hook; 1e400 would otherwise become inf."""
+    value = float(text)
+    if not math.isfinite(value):
+        raise ValueError(f"Number out of range: {text}")
+    return value
+
+
+def reject_constant(name):
+    """json.loads parse_constant hook, refusing NaN, Infinity and -Infinity."""
+    raise ValueError(f"Invalid number: {name}")
+
+
+def lookup(catalog, key, what):
+    if key not in catalog:
+        raise ApiError(404, f"Unknown {what}: {key}")
+    return catalog[key]
+
+
+# Write-behind queue for submitted results, started with the server when a results database is configured
+results_writer = None
+
+
+def start_results_writer():
+    global results_writer
+    path = configured_path()
+    if path is not None and results_writer is None:
+        store = ResultsStore(path)
+        cohort.load_results(store)
+        sketch.load(store)
+        # Sketches are saved with every batch, so a crash can't leave them behind the stored results
+        results_writer = WriteBehindQueue(store, on_batch=functools.partial(sketch.save, store)).start()
+
+
+def stop_results_writer():
+    global results_writer
+    if results_writer is not None:
+        results_writer.close()
+        sketch.save(results_writer.store)
+        results_writer = None
+
+
+def persist(bias, payload, result):
+    cohort.record_result(bias, result)
+    if results_writer is not None:
+        # Anonymous results each get a session of their own, so they aren't taken for one participant's retries
+        participant_id = payload.get("participant_id")
+        session_id = str(participant_id) if participant_id is not None else f"api-{uuid.uuid4().hex}"
+        results_writer.put(session_id, bias, result)
+
+
+def anchor_design_from(payload):
+    design = payload.get("design", anchor_design.DEFAULT_DESIGN)
+    if design not in anchor_design.DESIGNS:
+        raise ApiError(400, f"Unknown anchor design: {design}")
+    return design
+
+
+def create_anchor(payload):
+    task = lookup(tasks_dict, require(payload, "task_id", str), "task")
+    design = anchor_design_from(payload)
+    return {"task_id": task["id"], "design": design, "anchor": anchor_design.generate_anchor(task, design)}
+
+
+def submit_anchoring_result(payload):
+    task = lookup(tasks_dict, require(payload, "task_id", str), "task")
+    anchor = require(payload, "anchor", (int, float))
+    estimate = require(payload, "estimate", (int, float))
+    # The same ranges the app's anchors and estimate input are limited to, so
+    # one made-up response can't dominate the cohort's slope or percentiles
+    table = anchor_design.design_table(task["actual_value"])
+    if not table["lower_bound"] <= anchor <= table["upper_bound"]:
+        raise ApiError(400, f"Field 'anchor' must be from {table['lower_bound']} to {table['upper_bound']}")
+    max_estimate = task["actual_value"] * anchoring.MAX_ESTIMATE_FACTOR
+    if not 0 <= estimate <= max_estimate:
+        raise ApiError(400, f"Field 'estimate' must be from 0 to {max_estimate:g}")
+
+    guess = payload.get("higher_lower_guess")
+    guess_correct = None
+    if guess is not None:
+        if guess not in ("higher", "lower"):
+            raise ApiError(400, "Field 'higher_lower_guess' must be 'higher' or 'lower'")
+        guess_correct = guess == anchoring.actual_comparison(task["actual_value"], anchor)
+
+    design = anchor_design_from(payload)
+    result = anchoring.score_estimate(task, anchor, estimate, guess, guess_correct, design)
+    result["anchoring_effect"] = anchoring.classify_anchoring_effect(anchor, estimate, task["actual_value"])
+    anchor_design.record_observation(task["id"], task["actual_value"], anchor, estimate)
+    persist("anchoring", payload, result)
+    return result
+
+
+def submit_confirmation_result(payload):
+    scenario = lookup(scenarios_dict, require(payload, "scenario_id", str), "scenario")
+    stance = require(payload, "stance", str)
+    if stance not in scenario["stance_options"]:
+        raise ApiError(400, f"Unknown stance: {stance}")
+    stance_strength = payload.get("stance_strength")
+    if stance_strength is not None and (not isinstance(stance_strength, int) or isinstance(stance_strength, bool)
+                                        or not RATING_RANGE[0] <= stance_strength <= RATING_RANGE[1]):
+        raise ApiError(400, "Field 'stance_strength' must be an integer from 1 to 10")
+
+    ratings = require(payload, "ratings", dict)
+    evidence_ids = {evidence["id"] for evidence in scenario["evidence"]}
+    for evidence_id, rating in ratings.items():
+        if evidence_id not in evidence_ids:
+            raise ApiError(400, f"Unknown evidence: {evidence_id}")
+        if not isinstance(rating, int) or isinstance(rating, bool) or \
+                not RATING_RANGE[0] <= rating <= RATING_RANGE[1]:
+            raise ApiError(400, f"Rating for '{evidence_id}' must be an integer from 1 to 10")
+    # A score from some of the evidence isn't comparable with the cohort's
+    missing = sorted(evidence_ids - set(ratings))
+    if missing:
+        raise ApiError(400, f"Missing ratings for evidence: {', '.join(missing)}")
+
+    evidence_ratings = {}
+    confirmation.update_evidence_ratings(evidence_ratings, scenario["id"], stance, ratings)
+    score = confirmation.confirming_bias_score(evidence_ratings, scenario["id"])
+    result = confirmation.make_scenario_result(scenario["id"], stance, stance_strength, score,
+                                               ratings=ratings)
+    persist("confirmation", payload, result)
+    result = dict(result)
+    result["evidence_types"] = {evidence_id: evidence_ratings[f"{scenario['id']}_{evidence_id}"]["type"]
+                                for evidence_id in ratings}
+    return result
+
+
+def framing_scenario_from(payload):
+    experiment_type = require(payload, "experiment_type", str)
+    if experiment_type not in framing_dicts:
+        raise ApiError(404, f"Unknown experiment type: {experiment_type}")
+    scenario = lookup(framing_dicts[experiment_type], require(payload, "scenario_id", str), "scenario")
+    return experiment_type, scenario
+
+
+def create_frame(payload):
+    experiment_type, scenario = framing_scenario_from(payload)
+    frame_type = framing.assign_frame(experiment_type)
+    return {
+        "experiment_type": experiment_type,
+        "scenario_id": scenario["id"],
+        "frame_type": frame_type,
+        "frame": scenario[f"{frame_type}_frame"],
+        "question": scenario.get("rating_question") or scenario.get("question")
+    }
+
+
+def submit_framing_result(payload):
+    experiment_type, scenario = framing_scenario_from(payload)
+    frame_type = require(payload, "frame_type", str)
+    if frame_type not in frame_types[experiment_type]:
+        raise ApiError(400, f"Unknown frame type: {frame_type}")
+
+    response = require(payload, "response")
+    if experiment_type == "risk":
+        if response not in RISK_OPTIONS:
+            raise ApiError(400, "Field 'response' must be 'A' or 'B'")
+    elif not isinstance(response, int) or isinstance(response, bool) or \
+            not RATING_RANGE[0] <= response <= RATING_RANGE[1]:
+        raise ApiError(400, "Field 'response' must be an integer from 1 to 10")
+
+    result = framing.make_result(experiment_type, scenario, frame_type, response)
+    persist("framing", payload, result)
+    # The queued record is written later, so the response gets its own copy
+    result = dict(result)
+    result["classical_finding"] = classical_findings[experiment_type][frame_type]
+    result["explanation"] = scenario["explanation"]
+    return result
+
+
+def cohort_distribution(payload):
+    key = require(payload, "key", list)
+    # Keys are tuples of names and ids; anything unhashable or boolean can't name a cohort
+    if not all(isinstance(part, (str, int, float)) and not isinstance(part, bool) for part in key):
+        raise ApiError(400, "Field 'key' must be a list of strings and numbers")
+    found = sketch.get(tuple(key))
+    if found is None:
+        raise ApiError(404, f"No results recorded for {key}")
+    quantiles = payload.get("quantiles", [0.1, 0.25, 0.5, 0.75, 0.9])
+    if not isinstance(quantiles, list) or not all(is_number(q) and 0 <= q <= 1 for q in quantiles):
+        raise ApiError(400, "Field 'quantiles' must be a list of numbers from 0 to 1")
+    response = {
+        "key": key,
+        "count": found.n,
+        "min": found.min,
+        "max": found.max,
+        "quantiles": dict(zip(map(str, quantiles), found.quantiles(quantiles)))
+    }
+    edges = payload.get("edges")
+    if edges is not None:
+        if not isinstance(edges, list) or len(edges) < 2 or not all(is_number(e) for e in edges):
+            raise ApiError(400, "Field 'edges' must be a list of at least two numbers")
+        response["histogram"] = found.histogram(sorted(edges))
+    return response
+
+
+def readiness(payload):
+    if not warmup.ready.is_set():
+        raise ApiError(503, "Warming up")
+    return {"ready": True, "warmup_ms": {step: round(seconds * 1000, 1) for step, seconds in warmup.report.items()},
+            "warmup_failures": dict(warmup.failures)}
+
+
+def warm_up():
+    warmup.run(API_WARMUP_STEPS)
+
+
+# (method, path) -> handler(payload) returning the JSON response data
+ROUTES = {
+    ("GET", "/ready"): readiness,
+    ("POST", "/anchoring/anchor"): create_anchor,
+    ("POST", "/anchoring/results"): submit_anchoring_result,
+    ("POST", "/confirmation/results"): submit_confirmation_result,
+    ("POST", "/framing/frame"): create_frame,
+    ("POST", "/framing/results"): submit_framing_result,
+    ("POST", "/cohort/distribution"): cohort_distribution
+}
+
+ROUTE_PATHS = {path for (_, path) in ROUTES} | set(CATALOG_RESPONSES)
+
+# Called without arguments when the server starts and stops
+startup_hooks = [start_results_writer, warm_up]
+shutdown_hooks = [stop_results_writer]
+
+
+async def read_body(receive):
+    chunks = []
+    size = 0
+    more_body = True
+    while more_body:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise ApiError(413, "Request body too large")
+        chunks.append(chunk)
+        more_body = message.get("more_body", False)
+    return b"".join(chunks)
+
+
+async def handle(method, path, receive):
+    """Return the status code and encoded body for a request."""
+    if method == "GET" and path in CATALOG_RESPONSES:
+        return 200, CATALOG_RESPONSES[path]
+
+    handler = ROUTES.get((method, path))
+    if handler is None:
+        if path in ROUTE_PATHS:
+            raise ApiError(405, f"Method {method} not allowed")
+        raise ApiError(404, f"Unknown path: {path}")
+
+    body = await read_body(receive)
+    try:
+        payload = json.loads(body, parse_float=parse_finite_float, parse_constant=reject_constant) if body else {}
+    except ValueError as e:
+        raise ApiError(400, f"Request body is not valid JSON: {e}")
+    if not isinstance(payload, dict):
+        raise ApiError(400, "Request body must be a JSON object")
+
+    # Handlers update shared state under locks and enqueue results; running them
+    # on the default executor keeps that work off the event loop
+    result = await asyncio.get_running_loop().run_in_executor(None, handler, payload)
+    return 200, encode(result)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            for hook in startup_hooks:
+                hook()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            for hook in shutdown_hooks:
+                hook()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    try:
+        status, body = await handle(scope["method"], scope["path"], receive)
+    except ApiError as error:
+        status, body = error.status, encode({"error": error.message})
+
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": JSON_HEADERS + [(b"content-length", str(len(body)).encode())]
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class LocalClient:
+    """
+    Calls an ASGI app in-process, without a server or network, so the API
+    can be exercised from tests, notebooks and benchmarks.
+    """
+
+    def __init__(self, application=app):
+        self.application = application
+
+    async def request(self, method, path, payload=None):
+        """Send one request and return (status, decoded JSON response)."""
+        path, _, query_string = path.partition("?")
+        body = encode(payload) if payload is not None else b""
+        scope = {
+            "type": "http",
+            "http_version": "1.1",
+            "method": method,
+            "path": path,
+            "query_string": query_string.encode("latin-1"),
+            "headers": JSON_HEADERS
+        }
+        request_messages = [{"type": "http.request", "body": body, "more_body": False}]
+        response = {}
+
+        async def receive():
+            if request_messages:
+                return request_messages.pop()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["body"] = response.get("body", b"") + message.get("body", b"")
+
+        await self.application(scope, receive, send)
+        return response["status"], json.loads(response["body"])
+
+    def get(self, path):
+        return asyncio.run(self.request("GET", path))
+
+    def post(self, path, payload):
+        return asyncio.run(self.request("POST", path, payload))
@@ -0,0 +1,71 @@
+"""
+Build and summarise columnar archives of pooled results.
+
+    python archive_results.py build results.db archive/
+    python archive_results.py stats archive/
+
+build adds the anchoring and framing results stored since the archive's
+last build; stats prints the cohort statistics computed over the
+memory-mapped columns in chunks. See core/archive.py for the format.
+"""
+import argparse
+import sys
+import time
+
+from core import archive
+from core.results_store import ResultsStore
+
+
+def print_progress(rows):
+    print(f"\r{rows:,} rows archived", end="", file=sys.stderr)
+
+
+def format_value(value):
+    if value is None:
+        return "-"
+    return f"{value:,.3f}" if isinstance(value, float) else f"{value:,}"
+
+
+def print_table(title, rows):
+    print(f"\n== {title}")
+    if not rows:
+        print("no results")
+        return
+    columns = list(rows[0])
+    table = [columns] + [[value if isinstance(value, str) else format_value(value) for value in row.values()]
+                         for row in rows]
+    widths = [max(len(line[i]) for line in table) for i in range(len(columns))]
+    for line in table:
+        print("  ".join(cell.ljust(width) if isinstance(rows[0][column], str) else cell.rjust(width)
+                        for cell, width, column in zip(line, widths, columns)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="add new results from a results database to an archive")
+    build.add_argument("db")
+    build.add_argument("directory")
+    build.add_argument("--batch-size", type=int, default=10000)
+    stats = commands.add_parser("stats", help="print cohort statistics of an archive")
+    stats.add_argument("directory")
+    stats.add_argument("--chunk-rows", type=int, default=archive.DEFAULT_CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.command == "build":
+        store = ResultsStore(args.db)
+        try:
+            added = archive.build(store, args.directory, args.batch_size, progress=print_progress)
+        finally:
+            store.close()
+        print(f"\n{added:,} rows added to {args.directory} in {time.perf_counter() - start:,.1f} s", file=sys.stderr)
+    else:
+        pooled = archive.Archive(args.directory)
+        print_table("anchoring", archive.anchoring_stats(pooled, args.chunk_rows))
+        print_table("framing", archive.framing_stats(pooled, args.chunk_rows))
+        print(f"\n{len(pooled):,} rows in {time.perf_counter() - start:,.2f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Chart rendering in a pool of worker processes.
+
+Pyplot keeps global state and isn't thread-safe, while Streamlit runs each
+session's reruns on its own thread, so charts drawn on the script threads
+contend for the interpreter and can corrupt each other's figures. Script
+threads instead send a chart's name and plot data (see charts.FIGURES) to
+a worker process, which draws it and returns the PNG bytes.
+
+At most max_pending charts are queued or rendering at once; a chart that
+can't be queued, or isn't back, within the timeout raises ChartTimeout
+rather than holding up the rerun. Background renders, such as warming the
+chart cache, go one at a time, so they never hold more than one worker
+while participants' charts wait.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+# Worker processes; 0 renders on the calling thread, one chart at a time
+CHART_WORKERS_ENV = "BIAS_SIMULATOR_CHART_WORKERS"
+DEFAULT_WORKERS = 2
+
+# Seconds a chart may wait for a queue slot and then for its worker
+CHART_TIMEOUT_ENV = "BIAS_SIMULATOR_CHART_TIMEOUT"
+DEFAULT_TIMEOUT = 10.0
+
+# Charts queued or rendering per worker before callers wait
+MAX_PENDING_PER_WORKER = 4
+
+
+def configured_workers():
+    value = os.environ.get(CHART_WORKERS_ENV)
+    return int(value) if value else DEFAULT_WORKERS
+
+
+def configured_timeout():
+    value = os.environ.get(CHART_TIMEOUT_ENV)
+    return float(value) if value else DEFAULT_TIMEOUT
+
+
+class ChartTimeout(Exception):
+    pass
+
+
+def start_worker():
+    """Load the plotting stack and fonts before the first chart arrives."""
+    import matplotlib
+    matplotlib.use("Agg")
+
+    import warmup
+    warmup.prime_fonts()
+
+
+def render_in_worker(name, args):
+    import charts
+    return charts.render(name, *args)
+
+
+class ChartPool:
+    def __init__(self, workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT, max_pending=None):
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending or max(1, workers) * MAX_PENDING_PER_WORKER)
+        self._lock = threading.Lock()
+        self._background = threading.Lock()
+        self._executor = None
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                # Forking a process whose other threads hold locks can deadlock the child
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                                     initializer=start_worker)
+            return self._executor
+
+    def _restart(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def render(self, name, *args, background=False):
+        """
+        PNG bytes of the named chart from charts.FIGURES, or None if it has
+        nothing to show. Background renders wait for the previous one to
+        finish before queueing.
+        """
+        if background:
+            with self._background:
+                return self._render(name, args)
+        return self._render(name, args)
+
+    def _render(self, name, args):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise ChartTimeout(f"No chart worker free for {name} within {self.timeout:g} s")
+
+        if self.workers == 0:
+            try:
+                with self._lock:
+                    return render_in_worker(name, args)
+            finally:
+                self._slots.release()
+
+        executor = self._pool()
+        try:
+            future = executor.submit(render_in_worker, name, args)
+        except BaseException as e:
+            self._slots.release()
+            if isinstance(e, BrokenProcessPool):
+                self._restart(executor)
+                raise ChartTimeout(f"Chart workers stopped before rendering {name}") from None
+            raise
+        # The slot is held until the worker is done, even if the caller stopped waiting
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(self.timeout)
+        except TimeoutError:
+            future.cancel()
+            raise ChartTimeout(f"Chart {name} took longer than {self.timeout:g} s") from None
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); the next chart starts a fresh pool
+            self._restart(executor)
+            raise ChartTimeout(f"Chart worker stopped while rendering {name}") from None
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,392 @@
+"""
+Matplotlib figures for the experiments' result pages.
+
+Every function takes plain result records or counts and returns a
+Figure, without touching Streamlit, so the same charts can be shown in
+the app, written into participant reports or rendered in another process.
+"""
+import io
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from core.catalogs import classical_findings
+
+
+def figure_png(fig, dpi=200):
+    """Render a figure to PNG bytes and release it."""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def _label_bars(ax, bars, values):
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + 0.05 * max(values),
+                f'{int(height):,}',
+                ha='center', va='bottom', rotation=0)
+
+
+def task_result_figure(result):
+    """Anchor, estimate and actual value for one anchoring task."""
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    labels = ['Random Number', 'Your Estimate', 'Actual Value']
+    values = [result['anchor'], result['estimate'], result['actual_value']]
+    colors = ['#ff9999', '#66b3ff', '#99ff99']
+
+    bars = ax.bar(labels, values, color=colors)
+    ax.set_title(result['task'])
+    ax.set_ylabel(result['unit'])
+    _label_bars(ax, bars, values)
+
+    plt.tight_layout()
+    return fig
+
+
+def anchoring_results_figure(results):
+    """One anchor/estimate/actual panel per completed anchoring task."""
+    num_tasks = len(results)
+    fig, axes = plt.subplots(1, num_tasks, figsize=(5*num_tasks, 5))
+
+    if num_tasks == 1:
+        axes = [axes]
+
+    for ax, result in zip(axes, results):
+        labels = ['Random Number', 'Your Estimate', 'Actual Value']
+        values = [result['anchor'], result['estimate'], result['actual_value']]
+        colors = ['#ff9999', '#66b3ff', '#99ff99']
+
+        bars = ax.bar(labels, values, color=colors)
+        ax.set_title(result['task'])
+        ax.set_ylabel(result['unit'])
+        _label_bars(ax, bars, values)
+
+    plt.tight_layout()
+    return fig
+
+
+def anchoring_effects_figure(strong_count, moderate_count, none_count):
+    """Pie chart of the anchoring effects observed, or None if there are none to show."""
+    effect_sizes = [strong_count, moderate_count, none_count]
+    if sum(effect_sizes) == 0:
+        return None
+
+    fig, ax = plt.subplots(figsize=(8, 6))
+    effect_labels = ['Strong Effect', 'Moderate Effect', 'No Clear Effect']
+    effect_colors = ['#ff6666', '#ffcc66', '#66cc66']
+    effect_labels = [f"{label} ({size/sum(effect_sizes)*100:.1f}%)" for label, size in zip(effect_labels, effect_sizes)]
+
+    ax.pie(effect_sizes, labels=effect_labels, colors=effect_colors, autopct='%1.1f%%',
+           startangle=90, shadow=True)
+    ax.axis('equal')
+    ax.set_title('Types of Anchoring Effects Observed')
+    return fig
+
+
+def wason_strategy_figure(confirming_tests, disconfirming_tests):
+    """Confirming versus disconfirming tests in the Wason task."""
+    total_tests = confirming_tests + disconfirming_tests
+    confirming_percent = (confirming_tests / total_tests) * 100
+    disconfirming_percent = (disconfirming_tests / total_tests) * 100
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    categories = ['Confirming Tests', 'Disconfirming Tests']
+    values = [confirming_tests, disconfirming_tests]
+
+    bars = ax.bar(categories, values, color=['#ff9999', '#99ff99'])
+    ax.set_title('Your Testing Strategy')
+    ax.set_ylabel('Number of Tests')
+
+    for i, bar in enumerate(bars):
+        height = bar.get_height()
+        percentage = confirming_percent if i == 0 else disconfirming_percent
+        ax.text(bar.get_x() + bar.get_width()/2., height + 0.1,
+                f'{height} ({percentage:.1f}%)',
+                ha='center', va='bottom')
+
+    plt.tight_layout()
+    return fig
+
+
+def _evidence_panel(ax, ratings, texts, color, title):
+    if texts:
+        y_pos = np.arange(len(texts))
+        ax.barh(y_pos, ratings, color=color, alpha=0.7)
+        ax.set_yticks(y_pos)
+        ax.set_yticklabels(texts)
+        ax.set_xlim(0, 10)
+        ax.set_title(f'{title} Evidence')
+        ax.set_xlabel('Your Rating')
+    else:
+        ax.text(0.5, 0.5, f'No {title.lower()} evidence rated',
+                horizontalalignment='center', verticalalignment='center')
+
+
+def evidence_ratings_figure(grouped):
+    """
+    Ratings of supporting and contradicting evidence side by side; grouped
+    maps each evidence type to its (ratings, short texts), as returned by
+    confirmation.group_evidence_ratings.
+    """
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 6))
+    _evidence_panel(ax1, *grouped["supporting"], 'green', 'Supporting')
+    _evidence_panel(ax2, *grouped["contradicting"], 'red', 'Contradicting')
+    plt.tight_layout()
+    return fig
+
+
+def _count_choices(results):
+    counts = {}
+    for result in results:
+        key = (result["frame_type"], result["user_choice"])
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def risk_choices_figure(results):
+    """Option A and B choices under each frame across risk framing results."""
+    counts = _count_choices(results)
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    bar_width = 0.35
+    r1 = np.arange(2)
+    r2 = [x + bar_width for x in r1]
+
+    ax.bar(r1[0], counts.get(("positive", "A"), 0), width=bar_width, label='Option A', color='skyblue')
+    ax.bar(r2[0], counts.get(("positive", "B"), 0), width=bar_width, label='Option B', color='lightgreen')
+    ax.bar(r1[1], counts.get(("negative", "A"), 0), width=bar_width, color='skyblue')
+    ax.bar(r2[1], counts.get(("negative", "B"), 0), width=bar_width, color='lightgreen')
+
+    ax.set_ylabel('Number of Choices')
+    ax.set_title('Choices by Frame Type')
+    ax.set_xticks([r + bar_width/2 for r in range(2)])
+    ax.set_xticklabels(['Positive Frame', 'Negative Frame'])
+    ax.legend()
+
+    plt.tight_layout()
+    return fig
+
+
+def average_ratings(results):
+    """(frame types in sorted order, average rating under each)."""
+    totals = {}
+    for result in results:
+        total, count = totals.get(result["frame_type"], (0, 0))
+        totals[result["frame_type"]] = (total + result["user_rating"], count + 1)
+    frames = sorted(totals)
+    return frames, [totals[frame][0] / totals[frame][1] for frame in frames]
+
+
+def _rating_bars(ax, frames, averages, colors):
+    bars = ax.bar(frames, averages, color=colors)
+    ax.set_xlabel('Frame Type')
+    ax.set_ylim(0, 10)
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + 0.1,
+                f'{height:.2f}', ha='center', va='bottom')
+
+
+def attribute_ratings_figure(results):
+    """Average rating under each frame across attribute framing results."""
+    frames, averages = average_ratings(results)
+    fig, ax = plt.subplots(figsize=(10, 6))
+    _rating_bars(ax, frames, averages, ['skyblue', 'salmon'])
+    ax.set_ylabel('Average Rating')
+    ax.set_title('Average Ratings by Frame Type')
+    plt.tight_layout()
+    return fig
+
+
+def goal_ratings_figure(results):
+    """Average likelihood rating under each frame across goal framing results."""
+    frames, averages = average_ratings(results)
+    colors = {'gain': 'green', 'loss': 'red', 'neutral': 'blue'}
+    fig, ax = plt.subplots(figsize=(10, 6))
+    _rating_bars(ax, frames, averages, [colors.get(frame, 'gray') for frame in frames])
+    ax.set_ylabel('Average Likelihood Rating')
+    ax.set_title('Average Likelihood Ratings by Frame Type')
+    plt.tight_layout()
+    return fig
+
+
+# Chart of each framing experiment type's results across scenarios
+FRAMING_RESULTS_FIGURES = {
+    "risk": risk_choices_figure,
+    "attribute": attribute_ratings_figure,
+    "goal": goal_ratings_figure
+}
+
+
+def classical_risk_figure(frame_type, user_choice):
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    # These are approximate percentages from the original Asian Disease Problem study
+    classical_data = classical_findings["risk"]
+
+    # Set up data for plotting
+    frames = ['Positive Frame', 'Negative Frame']
+    option_a_data = [classical_data['positive']['A'], classical_data['negative']['A']]
+    option_b_data = [classical_data['positive']['B'], classical_data['negative']['B']]
+
+    barWidth = 0.3
+
+    r1 = np.arange(len(frames))
+    r2 = [x + barWidth for x in r1]
+
+    ax.bar(r1, option_a_data, width=barWidth, label='Option A (Sure Option)', color='skyblue')
+    ax.bar(r2, option_b_data, width=barWidth, label='Option B (Risky Option)', color='salmon')
+
+    # Add user's choice as a marker
+    if frame_type == 'positive':
+        marker_x = r1[0] if user_choice == 'A' else r2[0]
+        ax.plot(marker_x, classical_data['positive']['A' if user_choice == 'A' else 'B'],
+               'ko', markersize=10, label='Your Choice')
+    else:
+        marker_x = r1[1] if user_choice == 'A' else r2[1]
+        ax.plot(marker_x, classical_data['negative']['A' if user_choice == 'A' else 'B'],
+               'ko', markersize=10, label='Your Choice')
+
+    ax.set_xlabel('Frame Type')
+    ax.set_ylabel('Percentage of Participants (%)')
+    ax.set_title('Choices in Classical Framing Study (Tversky & Kahneman, 1981)')
+    ax.set_xticks([r + barWidth/2 for r in range(len(frames))])
+    ax.set_xticklabels(frames)
+    ax.set_ylim(0, 100)
+
+    # Add value labels on bars
+    for i, v in enumerate(option_a_data):
+        ax.text(r1[i], v + 3, f"{v}%", ha='center')
+    for i, v in enumerate(option_b_data):
+        ax.text(r2[i], v + 3, f"{v}%", ha='center')
+
+    ax.legend()
+
+    plt.tight_layout()
+    return fig
+
+
+def classical_attribute_figure(frame_type, user_rating):
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    # These are representative values converted to a 10-point scale
+    classical_data = classical_findings["attribute"]
+
+    frames = ['Positive Frame', 'Negative Frame']
+    classical_ratings = [classical_data['positive'], classical_data['negative']]
+
+    x = np.arange(len(frames))
+    width = 0.35
+
+    ax.bar(x - width/2, classical_ratings, width, label='Average Ratings in Classical Studies', color='lightblue')
+
+    user_data = [user_rating if frame_type == 'positive' else None,
+                user_rating if frame_type == 'negative' else None]
+    user_data = [0 if v is None else v for v in user_data]
+
+    # Only show the user bar for the frame they actually saw
+    if frame_type == 'positive':
+        ax.bar(x[0] + width/2, user_data[0], width, label='Your Rating', color='orange')
+    else:
+        ax.bar(x[1] + width/2, user_data[1], width, label='Your Rating', color='orange')
+
+    ax.set_xlabel('Frame Type')
+    ax.set_ylabel('Average Rating (1-10 scale)')
+    ax.set_title('Ratings in Attribute Framing Studies')
+    ax.set_xticks(x)
+    ax.set_xticklabels(frames)
+    ax.set_ylim(0, 10)
+
+    for i, v in enumerate(classical_ratings):
+        ax.text(x[i] - width/2, v + 0.3, f"{v}", ha='center')
+
+    if frame_type == 'positive':
+        ax.text(x[0] + width/2, user_data[0] + 0.3, f"{user_data[0]}", ha='center')
+    else:
+        ax.text(x[1] + width/2, user_data[1] + 0.3, f"{user_data[1]}", ha='center')
+
+    ax.legend()
+
+    plt.tight_layout()
+    return fig
+
+
+def classical_goal_figure(frame_type, user_rating):
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    classical_data = classical_findings["goal"]
+
+    frames = ['Gain Frame', 'Loss Frame', 'Neutral Frame']
+    classical_ratings = [classical_data['gain'], classical_data['loss'], classical_data['neutral']]
+
+    x = np.arange(len(frames))
+    width = 0.35
+
+    colors = ['green', 'red', 'blue']
+    ax.bar(x - width/2, classical_ratings, width, label='Average Ratings in Research', color=colors)
+
+    # Add user's rating
+    user_data = [
+        user_rating if frame_type == 'gain' else None,
+        user_rating if frame_type == 'loss' else None,
+        user_rating if frame_type == 'neutral' else None
+    ]
+
+    # Only show the user bar for the frame they actually saw
+    if frame_type == 'gain':
+        ax.bar(x[0] + width/2, user_data[0], width, label='Your Rating', color='orange')
+    elif frame_type == 'loss':
+        ax.bar(x[1] + width/2, user_data[1], width, label='Your Rating', color='orange')
+    else:  # neutral
+        ax.bar(x[2] + width/2, user_data[2], width, label='Your Rating', color='orange')
+
+    ax.set_xlabel('Frame Type')
+    ax.set_ylabel('Average Likelihood Rating (1-10 scale)')
+    ax.set_title('Likelihood Ratings in Goal Framing Studies')
+    ax.set_xticks(x)
+    ax.set_xticklabels(frames)
+    ax.set_ylim(0, 10)
+
+    for i, v in enumerate(classical_ratings):
+        ax.text(x[i] - width/2, v + 0.3, f"{v}", ha='center')
+
+    if frame_type == 'gain':
+        ax.text(x[0] + width/2, user_data[0] + 0.3, f"{user_data[0]}", ha='center')
+    elif frame_type == 'loss':
+        ax.text(x[1] + width/2, user_data[1] + 0.3, f"{user_data[1]}", ha='center')
+    else:  # neutral
+        ax.text(x[2] + width/2, user_data[2] + 0.3, f"{user_data[2]}", ha='center')
+
+    ax.legend()
+
+    plt.tight_layout()
+    return fig
+
+
+# Classical findings chart for each framing experiment type, with the participant's response marked
+CLASSICAL_FIGURES = {
+    "risk": classical_risk_figure,
+    "attribute": classical_attribute_figure,
+    "goal": classical_goal_figure
+}
+
+
+# Every chart by name, for rendering in another process from its plot data
+FIGURES = {
+    "task_result": task_result_figure,
+    "anchoring_results": anchoring_results_figure,
+    "anchoring_effects": anchoring_effects_figure,
+    "wason_strategy": wason_strategy_figure,
+    "evidence_ratings": evidence_ratings_figure,
+    **{f"{experiment_type}_results": figure for experiment_type, figure in FRAMING_RESULTS_FIGURES.items()},
+    **{f"classical_{experiment_type}": figure for experiment_type, figure in CLASSICAL_FIGURES.items()}
+}
+
+
+def render(name, *args, dpi=200):
+    """PNG bytes of the named chart drawn from args, or None if it has nothing to show."""
+    fig = FIGURES[name](*args)
+    return figure_png(fig, dpi) if fig is not None else None
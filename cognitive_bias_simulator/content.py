@@ -0,0 +1,182 @@
+"""
+Static educational text shown alongside the experiments.
+
+The sections are kept here as plain, already dedented markdown rather than
+indented string literals inside the page functions, so each rerun sends
+the shortest form of the text and the pages can show long sections
+collapsed until they are opened (see ui_helpers.lazy_section).
+"""
+
+SECTIONS = {
+    "anchoring_intro": """
+## Welcome to the Anchoring Bias Simulator!
+
+**What is anchoring bias?**
+
+Anchoring bias is a cognitive bias where people rely too heavily on the first piece of information they encounter (the "random number")
+when making decisions or estimates.
+
+**How this experiment works:**
+1. You'll be given a random number
+2. You'll guess if the actual value is higher or lower than this random number
+3. You'll make your best estimate of the actual value
+4. We'll show you how the random number might have influenced your estimate
+
+Let's see how susceptible you are to anchoring bias!
+""",
+
+    "framing_understanding": """
+## Understanding the Framing Effect
+
+### What is happening in these experiments?
+
+The framing effect demonstrates that our decisions are influenced not just by facts and logic,
+but by how information is presented to us. Even when the actual information is identical, different
+presentations can lead to dramatically different decisions.
+
+### Why do framing effects occur?
+
+Several cognitive mechanisms contribute to framing effects:
+
+1. **Loss aversion**: People tend to feel losses more strongly than equivalent gains (Prospect Theory, Kahneman & Tversky, 1979)
+2. **Cognitive processing**: Different frames activate different mental schemas and associations
+3. **Emotional responses**: Frames can trigger different emotional reactions that influence judgment
+4. **Reference points**: Frames establish different reference points for evaluating options
+
+### Real-world implications:
+
+Framing effects have significant implications in many domains:
+
+- **Politics**: How policies are described influences public support
+- **Marketing**: Product descriptions are carefully framed to maximize appeal
+- **Healthcare**: How treatment options are presented affects patient decisions
+- **Finance**: Investment options described in terms of gains or losses affect risk tolerance
+- **Environmental messaging**: Climate action described as preventing losses vs. securing gains
+
+### How to mitigate framing effects:
+
+While framing effects are powerful, you can reduce their impact by:
+
+- Being aware of framing in messages you receive
+- Reframing problems in multiple ways before deciding
+- Focusing on actual outcomes rather than descriptions
+- Seeking objective measures and base rates
+- Considering both gains and losses for any decision
+""",
+
+    "framing_references": """
+### References:
+
+- Tversky, A., & Kahneman, D. (1981). The framing of decisions and the psychology of choice. Science, 211(4481), 453-458.
+- Kahneman, D., & Tversky, A. (1979). Prospect theory: An analysis of decision under risk. Econometrica, 47(2), 263-291.
+- Levin, I. P., Schneider, S. L., & Gaeth, G. J. (1998). All frames are not created equal: A typology and critical analysis of framing effects. Organizational Behavior and Human Decision Processes, 76(2), 149-188.
+- Levin, I. P., & Gaeth, G. J. (1988). How consumers are affected by the framing of attribute information before and after consuming the product. Journal of Consumer Research, 15(3), 374-378.
+
+Remember that awareness of cognitive biases is the first step toward mitigating them!
+""",
+
+    "confirmation_stance_note": """
+**Note:** Your strong pre-existing stance may have influenced how you evaluated the evidence.
+People with stronger prior beliefs often show stronger confirmation bias effects.
+""",
+
+    "confirmation_context_political_policy": """
+### Political Context
+
+In this scenario, the same evidence is interpreted differently depending on political orientation.
+
+For left-leaning participants:
+- Evidence supporting progressive policies aligns with existing views
+- Evidence against these policies contradicts existing views
+
+For right-leaning participants:
+- Evidence against progressive policies aligns with existing views
+- Evidence supporting these policies contradicts existing views
+
+This reflects how in real-world political discussions, the same facts can be weighted
+differently based on pre-existing political beliefs.
+""",
+
+    "confirmation_context_health_study": """
+### Coffee Preference Context
+
+In this scenario, the same evidence may be interpreted differently depending on your coffee consumption habits.
+
+Coffee drinkers may find evidence supporting coffee's health benefits more compelling,
+while non-drinkers might be more receptive to evidence questioning these benefits.
+
+This reflects how our pre-existing habits and preferences can influence how we evaluate
+information about those same habits.
+""",
+
+    "confirmation_context_product_review": """
+### Brand Experience Context
+
+In this scenario, the same evidence may be interpreted differently depending on your previous
+experiences with Apple products.
+
+Those with positive experiences may find supporting evidence more compelling and may discount
+negative evidence, while those with negative experiences may do the opposite.
+
+This demonstrates how our past experiences with a brand can create expectations that influence
+how we evaluate new information about their products.
+""",
+
+    "confirmation_level_strong": """
+### Strong confirmation bias detected
+
+You rated evidence that supported the hypothesis as significantly more important than evidence that contradicted it.
+""",
+
+    "confirmation_level_moderate": """
+### Moderate confirmation bias detected
+
+You showed some tendency to value supporting evidence more than contradicting evidence.
+""",
+
+    "confirmation_level_minimal": """
+### Minimal confirmation bias detected
+
+You rated supporting and contradicting evidence roughly equally.
+""",
+
+    "confirmation_level_reverse": """
+### Reverse bias detected
+
+You actually rated contradicting evidence as more important than supporting evidence.
+This could indicate a disconfirmation bias or critical thinking.
+""",
+
+    "confirmation_understanding": """
+### Understanding Confirmation Bias
+
+Confirmation bias is the tendency to search for, interpret, and recall information in a way that confirms our pre-existing beliefs.
+
+It affects us in many ways:
+
+- **Selective perception**: We notice information that supports our views and overlook contradictory information
+- **Biased evaluation**: We scrutinize contradicting evidence more closely than supporting evidence
+- **Memory bias**: We recall information that reinforces our beliefs more easily
+
+### Real-world impact:
+
+- Political polarization
+- Poor decision-making
+- "Filter bubbles" in social media
+- Resistance to changing our minds despite new evidence
+
+### How to minimize confirmation bias:
+
+- Actively seek out opposing viewpoints
+- Consider the possibility that you might be wrong
+- Ask others to critique your thinking
+- Set up decision-making processes that reduce bias
+"""
+}
+
+
+SECTIONS = {name: text.strip() for name, text in SECTIONS.items()}
+
+
+def section(name):
+    return SECTIONS[name]
@@ -0,0 +1,112 @@
+import logging
+import os
+import sys
+import threading
+import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+# Log file for allocation reports; allocation tracking is off when it is not set
+ALLOCATION_LOG_ENV = "BIAS_SIMULATOR_ALLOCATION_LOG"
+
+# Frames kept per allocation; more frames cost more memory while tracing
+TRACEBACK_FRAMES = 10
+
+# Allocations made by the tracing itself or by the import system
+IGNORED_FILES = (tracemalloc.__file__, "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>",
+                 "<unknown>")
+
+
+def configured_log_path():
+    return os.environ.get(ALLOCATION_LOG_ENV) or None
+
+
+def _source(filename):
+    """The installed package or the app module an allocation was made in."""
+    parts = filename.replace("\\", "/").split("/")
+    for marker in ("site-packages", "dist-packages"):
+        if marker in parts:
+            index = parts.index(marker)
+            if index + 1 < len(parts):
+                return parts[index + 1].split(".")[0]
+    if filename.startswith(sys.prefix) or filename.startswith(sys.base_prefix):
+        return "stdlib"
+    return os.path.basename(filename)
+
+
+class AllocationTracker:
+    """
+    Attributes memory retained by each stage function to allocation sites.
+
+    track() takes a tracemalloc snapshot before and after the function and
+    logs what it left allocated: the total, the share made in each package
+    or app module (so growth in session-state lists, pandas frames and
+    Matplotlib objects can be told apart) and the top allocation sites.
+    Running totals per stage are kept for comparing stages over time.
+
+    Snapshots pause the whole process while they are taken, so this is an
+    instrumentation mode, not something to leave on in a classroom.
+    """
+
+    def __init__(self, top=10, frames=TRACEBACK_FRAMES, log=logger):
+        self.top = top
+        self.frames = frames
+        self.log = log
+        self.retained = {}
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def track(self, name, func, *args, **kwargs):
+        """Call func, then log the memory it retained under name, even if func raises."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        before = self._snapshot()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.report(name, before, self._snapshot())
+
+    @staticmethod
+    def _snapshot():
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, filename) for filename in IGNORED_FILES])
+
+    def report(self, name, before, after):
+        sites = after.compare_to(before, "lineno")
+        retained = sum(stat.size_diff for stat in sites)
+        by_source = {}
+        for stat in after.compare_to(before, "filename"):
+            if stat.size_diff:
+                source = _source(stat.traceback[0].filename)
+                by_source[source] = by_source.get(source, 0) + stat.size_diff
+
+        with self._lock:
+            self.retained[name] = self.retained.get(name, 0) + retained
+            self.calls[name] = self.calls.get(name, 0) + 1
+            total = self.retained[name]
+            calls = self.calls[name]
+
+        lines = [f"{name}: {retained:+,} bytes retained ({total:+,} over {calls} calls)"]
+        sources = sorted(by_source.items(), key=lambda item: -abs(item[1]))
+        lines.append("  by source: " + ", ".join(f"{source} {size:+,}" for source, size in sources[:self.top]))
+        for stat in sorted(sites, key=lambda stat: -abs(stat.size_diff))[:self.top]:
+            if stat.size_diff:
+                frame = stat.traceback[0]
+                lines.append(f"  {stat.size_diff:+,} bytes in {stat.count_diff:+,} blocks "
+                             f"at {frame.filename}:{frame.lineno}")
+        self.log.info("\n".join(lines))
+
+    def totals(self):
+        """Stage name -> (calls, bytes retained over all of them), largest first."""
+        with self._lock:
+            return sorted(((name, self.calls[name], size) for name, size in self.retained.items()),
+                          key=lambda item: -item[2])
+
+
+def file_logger(path):
+    """The allocation logger, writing to path."""
+    handler = logging.FileHandler(path)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    return logger
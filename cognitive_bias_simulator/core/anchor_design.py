@@ -0,0 +1,238 @@
+import math
+import random
+import threading
+from functools import lru_cache
+
+# Anchors are drawn from the same overall range the experiment always used,
+# expressed as multiples of the task's actual value.
+LOWER_FACTOR = 0.3
+UPPER_FACTOR = 2.5
+
+# Number of log-spaced bins the anchor range is split into
+NUM_BINS = 8
+
+# Available anchor designs
+DESIGNS = ["uniform", "log_uniform", "stratified", "adaptive"]
+DEFAULT_DESIGN = "stratified"
+
+# The adaptive design uses the stratified design until every informative bin
+# has seen at least this many observations
+MIN_OBSERVATIONS_PER_BIN = 2
+
+# Prior on the anchoring slope and default noise level on the log scale
+PRIOR_SLOPE_VARIANCE = 1.0
+DEFAULT_NOISE_VARIANCE = 0.25
+# The default noise level counts as this many residual degrees of freedom,
+# so a side whose first few residuals happen to be small isn't starved of
+# the trials that would correct its noise estimate
+NOISE_PRIOR_DOF = 4
+
+# Cohort statistics shared by every session served by this process
+_cohort_stats = {}
+_cohort_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def design_table(actual_value):
+    """Precompute the anchor bins for a task with the given actual value."""
+    lower_bound = max(int(actual_value * LOWER_FACTOR), 1)
+    upper_bound = max(int(actual_value * UPPER_FACTOR), lower_bound + 1)
+
+    log_lower = math.log(lower_bound)
+    log_upper = math.log(upper_bound)
+    step = (log_upper - log_lower) / NUM_BINS
+    edges = tuple(math.exp(log_lower + i * step) for i in range(NUM_BINS + 1))
+
+    # Bins that contain the actual value produce anchors too close to it to
+    # tell us anything about anchoring, so the informative designs skip them
+    low_bins = tuple(i for i in range(NUM_BINS) if edges[i + 1] <= actual_value)
+    high_bins = tuple(i for i in range(NUM_BINS) if edges[i] >= actual_value)
+
+    # Centre of each bin on the log(anchor / actual) scale
+    centres = tuple(
+        (math.log(edges[i]) + math.log(edges[i + 1])) / 2 - math.log(actual_value)
+        for i in range(NUM_BINS)
+    )
+
+    return {
+        "lower_bound": lower_bound,
+        "upper_bound": upper_bound,
+        "edges": edges,
+        "low_bins": low_bins,
+        "high_bins": high_bins,
+        "centres": centres,
+    }
+
+
+def _new_task_stats():
+    return {
+        "n": [0] * NUM_BINS,
+        "sxx": [0.0] * NUM_BINS,
+        "sxy": [0.0] * NUM_BINS,
+        "syy": [0.0] * NUM_BINS,
+    }
+
+
+def _bin_index(table, anchor):
+    edges = table["edges"]
+    for i in range(NUM_BINS):
+        if anchor < edges[i + 1]:
+            return i
+    return NUM_BINS - 1
+
+
+def _sample_in_bin(table, bin_index, rng):
+    """Draw an integer anchor log-uniformly from a single bin."""
+    edges = table["edges"]
+    log_anchor = rng.uniform(math.log(edges[bin_index]), math.log(edges[bin_index + 1]))
+    anchor = int(round(math.exp(log_anchor)))
+    return min(max(anchor, table["lower_bound"]), table["upper_bound"])
+
+
+def _log_ratios(anchor, estimate, actual_value):
+    # Estimates of zero are allowed by the input widget, clamp them to keep the log defined
+    x = math.log(max(anchor, 1) / actual_value)
+    y = math.log(max(estimate, 1) / actual_value)
+    return x, y
+
+
+def record_observation(task_id, actual_value, anchor, estimate):
+    """Add a submitted estimate to the cohort statistics used by the adaptive design."""
+    table = design_table(actual_value)
+    x, y = _log_ratios(anchor, estimate, actual_value)
+    bin_index = _bin_index(table, anchor)
+
+    with _cohort_lock:
+        stats = _cohort_stats.setdefault(task_id, _new_task_stats())
+        stats["n"][bin_index] += 1
+        stats["sxx"][bin_index] += x * x
+        stats["sxy"][bin_index] += x * y
+        stats["syy"][bin_index] += y * y
+
+
+def reset_cohort(task_id=None):
+    """Forget the cohort statistics for one task, or for every task."""
+    with _cohort_lock:
+        if task_id is None:
+            _cohort_stats.clear()
+        else:
+            _cohort_stats.pop(task_id, None)
+
+
+def _noise_variance(stats, bins):
+    """Pooled residual variance of the slope fits of the given bins, shrunk towards the default."""
+    residual = 0.0
+    dof = 0
+    for i in bins:
+        if stats["n"][i] > 1 and stats["sxx"][i] > 0:
+            slope = stats["sxy"][i] / stats["sxx"][i]
+            residual += stats["syy"][i] - slope * stats["sxy"][i]
+            dof += stats["n"][i] - 1
+    return max((residual + NOISE_PRIOR_DOF * DEFAULT_NOISE_VARIANCE) / (dof + NOISE_PRIOR_DOF), 1e-6)
+
+
+def _side_posterior(stats, bins):
+    """(posterior variance, noise variance) of the slope fitted to one side's bins."""
+    noise = _noise_variance(stats, bins)
+    return 1 / (1 / PRIOR_SLOPE_VARIANCE + sum(stats["sxx"][i] for i in bins) / noise), noise
+
+
+def slope_summary(task_id):
+    """
+    Estimate the cohort's anchoring slope for a task.
+
+    The slope is fitted through the origin on the log scale,
+    log(estimate / actual) = slope * log(anchor / actual), so 0 means no
+    anchoring and 1 means estimates equal to the anchor.
+    Returns (slope, standard_error, n), or (None, None, 0) without data.
+    """
+    with _cohort_lock:
+        stats = _cohort_stats.get(task_id)
+        if stats is None:
+            return None, None, 0
+        n = sum(stats["n"])
+        sxx = sum(stats["sxx"])
+        sxy = sum(stats["sxy"])
+        syy = sum(stats["syy"])
+
+    if n == 0 or sxx == 0:
+        return None, None, n
+    slope = sxy / sxx
+    if n > 1:
+        noise = max((syy - slope * sxy) / (n - 1), 0.0)
+    else:
+        noise = DEFAULT_NOISE_VARIANCE
+    return slope, math.sqrt(noise / sxx), n
+
+
+def _choose_stratified_bin(task_id, table, rng):
+    low_bins = table["low_bins"]
+    high_bins = table["high_bins"]
+    if not low_bins or not high_bins:
+        return rng.choice(low_bins or high_bins or tuple(range(NUM_BINS)))
+
+    # Keep the low and high sides of the cohort balanced
+    with _cohort_lock:
+        stats = _cohort_stats.get(task_id)
+        low_count = sum(stats["n"][i] for i in low_bins) if stats else 0
+        high_count = sum(stats["n"][i] for i in high_bins) if stats else 0
+
+    if low_count < high_count:
+        return rng.choice(low_bins)
+    elif high_count < low_count:
+        return rng.choice(high_bins)
+    return rng.choice(low_bins + high_bins)
+
+
+def _choose_adaptive_bin(task_id, table, rng):
+    informative_bins = table["low_bins"] + table["high_bins"]
+
+    with _cohort_lock:
+        stats = _cohort_stats.get(task_id)
+        if stats is not None:
+            stats = {name: list(values) for name, values in stats.items()}
+
+    if stats is None or not informative_bins:
+        return _choose_stratified_bin(task_id, table, rng)
+
+    if any(stats["n"][i] < MIN_OBSERVATIONS_PER_BIN for i in informative_bins):
+        under_sampled = [i for i in informative_bins if stats["n"][i] < MIN_OBSERVATIONS_PER_BIN]
+        return rng.choice(under_sampled)
+
+    # Participants may anchor more strongly on low anchors than on high ones,
+    # so each side's slope is fitted on its own and the next trial goes to
+    # the side whose slope is currently least certain
+    sides = [bins for bins in (table["low_bins"], table["high_bins"]) if bins]
+    posteriors = [_side_posterior(stats, bins) for bins in sides]
+    largest = max(variance for variance, _ in posteriors)
+    side = rng.choice([i for i, (variance, _) in enumerate(posteriors) if variance >= largest * (1 - 1e-9)])
+    bins = sides[side]
+    variance, noise = posteriors[side]
+
+    # Within the side, bins are drawn in proportion to how much one more
+    # observation there would narrow the side's slope: an anchor at x adds
+    # x^2 to the fit, so far anchors are favoured without every participant
+    # seeing the same ones
+    weights = [variance - 1 / (1 / variance + table["centres"][i] ** 2 / noise) for i in bins]
+    return rng.choices(bins, weights)[0]
+
+
+def generate_anchor(task, design=DEFAULT_DESIGN, rng=None):
+    """Generate an anchor for a task using the requested design."""
+    if rng is None:
+        rng = random
+
+    table = design_table(task["actual_value"])
+
+    if design == "uniform":
+        return rng.randint(table["lower_bound"], table["upper_bound"])
+    elif design == "log_uniform":
+        bin_index = rng.randrange(NUM_BINS)
+    elif design == "stratified":
+        bin_index = _choose_stratified_bin(task["id"], table, rng)
+    elif design == "adaptive":
+        bin_index = _choose_adaptive_bin(task["id"], table, rng)
+    else:
+        raise ValueError(f"Unknown anchor design: {design}")
+
+    return _sample_in_bin(table, bin_index, rng)
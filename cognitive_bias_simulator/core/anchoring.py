@@ -0,0 +1,164 @@
+from core import anchor_design, cohort
+from core.catalogs import tasks, tasks_dict
+from core.flow import anchoring_flow
+
+# Estimates can be up to this many times the actual value
+MAX_ESTIMATE_FACTOR = 5
+
+# Session state used by the anchoring experiment and its initial values
+STATE_DEFAULTS = {
+    "anchor": None,
+    "current_task": None,
+    "results": list,
+    "completed_tasks": set,
+    "higher_lower_guess": None,
+    "guess_correct": None,
+    "anchor_design": anchor_design.DEFAULT_DESIGN
+}
+
+
+def _default(value):
+    return value() if callable(value) else value
+
+
+def init_state(state):
+    for key, value in STATE_DEFAULTS.items():
+        if key not in state:
+            state[key] = _default(value)
+
+
+def reset_state(state):
+    for key, value in STATE_DEFAULTS.items():
+        if key != "anchor_design":
+            state[key] = _default(value)
+
+
+def go_to_task_selection(state):
+    anchoring_flow.fire(state, "back_to_tasks")
+    state["anchor"] = None
+    state["current_task"] = None
+    state["higher_lower_guess"] = None
+    state["guess_correct"] = None
+
+
+def retry_current_task(state):
+    anchoring_flow.fire(state, "retry")
+    state["anchor"] = None
+    state["higher_lower_guess"] = None
+    state["guess_correct"] = None
+
+
+def next_task(state):
+    # Find a task that hasn't been completed yet
+    available_tasks = [task["id"] for task in tasks if task["id"] not in state["completed_tasks"]]
+    if available_tasks:
+        state["current_task"] = available_tasks[0]
+        anchoring_flow.fire(state, "next_task")
+        state["anchor"] = None
+        state["higher_lower_guess"] = None
+        state["guess_correct"] = None
+    else:
+        anchoring_flow.fire(state, "all_tasks_done")
+        state["current_task"] = None
+        state["higher_lower_guess"] = None
+        state["guess_correct"] = None
+
+
+def select_task(state, task_id):
+    state["current_task"] = task_id
+    anchoring_flow.fire(state, "select_task")
+
+
+def generate_anchor(state, rng=None):
+    task = tasks_dict[state["current_task"]]
+    state["anchor"] = anchor_design.generate_anchor(task, state["anchor_design"], rng)
+    anchoring_flow.fire(state, "generate_anchor")
+    return state["anchor"]
+
+
+def actual_comparison(actual_value, anchor):
+    """Return whether the actual value is "higher" or "lower" than the anchor."""
+    return "higher" if actual_value > anchor else "lower"
+
+
+def submit_guess(state, guess):
+    task = tasks_dict[state["current_task"]]
+    state["higher_lower_guess"] = guess
+    state["guess_correct"] = (guess == actual_comparison(task['actual_value'], state["anchor"]))
+    anchoring_flow.fire(state, "guess")
+
+
+def percentage_diff(estimate, actual_value):
+    """Absolute estimation error as a percentage of the actual value."""
+    return abs(estimate - actual_value) / actual_value * 100
+
+
+def anchor_pull(anchor, estimate, actual_value):
+    """How far the estimate moved from the actual value relative to the anchor's distance, capped at 1."""
+    if anchor != actual_value:
+        pull = abs(estimate - actual_value) / abs(anchor - actual_value)
+        return min(pull, 1.0)
+    return 0
+
+
+def classify_anchoring_effect(anchor, estimate, actual_value):
+    """Label an estimate's anchoring effect as "strong", "moderate" or "none"."""
+    distance_to_anchor = abs(estimate - anchor)
+    distance_to_actual = abs(estimate - actual_value)
+
+    if distance_to_anchor < distance_to_actual:
+        return "strong"
+    elif (anchor < actual_value and estimate < actual_value) or \
+         (anchor > actual_value and estimate > actual_value):
+        return "moderate"
+    return "none"
+
+
+def count_anchoring_effects(results):
+    """Count the strong, moderate and absent anchoring effects across results."""
+    counts = {"strong": 0, "moderate": 0, "none": 0}
+    for result in results:
+        counts[classify_anchoring_effect(result['anchor'], result['estimate'], result['actual_value'])] += 1
+    return counts["strong"], counts["moderate"], counts["none"]
+
+
+def score_estimate(task, anchor, estimate, higher_lower_guess=None, guess_correct=None,
+                   design=anchor_design.DEFAULT_DESIGN):
+    """Build the result record for an estimate made after seeing an anchor."""
+    return {
+        "task_id": task['id'],
+        "task": task['name'],
+        "anchor": anchor,
+        "actual_value": task['actual_value'],
+        "estimate": estimate,
+        "percentage_diff": percentage_diff(estimate, task['actual_value']),
+        "anchor_pull": anchor_pull(anchor, estimate, task['actual_value']),
+        "unit": task['unit'],
+        "higher_lower_guess": higher_lower_guess,
+        "guess_correct": guess_correct,
+        "anchor_design": design
+    }
+
+
+def submit_estimate(state, estimate):
+    """Score and record the estimate for the current task, replacing any earlier attempt."""
+    task = tasks_dict[state["current_task"]]
+    result = score_estimate(task, state["anchor"], estimate, state["higher_lower_guess"],
+                            state["guess_correct"], state["anchor_design"])
+
+    previous = find_result(state, task["id"])
+    state["results"] = [r for r in state["results"] if r["task_id"] != task["id"]]
+    state["results"].append(result)
+    state["completed_tasks"].add(task['id'])
+
+    # A retried task was already observed; the design's sums can't take an observation back out
+    if previous is None:
+        anchor_design.record_observation(task['id'], task['actual_value'], state["anchor"], estimate)
+    cohort.record_result("anchoring", result, replaces=previous)
+
+    anchoring_flow.fire(state, "submit_estimate")
+    return result
+
+
+def find_result(state, task_id):
+    return next((r for r in state["results"] if r["task_id"] == task_id), None)
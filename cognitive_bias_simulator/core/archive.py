@@ -0,0 +1,279 @@
+"""
+Columnar archive of pooled anchoring and framing results.
+
+An archive is a directory holding one raw, contiguous array file per
+result field plus manifest.json, which records the row count, each
+column's dtype and the code tables of the categorical columns. Readers
+open the columns with np.memmap, so a column is available without loading
+it and a slice of it is a view of the file; reductions run over chunks of
+rows, so memory use depends on the chunk size, not the archive size.
+
+Each row is one result. Fields that don't apply to a row's bias are
+missing: NaN in float columns, -1 in code columns. Archives are extended
+in place with the results stored since the last build.
+"""
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+from core import recovery
+
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+
+BIASES = ("anchoring", "framing")
+
+COLUMNS = {
+    "bias": "u1",
+    # Anchoring task id, or framing scenario id
+    "item": "u2",
+    "anchor": "f8",
+    "estimate": "f8",
+    "actual_value": "f8",
+    "experiment_type": "i1",
+    "frame_type": "i1",
+    "choice": "i1",
+    "rating": "i1",
+    # Seconds since the epoch
+    "timestamp": "i8"
+}
+
+MISSING = {"f8": np.nan, "i1": -1, "i8": -1}
+
+# Columns stored as codes, with the values each code stands for in the manifest
+CODED = ("bias", "item", "experiment_type", "frame_type", "choice")
+
+DEFAULT_CHUNK_ROWS = 1 << 20
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _new_manifest():
+    return {
+        "version": FORMAT_VERSION,
+        "rows": 0,
+        # Id of the last results store row archived
+        "last_id": 0,
+        "columns": dict(COLUMNS),
+        "codes": {name: list(BIASES) if name == "bias" else [] for name in CODED}
+    }
+
+
+def read_manifest(directory):
+    path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest["version"] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported archive version {manifest['version']} in {directory}")
+    return manifest
+
+
+def column_path(directory, name):
+    return os.path.join(directory, f"{name}.bin")
+
+
+def _timestamp(record, created):
+    if "timestamp" in record:
+        return int(datetime.strptime(record["timestamp"], TIMESTAMP_FORMAT).timestamp())
+    return int(created)
+
+
+class ArchiveWriter:
+    """
+    Appends results to an archive's column files.
+
+    Appended rows only become part of the archive when close() records
+    them in the manifest; bytes left past the manifest's row count by a
+    build that crashed are truncated the next time the archive is opened
+    for writing.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.manifest = read_manifest(directory) or _new_manifest()
+        self._codes = {name: {value: code for code, value in enumerate(values)}
+                       for name, values in self.manifest["codes"].items()}
+        self._files = {}
+        for name, dtype in COLUMNS.items():
+            f = open(column_path(directory, name), "ab")
+            f.truncate(self.manifest["rows"] * np.dtype(dtype).itemsize)
+            self._files[name] = f
+
+    def code(self, name, value):
+        """The code of a categorical value, adding it to the code table if it is new."""
+        codes = self._codes[name]
+        if value not in codes:
+            codes[value] = len(codes)
+            self.manifest["codes"][name].append(value)
+        return codes[value]
+
+    def append(self, rows):
+        """Append (id, bias, created, record) rows from ResultsStore.iter_batches; other biases are skipped."""
+        rows = [row for row in rows if row[1] in BIASES]
+        if not rows:
+            return 0
+        n = len(rows)
+        columns = {name: np.full(n, MISSING.get(dtype, 0), dtype=dtype) for name, dtype in COLUMNS.items()}
+
+        for i, (_, bias, created, record) in enumerate(rows):
+            columns["bias"][i] = self.code("bias", bias)
+            columns["timestamp"][i] = _timestamp(record, created)
+            if bias == "anchoring":
+                columns["item"][i] = self.code("item", record["task_id"])
+                columns["anchor"][i] = record["anchor"]
+                columns["estimate"][i] = record["estimate"]
+                columns["actual_value"][i] = record["actual_value"]
+            else:
+                columns["item"][i] = self.code("item", record["scenario_id"])
+                columns["experiment_type"][i] = self.code("experiment_type", record["experiment_type"])
+                columns["frame_type"][i] = self.code("frame_type", record["frame_type"])
+                if "user_choice" in record:
+                    columns["choice"][i] = self.code("choice", record["user_choice"])
+                else:
+                    columns["rating"][i] = record["user_rating"]
+
+        for name, values in columns.items():
+            self._files[name].write(values.tobytes())
+        self.manifest["rows"] += n
+        return n
+
+    def close(self, last_id=None):
+        """Flush the columns and record the new row count (and last archived store id) in the manifest."""
+        for f in self._files.values():
+            f.flush()
+            os.fsync(f.fileno())
+            f.close()
+        if last_id is not None:
+            self.manifest["last_id"] = last_id
+        path = os.path.join(self.directory, MANIFEST)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=1)
+        os.replace(path + ".tmp", path)
+
+
+def build(store, directory, batch_size=10000, progress=None):
+    """
+    Add the anchoring and framing results stored since the archive's last
+    build to it, creating it if needed, and return the number of rows added.
+    progress, if given, is called as progress(rows_added) after every batch.
+    """
+    writer = ArchiveWriter(directory)
+    last_id = writer.manifest["last_id"]
+    added = 0
+    try:
+        for rows in store.iter_batches(last_id, batch_size):
+            added += writer.append(rows)
+            last_id = rows[-1][0]
+            if progress is not None:
+                progress(added)
+    finally:
+        writer.close(last_id)
+    return added
+
+
+class Archive:
+    """A read-only view of an archive's columns as memory-mapped arrays."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.manifest = read_manifest(directory)
+        if self.manifest is None:
+            raise FileNotFoundError(f"No archive in {directory}")
+        rows = self.manifest["rows"]
+        self.columns = {}
+        for name, dtype in self.manifest["columns"].items():
+            # np.memmap can't map an empty file
+            self.columns[name] = np.memmap(column_path(directory, name), dtype=dtype, mode="r", shape=(rows,)) \
+                if rows else np.empty(0, dtype=dtype)
+
+    def __len__(self):
+        return self.manifest["rows"]
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def labels(self, name):
+        """The values of a coded column, indexed by code."""
+        return self.manifest["codes"][name]
+
+    def code(self, name, value):
+        """The code of a value in a coded column, or -1 if the archive has none."""
+        labels = self.labels(name)
+        return labels.index(value) if value in labels else -1
+
+    def chunks(self, names=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """Yield {column name: view} for consecutive chunks of up to chunk_rows rows."""
+        names = names or list(self.columns)
+        for start in range(0, len(self), chunk_rows):
+            yield {name: self.columns[name][start:start + chunk_rows] for name in names}
+
+
+def anchoring_stats(archive, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Per anchoring task: results, mean percentage difference, mean anchor
+    pull and the share of strong, moderate and no anchoring effects, as
+    rows of dicts.
+    """
+    bias = archive.code("bias", "anchoring")
+    items = len(archive.labels("item"))
+    totals = {name: np.zeros(items) for name in ("n", "percentage_diff", "anchor_pull", "none", "moderate", "strong")}
+
+    for chunk in archive.chunks(["bias", "item", "anchor", "estimate", "actual_value"], chunk_rows):
+        mask = chunk["bias"] == bias
+        item = chunk["item"][mask]
+        anchor, estimate, actual_value = chunk["anchor"][mask], chunk["estimate"][mask], chunk["actual_value"][mask]
+        totals["n"] += np.bincount(item, minlength=items)
+        totals["percentage_diff"] += np.bincount(item, np.abs(estimate - actual_value) / actual_value * 100, items)
+        totals["anchor_pull"] += np.bincount(item, recovery.anchor_pull(anchor, estimate, actual_value), items)
+        level = recovery.anchoring_effect_level(anchor, estimate, actual_value)
+        for name, value in recovery.EFFECT_LEVELS.items():
+            totals[name] += np.bincount(item, level == value, items)
+
+    rows = []
+    for code in np.flatnonzero(totals["n"]):
+        n = totals["n"][code]
+        rows.append({"task_id": archive.labels("item")[code], "results": int(n),
+                     **{name: totals[name][code] / n for name in totals if name != "n"}})
+    return rows
+
+
+def framing_stats(archive, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Per framing scenario and frame: results, mean rating (attribute and
+    goal framing) and the share choosing the sure option A (risk framing),
+    as rows of dicts.
+    """
+    bias = archive.code("bias", "framing")
+    choice_a = archive.code("choice", "A")
+    frames = max(1, len(archive.labels("frame_type")))
+    cells = len(archive.labels("item")) * frames
+    totals = {name: np.zeros(cells) for name in ("n", "rated", "rating", "chosen", "chose_a")}
+
+    for chunk in archive.chunks(["bias", "item", "frame_type", "choice", "rating"], chunk_rows):
+        mask = chunk["bias"] == bias
+        # One cell per (scenario, frame) pair
+        cell = chunk["item"][mask].astype(np.int64) * frames + chunk["frame_type"][mask]
+        rating, choice = chunk["rating"][mask], chunk["choice"][mask]
+        totals["n"] += np.bincount(cell, minlength=cells)
+        totals["rated"] += np.bincount(cell, rating >= 0, cells)
+        totals["rating"] += np.bincount(cell, np.where(rating >= 0, rating, 0), cells)
+        totals["chosen"] += np.bincount(cell, choice >= 0, cells)
+        totals["chose_a"] += np.bincount(cell, choice == choice_a, cells)
+
+    rows = []
+    for cell in np.flatnonzero(totals["n"]):
+        item, frame = divmod(int(cell), frames)
+        rated, chosen = totals["rated"][cell], totals["chosen"][cell]
+        rows.append({
+            "scenario_id": archive.labels("item")[item],
+            "frame_type": archive.labels("frame_type")[frame],
+            "results": int(totals["n"][cell]),
+            "mean_rating": totals["rating"][cell] / rated if rated else None,
+            "share_a": totals["chose_a"][cell] / chosen if chosen else None
+        })
+    return rows
@@ -0,0 +1,392 @@
+# Define the tasks for anchoring bias experiment
+tasks = [
+    {
+        "id": "budapest",
+        "name": "Population of Budapest",
+        "question": "What is the population of Budapest, Hungary?",
+        "actual_value": 1756000,  # Approximate population
+        "unit": "people",
+        "higher_lower_text": "The actual population is {} than the random number."
+    },
+    {
+        "id": "un_africa",
+        "name": "African Nations in UN",
+        "question": "What percentage of United Nations member states are African nations?",
+        "actual_value": 28,  # Approximate percentage
+        "unit": "%",
+        "higher_lower_text": "The actual percentage is {} than the random number."
+    },
+    {
+        "id": "dev_salary",
+        "name": "Software Engineer Salary",
+        "question": "What is the average annual salary of a software engineer in Germany?",
+        "actual_value": 65000,  # Approximate salary in EUR
+        "unit": "€",
+        "higher_lower_text": "The actual salary is {} than the random number."
+    },
+    {
+        "id": "earth_sun",
+        "name": "Earth-Sun Distance",
+        "question": "What is the average distance between Earth and the Sun in kilometers?",
+        "actual_value": 149600000,  # Approximate distance in km
+        "unit": "km",
+        "higher_lower_text": "The actual distance is {} than the random number."
+    },
+    {
+        "id": "amazon_length",
+        "name": "Length of Amazon River",
+        "question": "What is the length of the Amazon River in kilometers?",
+        "actual_value": 6400,  # Approximate length in km
+        "unit": "km",
+        "higher_lower_text": "The actual length is {} than the random number."
+    }
+]
+
+
+tasks_dict = {task["id"]: task for task in tasks}
+
+
+# Define confirmation bias scenario experiment
+scenarios = [
+    {
+        "id": "health_study",
+        "title": "Health Study Evaluation",
+        "description": "A new study has been published suggesting that coffee may help prevent certain diseases.",
+        "stance_question": "Are you a coffee drinker?",
+        "stance_options": ["I drink a lot of coffee", "I drink coffee occasionally", "I rarely drink coffee", "I never drink coffee"],
+        "hypothesis": "Coffee is beneficial for health",
+        "evidence": [
+            {
+                "id": "e1",
+                "text": "The study was funded by a major coffee industry association, creating a potential conflict of interest.",
+                "type_for_coffee_drinker": "contradicting",
+                "type_for_non_drinker": "supporting",
+                "explanation": "Financial conflicts of interest can bias research design and interpretation of results."
+            },
+            {
+                "id": "e2",
+                "text": "The study found that regular coffee drinkers had a 23% lower risk of heart disease compared to non-drinkers.",
+                "type_for_coffee_drinker": "supporting",
+                "type_for_non_drinker": "contradicting",
+                "explanation": "This is a clear, substantial health benefit that supports the hypothesis."
+            },
+            {
+                "id": "e3",
+                "text": "Three previous large-scale studies found no significant health benefits from coffee consumption.",
+                "type_for_coffee_drinker": "contradicting",
+                "type_for_non_drinker": "supporting",
+                "explanation": "This directly contradicts the current findings, suggesting they might not be reliable."
+            },
+            {
+                "id": "e4",
+                "text": "The researchers only found a correlation and stated clearly that they cannot prove coffee directly causes health benefits.",
+                "type_for_coffee_drinker": "contradicting",
+                "type_for_non_drinker": "supporting",
+                "explanation": "Without establishing causation, we cannot be sure coffee is responsible for any observed benefits."
+            },
+            {
+                "id": "e5",
+                "text": "Brain scans showed increased blood flow in cognitive regions after coffee consumption in a controlled sub-study.",
+                "type_for_coffee_drinker": "supporting",
+                "type_for_non_drinker": "contradicting",
+                "explanation": "This provides a potential biological mechanism for how coffee might improve health."
+            },
+            {
+                "id": "e6",
+                "text": "Participants who consumed more than 5 cups daily showed increased anxiety and sleep disturbances compared to moderate drinkers.",
+                "type_for_coffee_drinker": "contradicting",
+                "type_for_non_drinker": "supporting",
+                "explanation": "This suggests potential negative health effects at higher consumption levels."
+            },
+            {
+                "id": "e7",
+                "text": "When researchers controlled for age, smoking, exercise and diet, the positive association between coffee and health remained strong.",
+                "type_for_coffee_drinker": "supporting",
+                "type_for_non_drinker": "contradicting",
+                "explanation": "This methodological strength increases confidence that coffee itself is related to the health outcome."
+            },
+            {
+                "id": "e8",
+                "text": "The beneficial compounds in coffee identified in the study have been independently verified to have antioxidant properties in laboratory tests.",
+                "type_for_coffee_drinker": "supporting",
+                "type_for_non_drinker": "contradicting",
+                "explanation": "This provides additional scientific support for why coffee might have health benefits."
+            }
+        ]
+    },
+    {
+        "id": "political_policy",
+        "title": "Political Policy Evaluation",
+        "description": "A progressive politician from the left has proposed a new economic policy focused on increasing corporate taxation to fund expanded social programs.",
+        "stance_question": "What is your political leaning?",
+        "stance_options": ["Strongly liberal/left", "Moderately liberal/left", "Moderately conservative/right", "Strongly conservative/right"],
+        "hypothesis": "The proposed economic policy will benefit the country",
+        "evidence": [
+            {
+                "id": "e1",
+                "text": "The policy was implemented in three Nordic countries and resulted in measurable economic growth in all cases.",
+                "type_for_left": "supporting",
+                "type_for_right": "contradicting",
+                "explanation": "Real-world success in comparable situations suggests potential effectiveness, though contexts may differ."
+            },
+            {
+                "id": "e2",
+                "text": "A coalition of business leaders predict the policy would lead to job losses due to capital flight.",
+                "type_for_left": "contradicting",
+                "type_for_right": "supporting",
+                "explanation": "Business perspective suggests economic risks, though may represent self-interest."
+            },
+            {
+                "id": "e3",
+                "text": "Independent analysis shows the policy would cost 3 times more than initially proposed by its supporters.",
+                "type_for_left": "contradicting",
+                "type_for_right": "supporting",
+                "explanation": "Significantly higher costs affect feasibility and value proposition of the policy."
+            },
+            {
+                "id": "e4",
+                "text": "In regions where elements of this policy were tested, unemployment decreased by 12% within the first year.",
+                "type_for_left": "supporting",
+                "type_for_right": "contradicting",
+                "explanation": "Early testing provides concrete evidence of positive economic impact."
+            },
+            {
+                "id": "e5",
+                "text": "Computer modeling by the Federal Reserve predicts the policy would initially slow economic growth for 3-5 years before any benefits appear.",
+                "type_for_left": "contradicting",
+                "type_for_right": "supporting",
+                "explanation": "Significant negative short-term impact could outweigh potential long-term benefits."
+            },
+            {
+                "id": "e6",
+                "text": "A detailed implementation plan shows how the policy could be funded without increasing the national deficit.",
+                "type_for_left": "supporting",
+                "type_for_right": "contradicting",
+                "explanation": "Financial sustainability strengthens the case for the policy's overall value."
+            }
+        ]
+    },
+    {
+        "id": "product_review",
+        "title": "Product Purchase Decision",
+        "description": "You're considering buying a smartphone from Apple.",
+        "stance_question": "What has been your experience with Apple products?",
+        "stance_options": ["Very positive experiences", "Somewhat positive experiences", "Mixed experiences", "Somewhat negative experiences", "Very negative experiences", "No prior experience"],
+        "hypothesis": "The new Apple smartphone is a good purchase",
+        "evidence": [
+            {
+                "id": "e1",
+                "text": "The phone has received mixed reviews from tech experts.",
+                "type_for_positive": "contradicting",
+                "type_for_negative": "supporting",
+                "type_for_neutral": "neutral",
+                "explanation": "Expert opinions are divided, suggesting some potential concerns."
+            },
+            {
+                "id": "e2",
+                "text": "The battery life is shorter than competing models.",
+                "type_for_positive": "contradicting",
+                "type_for_negative": "supporting",
+                "type_for_neutral": "contradicting",
+                "explanation": "Inferior battery performance could affect daily usability."
+            },
+            {
+                "id": "e3",
+                "text": "Apple is offering a significant discount on this model.",
+                "type_for_positive": "supporting",
+                "type_for_negative": "contradicting",
+                "type_for_neutral": "supporting",
+                "explanation": "Good price may improve value proposition, though could indicate clearing stock."
+            },
+            {
+                "id": "e4",
+                "text": "Your friend who bought this phone is very satisfied with it.",
+                "type_for_positive": "supporting",
+                "type_for_negative": "contradicting",
+                "type_for_neutral": "supporting",
+                "explanation": "Personal recommendation from someone you trust, though represents only one experience."
+            },
+            {
+                "id": "e5",
+                "text": "Customer reviews mention the phone occasionally freezes.",
+                "type_for_positive": "contradicting",
+                "type_for_negative": "supporting",
+                "type_for_neutral": "contradicting",
+                "explanation": "Reported technical issues could affect user experience."
+            },
+            {
+                "id": "e6",
+                "text": "The phone's camera received awards for quality.",
+                "type_for_positive": "supporting",
+                "type_for_negative": "contradicting",
+                "type_for_neutral": "supporting",
+                "explanation": "Recognized excellence in a key feature for many users."
+            }
+        ]
+    }
+]
+
+scenarios_dict = {scenario["id"]: scenario for scenario in scenarios}
+
+
+# Define experiment scenarios for risk/choice framing (classic gain vs loss)
+risk_scenarios = [
+    {
+        "id": "disease_problem",
+        "title": "Public Health Decision",
+        "description": "Imagine a rare disease outbreak is expected to kill 600 people if no action is taken.",
+        "positive_frame": {
+            "option_a": "Program A: 200 people will be saved.",
+            "option_b": "Program B: 1/3 probability that 600 people will be saved, and 2/3 probability that no people will be saved."
+        },
+        "negative_frame": {
+            "option_a": "Program A: 400 people will die.",
+            "option_b": "Program B: 1/3 probability that nobody will die, and 2/3 probability that 600 people will die."
+        },
+        "explanation": "This is the classic 'Asian Disease Problem' from Tversky and Kahneman's research. People tend to be risk-averse when outcomes are framed as gains (positive frame) and risk-seeking when outcomes are framed as losses (negative frame), even though the actual outcomes are identical."
+    },
+    {
+        "id": "cancer_treatment",
+        "title": "Medical Treatment Decision",
+        "description": "As a doctor, you need to recommend a treatment option to a patient with cancer.",
+        "positive_frame": {
+            "option_a": "Treatment A: 50% survival rate after five years.",
+            "option_b": "Treatment B: All patients survive the first year, but only 10% survive after five years."
+        },
+        "negative_frame": {
+            "option_a": "Treatment A: 50% mortality rate after five years.",
+            "option_b": "Treatment B: No patients die in the first year, but 90% die after five years."
+        },
+        "explanation": "Medical decisions are highly susceptible to framing effects. The same treatment outcomes can seem more or less appealing depending on whether they are framed in terms of survival (positive) or mortality (negative)."
+    },
+    {
+        "id": "evacuation_plan",
+        "title": "Emergency Evacuation Plan",
+        "description": "As an emergency manager, you must recommend an evacuation plan for a town of 1,000 residents threatened by an approaching hurricane.",
+        "positive_frame": {
+            "option_a": "Plan A: 400 residents will safely evacuate.",
+            "option_b": "Plan B: 40% chance that all 1,000 residents will safely evacuate, and 60% chance that no residents will safely evacuate."
+        },
+        "negative_frame": {
+            "option_a": "Plan A: 600 residents will not safely evacuate.",
+            "option_b": "Plan B: 40% chance that no residents will fail to evacuate safely, and 60% chance that all 1,000 residents will fail to evacuate safely."
+        },
+        "explanation": "In emergency situations, how the potential outcomes are framed can significantly influence both decision-makers and the public. The same evacuation plan might be perceived differently depending on whether the focus is on lives saved or lives lost."
+    }
+]
+
+# Define scenarios for attribute framing (product rating experiment)
+attribute_scenarios = [
+    {
+        "id": "ground_beef",
+        "title": "Ground Beef Evaluation",
+        "description": "You're considering buying this ground beef for a family barbecue.",
+        "positive_frame": "This ground beef is 80% lean.",
+        "negative_frame": "This ground beef contains 20% fat.",
+        "rating_question": "How would you rate the quality of this product?",
+        "explanation": "This is a classic example of attribute framing. The same product described as '80% lean' is typically rated more favorably than when it's described as '20% fat', even though these statements are logically equivalent."
+    },
+    {
+        "id": "medical_procedure",
+        "title": "Medical Procedure Evaluation",
+        "description": "You're considering undergoing an elective medical procedure.",
+        "positive_frame": "This procedure has a 90% success rate.",
+        "negative_frame": "This procedure has a 10% failure rate.",
+        "rating_question": "How likely would you be to undergo this procedure?",
+        "explanation": "Medical statistics presented in a positive frame (success rate) are usually perceived as more favorable and lead to higher consent rates than when presented in a negative frame (failure rate), despite being mathematically identical."
+    },
+    {
+        "id": "battery_life",
+        "title": "Smartphone Battery Evaluation",
+        "description": "You're considering buying this new smartphone model.",
+        "positive_frame": "This smartphone retains 70% of its battery capacity after 2 years of use.",
+        "negative_frame": "This smartphone loses 30% of its battery capacity after 2 years of use.",
+        "rating_question": "How would you rate the battery performance of this smartphone?",
+        "explanation": "Technical specifications can be framed to emphasize either positive or negative aspects. The same battery performance described in terms of 'capacity retained' sounds better than when described in terms of 'capacity lost.'"
+    },
+    {
+        "id": "customer_satisfaction",
+        "title": "Customer Service Evaluation",
+        "description": "You're considering signing up with this internet service provider.",
+        "positive_frame": "This internet service provider has an 85% customer satisfaction rate.",
+        "negative_frame": "This internet service provider has a 15% customer dissatisfaction rate.",
+        "rating_question": "How would you rate the quality of this company's customer service?",
+        "explanation": "Service quality metrics framed positively (satisfaction rate) typically elicit more favorable evaluations than when framed negatively (dissatisfaction rate), influencing customer acquisition decisions."
+    }
+]
+
+# Define scenarios for goal framing (investment decision experiment)
+goal_scenarios = [
+    {
+        "id": "retirement_saving",
+        "title": "Retirement Savings Decision",
+        "description": "You're deciding whether to increase your monthly retirement savings contribution.",
+        "gain_frame": "By increasing your retirement savings now, you could gain an additional $240,000 in your retirement fund by age 65.",
+        "loss_frame": "By not increasing your retirement savings now, you could lose out on an additional $240,000 in your retirement fund by age 65.",
+        "neutral_frame": "Increasing your retirement savings now would change your retirement fund by an additional $240,000 by age 65.",
+        "question": "How likely are you to increase your retirement savings contribution?",
+        "explanation": "When it comes to long-term financial decisions, emphasizing the potential losses from inaction (loss frame) often motivates stronger action than emphasizing potential gains or neutral statements, despite the identical financial outcomes."
+    },
+    {
+        "id": "energy_efficient",
+        "title": "Energy Efficient Appliance Purchase",
+        "description": "You're considering replacing your old refrigerator with a more energy-efficient model that costs $200 more upfront.",
+        "gain_frame": "By purchasing the energy-efficient refrigerator, you'll gain $50 in savings each year on your electricity bill.",
+        "loss_frame": "By not purchasing the energy-efficient refrigerator, you'll lose $50 each year on your electricity bill.",
+        "neutral_frame": "The energy-efficient refrigerator would change your electricity bill by $50 each year.",
+        "question": "How likely are you to purchase the energy-efficient refrigerator?",
+        "explanation": "Environmental and efficiency decisions are often influenced by framing. Emphasizing ongoing losses tends to be more motivating than emphasizing equivalent gains, influencing consumer purchasing behavior for energy-efficient products."
+    },
+    {
+        "id": "health_screening",
+        "title": "Health Screening Decision",
+        "description": "You're deciding whether to schedule a recommended preventive health screening that will take 2 hours and cost $50 after insurance.",
+        "gain_frame": "By getting this screening, you increase your chance of early detection and successful treatment if a problem exists.",
+        "loss_frame": "By skipping this screening, you decrease your chance of early detection and successful treatment if a problem exists.",
+        "neutral_frame": "This screening affects your chance of early detection and successful treatment if a problem exists.",
+        "question": "How likely are you to schedule the health screening?",
+        "explanation": "Health promotion messages are significantly influenced by framing. Loss-framed messages (emphasizing risks of not acting) are often more effective for detection behaviors like screenings, while gain-framed messages can be more effective for prevention behaviors."
+    }
+]
+
+# Create dictionaries for easy scenario lookup by ID
+risk_dict = {scenario["id"]: scenario for scenario in risk_scenarios}
+attribute_dict = {scenario["id"]: scenario for scenario in attribute_scenarios}
+goal_dict = {scenario["id"]: scenario for scenario in goal_scenarios}
+
+# Frame types each framing experiment randomly assigns from
+frame_types = {
+    "risk": ["positive", "negative"],
+    "attribute": ["positive", "negative"],
+    "goal": ["gain", "loss", "neutral"]
+}
+
+framing_scenarios = {
+    "risk": risk_scenarios,
+    "attribute": attribute_scenarios,
+    "goal": goal_scenarios
+}
+
+framing_dicts = {
+    "risk": risk_dict,
+    "attribute": attribute_dict,
+    "goal": goal_dict
+}
+
+# Reference results from the classical studies shown next to the user's response:
+# percentage choosing each option for risk framing, average 1-10 ratings otherwise
+classical_findings = {
+    "risk": {
+        'positive': {'A': 72, 'B': 28},
+        'negative': {'A': 22, 'B': 78}
+    },
+    "attribute": {
+        'positive': 7.2,
+        'negative': 5.1
+    },
+    "goal": {
+        'gain': 6.4,
+        'loss': 7.3,
+        'neutral': 5.9
+    }
+}
@@ -0,0 +1,179 @@
+import threading
+from array import array
+from bisect import bisect_left, bisect_right, insort
+
+from core import results_store, sketch
+
+# Percentiles are only reported once a cohort has this many results
+MIN_COHORT_SIZE = 5
+
+# Up to this many new values are inserted one by one instead of re-sorting
+INSORT_LIMIT = 32
+
+
+class SortedDistribution:
+    """
+    The values of one cohort metric, kept sorted for O(log n) percentile lookups.
+
+    New values go to an unsorted buffer that is merged into the sorted array
+    on the next lookup, so recording a result stays O(1) and a burst of
+    results costs a single merge. The merge copies the sorted array across
+    in blocks between the new values' insertion points, so only the new
+    values pass through Python.
+    """
+
+    def __init__(self):
+        self._sorted = array("d")
+        self._pending = array("d")
+        self.total = 0.0
+
+    def __len__(self):
+        return len(self._sorted) + len(self._pending)
+
+    def add(self, value):
+        self._pending.append(value)
+        self.total += value
+
+    def remove(self, value):
+        """Take one occurrence of value out, if there is one."""
+        index = bisect_left(self._sorted, value)
+        if index < len(self._sorted) and self._sorted[index] == value:
+            del self._sorted[index]
+        elif value in self._pending:
+            self._pending.remove(value)
+        else:
+            return
+        self.total -= value
+
+    def _merge(self):
+        if not self._pending:
+            return
+        if len(self._pending) <= INSORT_LIMIT:
+            # A few values are cheaper to insert in place than to copy everything
+            for value in self._pending:
+                insort(self._sorted, value)
+        else:
+            merged = array("d")
+            start = 0
+            for value in sorted(self._pending):
+                end = bisect_right(self._sorted, value, start)
+                merged.extend(self._sorted[start:end])
+                merged.append(value)
+                start = end
+            merged.extend(self._sorted[start:])
+            self._sorted = merged
+        self._pending = array("d")
+
+    def percentile(self, value):
+        """Percentage of values below value, counting ties as half below."""
+        self._merge()
+        below = bisect_left(self._sorted, value)
+        at_or_below = bisect_right(self._sorted, value)
+        return 100 * (below + at_or_below) / 2 / len(self._sorted)
+
+    def mean(self):
+        return self.total / len(self) if len(self) else None
+
+
+_cohorts = {}
+_lock = threading.Lock()
+
+
+def metric_values(bias, result):
+    """The (cohort key, value) pairs a result record contributes to."""
+    if bias == "anchoring":
+        return [(("anchor_pull", result["task_id"]), result["anchor_pull"])]
+    if bias == "confirmation":
+        return [(("confirming_bias_score", result["scenario_id"]), result["confirming_bias_score"])]
+    if bias == "framing":
+        key = (result["scenario_id"], result["frame_type"])
+        if result["experiment_type"] == "risk":
+            # 1 for the sure option, so the mean is the share choosing it
+            return [(("framing_choice",) + key, 1.0 if result["user_choice"] == "A" else 0.0)]
+        return [(("framing_rating",) + key, result["user_rating"])]
+    return []
+
+
+def sketch_values(bias, result):
+    """Values summarised only by sketches, since no page ranks participants on them."""
+    if bias == "anchoring":
+        return [(("percentage_diff", result["task_id"]), result["percentage_diff"])]
+    return []
+
+
+def _add(values):
+    with _lock:
+        for key, value in values:
+            if key not in _cohorts:
+                _cohorts[key] = SortedDistribution()
+            _cohorts[key].add(value)
+
+
+def record_result(bias, result, replaces=None):
+    """
+    Add a newly submitted result to the cohort distributions and sketches.
+
+    replaces is the participant's earlier result this one supersedes (a
+    retried task, a re-rated scenario), whose values are taken out of the
+    distributions so the participant is only counted once. Sketches can't
+    forget a value, so they keep the earlier result instead of adding this one.
+    """
+    if replaces is None:
+        _add(metric_values(bias, result))
+        record_sketches(bias, result)
+        return
+    with _lock:
+        for key, value in metric_values(bias, replaces):
+            if key in _cohorts:
+                _cohorts[key].remove(value)
+    _add(metric_values(bias, result))
+
+
+def record_sketches(bias, result):
+    """Add a result to the sketches only, whose memory stays bounded however many are added."""
+    for key, value in metric_values(bias, result) + sketch_values(bias, result):
+        sketch.record_value(key, value)
+
+
+def load_results(store):
+    """Add every result already in a results store to the cohorts."""
+    # Stored results are already part of the stored sketches, which sketch.load() reads
+    for bias in ("anchoring", "confirmation", "framing"):
+        # Every attempt is stored; as when they were submitted, only a
+        # session's latest attempt at a task or scenario counts. Only the
+        # values are kept while reading, not the records.
+        latest = {}
+        for session_id, result in store.iter_records(bias, with_session=True):
+            key = results_store.attempt_key(bias, session_id, result)
+            if key is None:
+                _add(metric_values(bias, result))
+            else:
+                latest[key] = metric_values(bias, result)
+        for values in latest.values():
+            _add(values)
+
+
+def percentile(key, value):
+    """(percentile, cohort size) of a value, or None while the cohort is too small."""
+    with _lock:
+        distribution = _cohorts.get(key)
+        if distribution is None or len(distribution) < MIN_COHORT_SIZE:
+            return None
+        return distribution.percentile(value), len(distribution)
+
+
+def mean(key):
+    """(mean, cohort size), or None while the cohort is too small."""
+    with _lock:
+        distribution = _cohorts.get(key)
+        if distribution is None or len(distribution) < MIN_COHORT_SIZE:
+            return None
+        return distribution.mean(), len(distribution)
+
+
+def reset(key=None):
+    with _lock:
+        if key is None:
+            _cohorts.clear()
+        else:
+            _cohorts.pop(key, None)
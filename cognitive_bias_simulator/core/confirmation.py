@@ -0,0 +1,247 @@
+import random
+from datetime import datetime
+from functools import lru_cache
+
+from core import cohort, sketch
+from core.catalogs import scenarios_dict
+from core.flow import confirmation_flow
+from core.wason import WasonSession
+
+# Phrases accepted as a correct statement of the Wason 2-4-6 rule
+CORRECT_RULE_PHRASES = ["ascending", "increasing", "goes up", "greater than", ">", "higher"]
+
+
+def init_state(state):
+    if 'bias_type' not in state:
+        state["bias_type"] = None
+
+    if 'wason_session' not in state:
+        state["wason_session"] = WasonSession()
+
+    if 'scenario_selected' not in state:
+        state["scenario_selected"] = None
+    if 'evidence_ratings' not in state:
+        state["evidence_ratings"] = {}
+    if 'confirming_bias_score' not in state:
+        state["confirming_bias_score"] = 0
+
+    if 'user_stance' not in state:
+        state["user_stance"] = {}
+    if 'stance_strength' not in state:
+        state["stance_strength"] = {}
+
+
+def reset_wason_task(state):
+    """Reset the Wason task state."""
+    state["wason_session"] = WasonSession()
+
+
+def reset_scenario_task(state):
+    """Reset the scenario task state."""
+    # The stance given for a scenario is kept, so retrying it goes straight to the ratings
+    state["scenario_selected"] = None
+    state["evidence_ratings"] = {}
+    state["confirming_bias_score"] = 0
+
+
+def reset_all(state):
+    state["bias_type"] = None
+    reset_wason_task(state)
+    reset_scenario_task(state)
+    state["user_stance"] = {}
+    state["stance_strength"] = {}
+
+
+def is_correct_rule_guess(rule_guess):
+    """Check whether a guessed rule describes ascending numbers."""
+    return any(phrase in rule_guess.lower() for phrase in CORRECT_RULE_PHRASES)
+
+
+def submit_rule_guess(state, rule_guess):
+    state["wason_session"].rule_guesses.append(rule_guess)
+    correct = is_correct_rule_guess(rule_guess)
+    if correct:
+        sketch.record_value(("wason_tests_to_solve",), len(state["wason_session"]))
+    confirmation_flow.fire(state, "guess_correct" if correct else "guess_incorrect")
+    return correct
+
+
+# Helper function to determine evidence type based on user's stance
+def get_evidence_type(evidence, scenario_id, user_stance):
+    """Determine if evidence is supporting or contradicting based on user's stance"""
+
+    # For political policy scenario
+    if scenario_id == "political_policy":
+        if "liberal/left" in user_stance:
+            return evidence.get("type_for_left", "neutral")
+        else:  # conservative/right
+            return evidence.get("type_for_right", "neutral")
+
+    # For health study (coffee) scenario
+    elif scenario_id == "health_study":
+        if "a lot of coffee" in user_stance or "coffee occasionally" in user_stance:
+            return evidence.get("type_for_coffee_drinker", "neutral")
+        else:  # Rarely or never drinks coffee
+            return evidence.get("type_for_non_drinker", "neutral")
+
+    # For product review (Apple) scenario
+    elif scenario_id == "product_review":
+        if "Very positive" in user_stance or "Somewhat positive" in user_stance:
+            return evidence.get("type_for_positive", "neutral")
+        elif "negative" in user_stance:
+            return evidence.get("type_for_negative", "neutral")
+        else:  # Mixed or no experience
+            return evidence.get("type_for_neutral", "neutral")
+
+    # For other scenarios or fallback
+    else:
+        return evidence.get("type", "neutral")
+
+
+@lru_cache(maxsize=None)
+def get_shuffled_evidence(scenario_id):
+    """Return the scenario's evidence in its fixed shuffled display order."""
+    evidence_copy = scenarios_dict[scenario_id]["evidence"].copy()
+    random.Random(42).shuffle(evidence_copy)
+    return tuple(evidence_copy)
+
+
+@lru_cache(maxsize=None)
+def get_evidence_types(scenario_id, user_stance):
+    """Map each evidence id of a scenario to its type for the given stance."""
+    return {
+        evidence["id"]: get_evidence_type(evidence, scenario_id, user_stance)
+        for evidence in scenarios_dict[scenario_id]["evidence"]
+    }
+
+
+def update_evidence_ratings(evidence_ratings, scenario_id, user_stance, ratings):
+    """Store submitted ratings, touching only the entries whose rating changed."""
+    evidence_types = get_evidence_types(scenario_id, user_stance)
+    for evidence_id, rating in ratings.items():
+        key = f"{scenario_id}_{evidence_id}"
+        entry = evidence_ratings.get(key)
+        if entry is None or entry["rating"] != rating:
+            evidence_ratings[key] = {
+                "rating": rating,
+                "type": evidence_types[evidence_id]
+            }
+
+
+def confirming_bias_score(evidence_ratings, scenario_id):
+    """Average rating of supporting evidence minus that of contradicting evidence."""
+    supporting_ratings = []
+    contradicting_ratings = []
+
+    for key, data in evidence_ratings.items():
+        if key.startswith(scenario_id):
+            if data["type"] == "supporting":
+                supporting_ratings.append(data["rating"])
+            elif data["type"] == "contradicting":
+                contradicting_ratings.append(data["rating"])
+
+    avg_supporting = sum(supporting_ratings) / len(supporting_ratings) if supporting_ratings else 0
+    avg_contradicting = sum(contradicting_ratings) / len(contradicting_ratings) if contradicting_ratings else 0
+
+    return avg_supporting - avg_contradicting
+
+
+def classify_confirming_bias(score):
+    """Label a confirmation bias score as "strong", "moderate", "minimal" or "reverse"."""
+    if score > 3:
+        return "strong"
+    elif score > 1:
+        return "moderate"
+    elif score > -1:
+        return "minimal"
+    return "reverse"
+
+
+def select_scenario(state, scenario_id):
+    state["scenario_selected"] = scenario_id
+    confirmation_flow.fire(state, "select_scenario")
+
+
+def submit_stance(state, scenario_id, stance, strength):
+    state["user_stance"][scenario_id] = stance
+    state["stance_strength"][scenario_id] = strength
+
+
+def submit_ratings(state, scenario_id, ratings):
+    """Record a scenario's evidence ratings and score them."""
+    previous = None
+    if scenario_ratings(state["evidence_ratings"], scenario_id):
+        # Rating a scenario again replaces its earlier score in the cohort
+        previous = {"scenario_id": scenario_id,
+                    "confirming_bias_score": confirming_bias_score(state["evidence_ratings"], scenario_id)}
+    update_evidence_ratings(state["evidence_ratings"], scenario_id, state["user_stance"][scenario_id], ratings)
+    state["confirming_bias_score"] = confirming_bias_score(state["evidence_ratings"], scenario_id)
+    cohort.record_result("confirmation", scenario_result(state, scenario_id), replaces=previous)
+    confirmation_flow.fire(state, "submit_ratings")
+    return state["confirming_bias_score"]
+
+
+def make_scenario_result(scenario_id, stance, stance_strength, score, timestamp=None, ratings=None):
+    """
+    Build the result record for a scored evidence evaluation scenario.
+
+    ratings, if given, maps evidence ids to the participant's ratings and is
+    kept in the record so reports can redraw the evidence chart.
+    """
+    if timestamp is None:
+        timestamp = datetime.now()
+    result = {
+        "scenario_id": scenario_id,
+        "scenario_title": scenarios_dict[scenario_id]["title"],
+        "stance": stance,
+        "stance_strength": stance_strength,
+        "confirming_bias_score": score,
+        "confirming_bias": classify_confirming_bias(score),
+        "timestamp": timestamp.strftime("%Y-%m-%d %H:%M:%S")
+    }
+    if ratings is not None:
+        result["ratings"] = ratings
+    return result
+
+
+def scenario_ratings(evidence_ratings, scenario_id):
+    """A scenario's ratings by evidence id, from the session's evidence_ratings."""
+    ratings = {}
+    for evidence in scenarios_dict[scenario_id]["evidence"]:
+        entry = evidence_ratings.get(f"{scenario_id}_{evidence['id']}")
+        if entry is not None:
+            ratings[evidence["id"]] = entry["rating"]
+    return ratings
+
+
+def scenario_result(state, scenario_id):
+    return make_scenario_result(scenario_id, state["user_stance"][scenario_id],
+                                state["stance_strength"].get(scenario_id), state["confirming_bias_score"],
+                                ratings=scenario_ratings(state["evidence_ratings"], scenario_id))
+
+
+def group_evidence_ratings(scenario_id, stance, ratings):
+    """
+    Group a scenario's rated evidence into supporting, contradicting and
+    neutral, each as (ratings, shortened evidence texts) in display order.
+    """
+    evidence_types = get_evidence_types(scenario_id, stance)
+    grouped = {
+        "supporting": ([], []),
+        "contradicting": ([], []),
+        "neutral": ([], [])
+    }
+
+    for evidence in scenarios_dict[scenario_id]["evidence"]:
+        if evidence["id"] in ratings:
+            short_text = evidence["text"][:50] + "..." if len(evidence["text"]) > 50 else evidence["text"]
+
+            evidence_type = evidence_types[evidence["id"]]
+            if evidence_type not in ("supporting", "contradicting"):
+                evidence_type = "neutral"
+
+            group_ratings, texts = grouped[evidence_type]
+            group_ratings.append(ratings[evidence["id"]])
+            texts.append(short_text)
+
+    return grouped
@@ -0,0 +1,187 @@
+from collections import deque
+from enum import Enum
+
+
+class Stage(str, Enum):
+    """Every page of the app; the values are the strings kept in state["stage"]."""
+    INTRO = "intro"
+    BIAS_INTRO = "bias_intro"
+
+    # Anchoring
+    TASK_SELECTION = "task_selection"
+    GENERATE_ANCHOR = "generate_anchor"
+    SHOW_ANCHOR = "show_anchor"
+    SHOW_GUESS_RESULT = "show_guess_result"
+    ESTIMATE = "estimate"
+    TASK_RESULT = "task_result"
+    ALL_RESULTS = "all_results"
+
+    # Confirmation
+    WASON_INTRO = "wason_intro"
+    WASON_TASK = "wason_task"
+    WASON_SUCCESS = "wason_success"
+    WASON_INCORRECT = "wason_incorrect"
+    SCENARIO_SELECTION = "scenario_selection"
+    SCENARIO_TASK = "scenario_task"
+    SCENARIO_RESULTS = "scenario_results"
+
+    # Framing
+    FRAMING_TYPE_SELECTION = "framing_type_selection"
+    FRAMING_SCENARIO_SELECTION = "framing_scenario_selection"
+    FRAMING_EXPERIMENT = "framing_experiment"
+    FRAMING_RESULT = "framing_result"
+    FRAMING_ALL_RESULTS = "framing_all_results"
+
+
+# Source used for transitions that are allowed from any stage of a flow
+ANY = None
+
+
+class InvalidTransition(ValueError):
+    pass
+
+
+class StageMachine:
+    """
+    Table-driven stage flow.
+
+    transitions maps (source stage, event) to the target stage; a source of
+    ANY makes the event valid from every stage of the flow. Hooks are called
+    as hook(machine, state, source, event, target) after each transition.
+    """
+
+    def __init__(self, name, initial, transitions, stages=None):
+        self.name = name
+        self.initial = initial
+        self.transitions = dict(transitions)
+        if stages is None:
+            stages = {initial}
+            for (source, _), target in self.transitions.items():
+                if source is not ANY:
+                    stages.add(source)
+                stages.add(target)
+        self.stages = frozenset(stages)
+        self.hooks = []
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def target(self, source, event):
+        target = self.transitions.get((source, event))
+        if target is None:
+            target = self.transitions.get((ANY, event))
+        return target
+
+    def fire(self, state, event):
+        """Apply an event to state["stage"] and return the new stage."""
+        try:
+            source = Stage(state["stage"])
+        except ValueError:
+            # Unknown stages can still take the flow's ANY transitions
+            source = ANY
+        target = self.target(source, event)
+        if target is None:
+            raise InvalidTransition(f"{self.name}: no transition for '{event}' from '{state['stage']}'")
+
+        state["stage"] = target.value
+        for hook in self.hooks:
+            hook(self, state, source, event, target)
+        return target
+
+    def events(self, source):
+        """Events that are valid from a stage."""
+        return sorted({event for (s, event) in self.transitions if s == source or s is ANY})
+
+    def reachable_stages(self, start=None):
+        start = self.initial if start is None else start
+        seen = {start}
+        queue = deque([start])
+        while queue:
+            source = queue.popleft()
+            for event in self.events(source):
+                target = self.target(source, event)
+                if target not in seen:
+                    seen.add(target)
+                    queue.append(target)
+        return seen
+
+    def unreachable_stages(self):
+        """Stages of the flow that no sequence of events leads to from the initial stage."""
+        return self.stages - self.reachable_stages()
+
+
+def _edges(sources, event, target):
+    return {(source, event): target for source in sources}
+
+
+main_flow = StageMachine("main", Stage.INTRO, {
+    (Stage.INTRO, "explore"): Stage.BIAS_INTRO,
+    (ANY, "main_menu"): Stage.INTRO,
+}, stages={Stage.INTRO, Stage.BIAS_INTRO})
+
+anchoring_flow = StageMachine("anchoring", Stage.BIAS_INTRO, {
+    (Stage.BIAS_INTRO, "start"): Stage.TASK_SELECTION,
+    (Stage.TASK_SELECTION, "select_task"): Stage.GENERATE_ANCHOR,
+    (Stage.TASK_SELECTION, "view_results"): Stage.ALL_RESULTS,
+    (Stage.GENERATE_ANCHOR, "generate_anchor"): Stage.SHOW_ANCHOR,
+    (Stage.SHOW_ANCHOR, "guess"): Stage.ESTIMATE,
+    (Stage.SHOW_GUESS_RESULT, "continue"): Stage.ESTIMATE,
+    (Stage.ESTIMATE, "submit_estimate"): Stage.TASK_RESULT,
+    (Stage.TASK_RESULT, "retry"): Stage.GENERATE_ANCHOR,
+    (Stage.TASK_RESULT, "next_task"): Stage.GENERATE_ANCHOR,
+    (Stage.TASK_RESULT, "all_tasks_done"): Stage.TASK_SELECTION,
+    (ANY, "back_to_tasks"): Stage.TASK_SELECTION,
+    (ANY, "main_menu"): Stage.INTRO,
+})
+
+confirmation_flow = StageMachine("confirmation", Stage.BIAS_INTRO, {
+    (Stage.BIAS_INTRO, "wason"): Stage.WASON_INTRO,
+    (Stage.BIAS_INTRO, "scenarios"): Stage.SCENARIO_SELECTION,
+    (Stage.WASON_INTRO, "begin"): Stage.WASON_TASK,
+    (Stage.WASON_TASK, "guess_correct"): Stage.WASON_SUCCESS,
+    (Stage.WASON_TASK, "guess_incorrect"): Stage.WASON_INCORRECT,
+    (Stage.WASON_INCORRECT, "continue"): Stage.WASON_TASK,
+    (Stage.WASON_INCORRECT, "give_up"): Stage.WASON_SUCCESS,
+    (Stage.WASON_SUCCESS, "retry"): Stage.WASON_INTRO,
+    (Stage.SCENARIO_SELECTION, "select_scenario"): Stage.SCENARIO_TASK,
+    (Stage.SCENARIO_TASK, "submit_ratings"): Stage.SCENARIO_RESULTS,
+    (Stage.SCENARIO_RESULTS, "wason"): Stage.WASON_INTRO,
+    **_edges([Stage.WASON_INTRO, Stage.SCENARIO_SELECTION], "back", Stage.BIAS_INTRO),
+    **_edges([Stage.SCENARIO_TASK, Stage.SCENARIO_RESULTS], "back_to_scenarios", Stage.SCENARIO_SELECTION),
+    (ANY, "main_menu"): Stage.INTRO,
+})
+
+framing_flow = StageMachine("framing", Stage.BIAS_INTRO, {
+    (Stage.BIAS_INTRO, "start"): Stage.FRAMING_TYPE_SELECTION,
+    (Stage.FRAMING_TYPE_SELECTION, "select_type"): Stage.FRAMING_SCENARIO_SELECTION,
+    (Stage.FRAMING_SCENARIO_SELECTION, "select_scenario"): Stage.FRAMING_EXPERIMENT,
+    (Stage.FRAMING_EXPERIMENT, "submit_response"): Stage.FRAMING_RESULT,
+    **_edges([Stage.FRAMING_EXPERIMENT, Stage.FRAMING_RESULT], "back_to_scenarios", Stage.FRAMING_SCENARIO_SELECTION),
+    **_edges([Stage.FRAMING_TYPE_SELECTION, Stage.FRAMING_RESULT], "view_results", Stage.FRAMING_ALL_RESULTS),
+    (ANY, "back_to_types"): Stage.FRAMING_TYPE_SELECTION,
+    (ANY, "main_menu"): Stage.INTRO,
+})
+
+flows = {
+    "anchoring": anchoring_flow,
+    "confirmation": confirmation_flow,
+    "framing": framing_flow
+}
+
+
+def add_transition_hook(hook):
+    """Register a hook on every flow, e.g. for logging or metrics."""
+    for machine in (main_flow, *flows.values()):
+        machine.add_hook(hook)
+
+
+def choose_bias(state, bias_type):
+    state["bias_type"] = bias_type
+    main_flow.fire(state, "explore")
+
+
+def go_to_main_menu(state, clear_bias=True):
+    flow = flows.get(state.get("bias_type"), main_flow)
+    flow.fire(state, "main_menu")
+    if clear_bias:
+        state["bias_type"] = None
@@ -0,0 +1,114 @@
+import random
+from datetime import datetime
+
+from core import cohort
+from core.catalogs import frame_types, framing_dicts
+from core.flow import framing_flow
+
+# Session state used by the framing experiment and its initial values
+STATE_DEFAULTS = {
+    "framing_experiment_type": None,
+    "framing_scenario_selected": None,
+    "framing_frame_type": None,
+    "framing_user_choice": None,
+    "framing_user_rating": None,
+    "framing_results": list,
+    "framing_completed_scenarios": set
+}
+
+
+def init_state(state):
+    for key, value in STATE_DEFAULTS.items():
+        if key not in state:
+            state[key] = value() if callable(value) else value
+
+
+def reset_state(state):
+    # Completed results are kept so they can still be reviewed after a reset
+    state["framing_experiment_type"] = None
+    state["framing_scenario_selected"] = None
+    state["framing_frame_type"] = None
+    state["framing_user_choice"] = None
+    state["framing_user_rating"] = None
+    state["framing_completed_scenarios"] = set()
+
+
+def go_to_type_selection(state):
+    framing_flow.fire(state, "back_to_types")
+    state["framing_experiment_type"] = None
+    state["framing_scenario_selected"] = None
+    state["framing_frame_type"] = None
+    state["framing_user_choice"] = None
+    state["framing_user_rating"] = None
+
+
+def select_experiment_type(state, experiment_type):
+    state["framing_experiment_type"] = experiment_type
+    framing_flow.fire(state, "select_type")
+
+
+def get_scenario(experiment_type, scenario_id):
+    """Look up a scenario, returning None for an unknown type or id."""
+    return framing_dicts.get(experiment_type, {}).get(scenario_id)
+
+
+def assign_frame(experiment_type, rng=None):
+    """Randomly assign one of the experiment type's frames."""
+    if rng is None:
+        rng = random
+    return rng.choice(frame_types[experiment_type])
+
+
+def select_scenario(state, scenario_id, rng=None):
+    state["framing_scenario_selected"] = scenario_id
+    # Randomly assign a frame type to avoid bias
+    state["framing_frame_type"] = assign_frame(state["framing_experiment_type"], rng)
+    framing_flow.fire(state, "select_scenario")
+
+
+def make_result(experiment_type, scenario, frame_type, response, timestamp=None):
+    """Build the result record for a framing experiment response."""
+    if timestamp is None:
+        timestamp = datetime.now()
+    result = {
+        "experiment_type": experiment_type,
+        "scenario_id": scenario["id"],
+        "scenario_title": scenario["title"],
+        "frame_type": frame_type
+    }
+    # Risk framing records the chosen option, the other experiments a 1-10 rating
+    if experiment_type == "risk":
+        result["user_choice"] = response
+    else:
+        result["user_rating"] = response
+    result["timestamp"] = timestamp.strftime("%Y-%m-%d %H:%M:%S")
+    return result
+
+
+def submit_response(state, response):
+    """Record the response to the current framing scenario."""
+    experiment_type = state["framing_experiment_type"]
+    scenario = get_scenario(experiment_type, state["framing_scenario_selected"])
+
+    if experiment_type == "risk":
+        state["framing_user_choice"] = response
+    else:
+        state["framing_user_rating"] = response
+
+    result = make_result(experiment_type, scenario, state["framing_frame_type"], response)
+    state["framing_results"].append(result)
+    state["framing_completed_scenarios"].add(scenario["id"])
+    cohort.record_result("framing", result)
+    framing_flow.fire(state, "submit_response")
+    return result
+
+
+def latest_result(state, scenario_id):
+    """Find the most recent result for a scenario."""
+    return next((r for r in reversed(state["framing_results"])
+                 if r["scenario_id"] == scenario_id), None)
+
+
+def leave_scenario(state):
+    state["framing_scenario_selected"] = None
+    framing_flow.fire(state, "back_to_scenarios")
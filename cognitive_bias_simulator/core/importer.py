@@ -0,0 +1,312 @@
+"""
+Streaming import of results collected outside the app.
+
+Each row of a CSV or JSON Lines export is one response: its bias, the
+participant it came from and the fields of that experiment, named as in
+the JSON API's submissions:
+
+- anchoring: task_id, anchor, estimate, and optionally higher_lower_guess
+  and design
+- confirmation: scenario_id, stance, optionally stance_strength, and a
+  rating of every piece of the scenario's evidence, as a "ratings" object
+  in JSON Lines or one rating_<evidence id> column per piece in CSV
+- framing: experiment_type, scenario_id, frame_type and response
+
+Rows are read, scored with the same core functions as the app and written
+to the results store chunk_size rows at a time, so memory use depends on
+the chunk size, not the size of the file.
+"""
+import csv
+import itertools
+import json
+import math
+import time
+from datetime import datetime
+
+from core import anchor_design, anchoring, cohort, confirmation, framing
+from core.catalogs import frame_types, framing_dicts, scenarios_dict, tasks_dict
+
+FORMATS = ("csv", "jsonl")
+
+DEFAULT_CHUNK_SIZE = 5000
+
+RATING_RANGE = (1, 10)
+RISK_OPTIONS = ("A", "B")
+
+# CSV column prefix of a confirmation row's evidence ratings
+RATING_PREFIX = "rating_"
+
+# Anchor design recorded for rows that don't name one, since the anchors came from another tool
+EXTERNAL_DESIGN = "external"
+
+
+class RowError(ValueError):
+    pass
+
+
+def detect_format(path):
+    return "jsonl" if path.endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+
+def _decoded_lines(f, progress):
+    """
+    Decode a binary file's lines, counting the bytes read in
+    progress["bytes"]. Invalid UTF-8 bytes are kept as lone surrogates, so
+    only the rows containing them are rejected (see parse_row).
+    """
+    # Spreadsheet exports often start with a byte order mark
+    encoding = "utf-8-sig"
+    for line in f:
+        progress["bytes"] += len(line)
+        yield line.decode(encoding, errors="surrogateescape")
+        encoding = "utf-8"
+
+
+def _check_encoding(text):
+    try:
+        text.encode("utf-8")
+    except UnicodeEncodeError:
+        raise RowError("Invalid UTF-8") from None
+
+
+def read_rows(f, fmt, progress):
+    """
+    Yield the rows of a binary file: dicts for CSV, unparsed lines for JSON
+    Lines (skipping blank ones), so one malformed line only loses that row.
+    """
+    lines = _decoded_lines(f, progress)
+    if fmt == "csv":
+        # Blank cells are missing values
+        for row in csv.DictReader(lines):
+            yield {key: value for key, value in row.items() if key is not None and value != ""}
+    else:
+        for line in lines:
+            if line.strip():
+                yield line
+
+
+def parse_row(row):
+    if isinstance(row, dict):
+        for key, value in row.items():
+            _check_encoding(key)
+            _check_encoding(value)
+        return row
+    _check_encoding(row)
+    try:
+        row = json.loads(row)
+    except ValueError as e:
+        raise RowError(f"Invalid JSON: {e}") from None
+    if not isinstance(row, dict):
+        raise RowError("Each line must be a JSON object")
+    return row
+
+
+def field(row, name, required=True):
+    value = row.get(name)
+    if value is None and required:
+        raise RowError(f"Missing field '{name}'")
+    return value
+
+
+def text(row, name, required=True):
+    value = field(row, name, required)
+    return value if value is None else str(value)
+
+
+def _is_finite(value):
+    try:
+        return math.isfinite(value)
+    except OverflowError:
+        # Integers too large for a float
+        return False
+
+
+def _parse_number(value):
+    # bool is an int subclass, but true/false is never a valid number here
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def number(row, name):
+    value = _parse_number(field(row, name))
+    # NaN and infinities would poison the stored results and the cohort sketches
+    if value is None or not _is_finite(value):
+        raise RowError(f"Field '{name}' must be a finite number")
+    return value
+
+
+def rating(value, name):
+    if isinstance(value, str) and value.strip().isdigit():
+        value = int(value)
+    if not isinstance(value, int) or isinstance(value, bool) or not RATING_RANGE[0] <= value <= RATING_RANGE[1]:
+        raise RowError(f"Field '{name}' must be an integer from 1 to 10")
+    return value
+
+
+def timestamp(row):
+    value = text(row, "timestamp", required=False)
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise RowError(f"Invalid timestamp: {value}") from None
+
+
+def lookup(catalog, key, what):
+    if key not in catalog:
+        raise RowError(f"Unknown {what}: {key}")
+    return catalog[key]
+
+
+def score_anchoring(row):
+    task = lookup(tasks_dict, text(row, "task_id"), "task")
+    anchor = number(row, "anchor")
+    estimate = number(row, "estimate")
+    if estimate < 0:
+        raise RowError("Field 'estimate' must not be negative")
+
+    guess = text(row, "higher_lower_guess", required=False)
+    guess_correct = None
+    if guess is not None:
+        if guess not in ("higher", "lower"):
+            raise RowError("Field 'higher_lower_guess' must be 'higher' or 'lower'")
+        guess_correct = guess == anchoring.actual_comparison(task["actual_value"], anchor)
+
+    design = text(row, "design", required=False) or EXTERNAL_DESIGN
+    if design not in anchor_design.DESIGNS and design != EXTERNAL_DESIGN:
+        raise RowError(f"Unknown anchor design: {design}")
+
+    result = anchoring.score_estimate(task, anchor, estimate, guess, guess_correct, design)
+    result["anchoring_effect"] = anchoring.classify_anchoring_effect(anchor, estimate, task["actual_value"])
+    return result
+
+
+def row_ratings(row):
+    """Evidence id -> rating, from a ratings object or from rating_<evidence id> columns."""
+    ratings = row.get("ratings")
+    if ratings is None:
+        ratings = {key[len(RATING_PREFIX):]: value for key, value in row.items() if key.startswith(RATING_PREFIX)}
+    elif not isinstance(ratings, dict):
+        raise RowError("Field 'ratings' must be an object")
+    if not ratings:
+        raise RowError("Missing evidence ratings")
+    return ratings
+
+
+def score_confirmation(row):
+    scenario = lookup(scenarios_dict, text(row, "scenario_id"), "scenario")
+    stance = text(row, "stance")
+    if stance not in scenario["stance_options"]:
+        raise RowError(f"Unknown stance: {stance}")
+
+    evidence_ids = {evidence["id"] for evidence in scenario["evidence"]}
+    ratings = {}
+    for evidence_id, value in row_ratings(row).items():
+        if evidence_id not in evidence_ids:
+            raise RowError(f"Unknown evidence: {evidence_id}")
+        ratings[evidence_id] = rating(value, f"{RATING_PREFIX}{evidence_id}")
+
+    # Scores from a subset of the evidence aren't comparable with the app's
+    missing = [evidence["id"] for evidence in scenario["evidence"] if evidence["id"] not in ratings]
+    if missing:
+        raise RowError(f"Missing ratings for evidence: {', '.join(missing)}")
+
+    stance_strength = row.get("stance_strength")
+    if stance_strength is not None:
+        stance_strength = number(row, "stance_strength")
+
+    evidence_ratings = {}
+    confirmation.update_evidence_ratings(evidence_ratings, scenario["id"], stance, ratings)
+    score = confirmation.confirming_bias_score(evidence_ratings, scenario["id"])
+    return confirmation.make_scenario_result(scenario["id"], stance, stance_strength, score, timestamp(row),
+                                             ratings=ratings)
+
+
+def score_framing(row):
+    experiment_type = text(row, "experiment_type")
+    scenario = lookup(lookup(framing_dicts, experiment_type, "experiment type"), text(row, "scenario_id"), "scenario")
+    frame_type = text(row, "frame_type")
+    if frame_type not in frame_types[experiment_type]:
+        raise RowError(f"Unknown frame type: {frame_type}")
+
+    if experiment_type == "risk":
+        response = text(row, "response")
+        if response not in RISK_OPTIONS:
+            raise RowError("Field 'response' must be 'A' or 'B'")
+    else:
+        response = rating(field(row, "response"), "response")
+
+    return framing.make_result(experiment_type, scenario, frame_type, response, timestamp(row))
+
+
+SCORERS = {
+    "anchoring": score_anchoring,
+    "confirmation": score_confirmation,
+    "framing": score_framing
+}
+
+
+def score_row(row, bias=None):
+    """(participant id, bias, result record) for an imported row; bias overrides the row's own."""
+    row = parse_row(row)
+    bias = bias or text(row, "bias")
+    if bias not in SCORERS:
+        raise RowError(f"Unknown bias: {bias}")
+    return text(row, "participant_id"), bias, SCORERS[bias](row)
+
+
+def import_file(store, path, fmt=None, bias=None, chunk_size=DEFAULT_CHUNK_SIZE, on_error=None, progress=None):
+    """
+    Score every row of an export and write the results to a results store.
+
+    Rows that can't be scored are skipped and passed to on_error(row,
+    message) if it is given, row being the row's number in the file;
+    without it the first one raises RowError. progress, if given, is
+    called as progress(stats) after every chunk. Returns the stats: rows
+    read, imported and skipped, bytes read and elapsed seconds.
+    """
+    fmt = fmt or detect_format(path)
+    stats = {"rows": 0, "imported": 0, "skipped": 0, "bytes": 0, "elapsed": 0.0}
+    start = time.perf_counter()
+
+    with open(path, "rb") as f:
+        rows = read_rows(f, fmt, stats)
+        while True:
+            chunk = []
+            read = 0
+            for row in itertools.islice(rows, chunk_size):
+                read += 1
+                stats["rows"] += 1
+                try:
+                    chunk.append(score_row(row, bias))
+                except RowError as e:
+                    if on_error is None:
+                        raise RowError(f"Row {stats['rows']}: {e}") from None
+                    stats["skipped"] += 1
+                    on_error(stats["rows"], str(e))
+            if not read:
+                break
+
+            # One transaction per chunk; the chunk is dropped before the next is read
+            stats["imported"] += store.insert_many(chunk)
+            # Sketches summarise the cohort in bounded memory; the distributions
+            # used for percentiles are read from the store when the app starts
+            for _, result_bias, result in chunk:
+                cohort.record_sketches(result_bias, result)
+            stats["elapsed"] = time.perf_counter() - start
+            if progress is not None:
+                progress(stats)
+
+    stats["elapsed"] = time.perf_counter() - start
+    return stats
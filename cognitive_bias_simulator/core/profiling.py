@@ -0,0 +1,175 @@
+import cProfile
+import os
+import pstats
+import re
+import tempfile
+import threading
+import time
+
+# Directory profiles are kept in; defaults to one under the system temp directory
+PROFILE_DIR_ENV = "BIAS_SIMULATOR_PROFILE_DIR"
+
+# Profiles kept per stage; older ones are deleted as new ones are saved
+DEFAULT_RETENTION = 20
+
+
+def configured_directory():
+    return os.environ.get(PROFILE_DIR_ENV) or os.path.join(tempfile.gettempdir(), "bias_simulator_profiles")
+
+
+def function_label(func):
+    filename, line, name = func
+    if filename == "~":
+        # Built-ins, e.g. "<built-in method builtins.sorted>"
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+class ProfileStore:
+    """
+    Deterministic profiles of whole reruns, saved per stage.
+
+    Each profiled rerun is written to <directory>/<stage>/<time>.prof in
+    pstats format, so it can also be opened with snakeviz or pstats
+    directly; only the newest `retention` profiles of each stage are kept.
+    Nothing is profiled unless profile() is called, and profile_all lets
+    an admin turn profiling on for every session at once.
+    """
+
+    def __init__(self, directory, retention=DEFAULT_RETENTION):
+        self.directory = directory
+        self.retention = retention
+        self.profile_all = False
+        self._lock = threading.Lock()
+
+    def _stage_directory(self, stage):
+        return os.path.join(self.directory, re.sub(r"[^A-Za-z0-9_.-]", "_", str(stage)))
+
+    def profile(self, stage, func, *args, **kwargs):
+        """
+        Call func under the profiler and save the profile for stage, even if
+        func raises. If another profiler is already running, func runs
+        unprofiled.
+        """
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # From Python 3.12 only one profiler can be active per process, so
+            # concurrent sessions' reruns can't all be profiled
+            return func(*args, **kwargs)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            self.save(stage, profiler)
+
+    def save(self, stage, profiler):
+        directory = self._stage_directory(stage)
+        with self._lock:
+            os.makedirs(directory, exist_ok=True)
+            profiler.dump_stats(os.path.join(directory, f"{time.time_ns()}.prof"))
+            for path in self._paths(stage)[:-self.retention]:
+                os.remove(path)
+
+    def _paths(self, stage):
+        """Saved profile files of a stage, oldest first."""
+        directory = self._stage_directory(stage)
+        if not os.path.isdir(directory):
+            return []
+        names = sorted((name for name in os.listdir(directory) if name.endswith(".prof")),
+                       key=lambda name: int(name[:-len(".prof")]))
+        return [os.path.join(directory, name) for name in names]
+
+    def stages(self):
+        """Stage name -> number of saved profiles."""
+        if not os.path.isdir(self.directory):
+            return {}
+        return {name: len(self._paths(name)) for name in sorted(os.listdir(self.directory))
+                if self._paths(name)}
+
+    def load(self, stage):
+        """The saved profiles of a stage combined into one pstats.Stats, or None."""
+        stats = None
+        for path in self._paths(stage):
+            try:
+                if stats is None:
+                    stats = pstats.Stats(path)
+                else:
+                    stats.add(path)
+            except FileNotFoundError:
+                # Deleted by another session's save since it was listed
+                continue
+        return stats
+
+    def latest_profile(self, stage):
+        """The bytes of a stage's newest profile, or None."""
+        for path in reversed(self._paths(stage)):
+            try:
+                with open(path, "rb") as f:
+                    return f.read()
+            except FileNotFoundError:
+                continue
+        return None
+
+
+def _callees(stats):
+    callees = {}
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        for caller, (_, _, _, cumulative) in callers.items():
+            callees.setdefault(caller, []).append((func, cumulative))
+    return callees
+
+
+def flame_rows(stats, min_fraction=0.01, max_depth=40):
+    """
+    A flame-graph style call tree as (depth, label, seconds) rows.
+
+    cProfile records caller/callee pairs rather than whole stacks, so each
+    callee's time under a caller is split across its own callees in
+    proportion to their share of its total time. Branches taking less than
+    min_fraction of the total are left out.
+    """
+    callees = _callees(stats)
+    roots = [func for func, entry in stats.stats.items() if not entry[4]]
+    total = sum(stats.stats[func][3] for func in roots) or 1.0
+    rows = []
+
+    def visit(func, seconds, depth, path):
+        rows.append((depth, function_label(func), seconds))
+        own_total = stats.stats[func][3] or 1.0
+        if depth >= max_depth:
+            return
+        children = sorted(callees.get(func, ()), key=lambda item: -item[1])
+        for child, child_seconds in children:
+            share = child_seconds * seconds / own_total
+            if share >= min_fraction * total and child not in path:
+                visit(child, share, depth + 1, path | {child})
+
+    for root in sorted(roots, key=lambda func: -stats.stats[func][3]):
+        if stats.stats[root][3] >= min_fraction * total:
+            visit(root, stats.stats[root][3], 0, {root})
+    return rows
+
+
+def folded_stacks(stats, min_fraction=0.001):
+    """
+    The call tree in the folded "a;b;c microseconds" format read by
+    flamegraph.pl and speedscope, with each line's own (exclusive) time.
+    """
+    rows = flame_rows(stats, min_fraction)
+    lines = []
+    stack = []
+    for i, (depth, label, seconds) in enumerate(rows):
+        del stack[depth:]
+        stack.append(label.replace(";", ","))
+        children = 0.0
+        for child_depth, _, child_seconds in rows[i + 1:]:
+            if child_depth <= depth:
+                break
+            if child_depth == depth + 1:
+                children += child_seconds
+        own = seconds - children
+        if own > 0:
+            lines.append(f"{';'.join(stack)} {round(own * 1e6)}")
+    return "\n".join(lines)
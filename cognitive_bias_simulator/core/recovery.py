@@ -0,0 +1,210 @@
+"""
+Parameter recovery for the bias scoring metrics.
+
+Respondents are simulated with known bias parameters (see
+core.respondents) and scored with array versions of the core scoring
+functions, so a whole grid of true parameter values and sample sizes is
+evaluated as a few NumPy operations per cell. check_scoring() confirms
+that the array versions agree with the scalar functions the app uses.
+
+For each metric, a linear calibration fitted on a large sample over the
+full parameter range maps the metric onto the parameter's scale. Each
+grid cell then reports how well the calibrated cohort mean recovers the
+true cohort mean (bias, variance, RMSE). The rank correlation between
+metric and parameter over the full range shows how well individuals are
+ordered.
+"""
+import numpy as np
+
+from core import anchor_design, anchoring, confirmation, respondents
+from core.catalogs import scenarios, tasks
+from core.wason import is_potentially_confirming
+
+EFFECT_LEVELS = {"none": 0, "moderate": 1, "strong": 2}
+
+
+def anchor_pull(anchor, estimate, actual_value):
+    """Array version of anchoring.anchor_pull."""
+    distance = np.abs(anchor - actual_value)
+    pull = np.abs(estimate - actual_value) / np.where(distance == 0, 1, distance)
+    return np.where(distance == 0, 0.0, np.minimum(pull, 1.0))
+
+
+def anchoring_effect_level(anchor, estimate, actual_value):
+    """Array version of anchoring.classify_anchoring_effect, as 0 (none), 1 (moderate) or 2 (strong)."""
+    strong = np.abs(estimate - anchor) < np.abs(estimate - actual_value)
+    moderate = ((anchor < actual_value) & (estimate < actual_value)) | \
+               ((anchor > actual_value) & (estimate > actual_value))
+    return np.where(strong, 2, np.where(moderate, 1, 0))
+
+
+def confirming_bias_score(ratings, directions):
+    """Array version of confirmation.confirming_bias_score for evidence with the given directions."""
+    supporting = directions == 1
+    contradicting = directions == -1
+    average_supporting = ratings[..., supporting].mean(axis=-1) if supporting.any() else 0.0
+    average_contradicting = ratings[..., contradicting].mean(axis=-1) if contradicting.any() else 0.0
+    return average_supporting - average_contradicting
+
+
+def confirming_percent(sequences):
+    """Array version of the confirming share in WasonSession.strategy_stats, in percent."""
+    steps = np.diff(sequences, axis=-1)
+    return (steps[..., 0] == steps[..., 1]).mean(axis=-1) * 100
+
+
+def draw_anchors(rng, actual_value, size):
+    """Anchors from the log-uniform design's range."""
+    table = anchor_design.design_table(actual_value)
+    log_anchor = rng.uniform(np.log(table["lower_bound"]), np.log(table["upper_bound"]), size=size)
+    return np.round(np.exp(log_anchor))
+
+
+def evidence_directions(scenario, stance):
+    evidence_types = confirmation.get_evidence_types(scenario["id"], stance)
+    return np.array([{"supporting": 1, "contradicting": -1}.get(evidence_types[evidence["id"]], 0)
+                     for evidence in scenario["evidence"]])
+
+
+def simulate_anchor_pull(rng, weights):
+    params = respondents.DEFAULT_PARAMS["anchoring"]
+    total = np.zeros(weights.shape)
+    for task in tasks:
+        anchors = draw_anchors(rng, task["actual_value"], weights.shape)
+        estimates = respondents.anchoring_estimates(rng, task["actual_value"], anchors.ravel(), weights.ravel(),
+                                                    params["noise_sd"]).reshape(weights.shape)
+        total += anchor_pull(anchors, estimates, task["actual_value"])
+    return total / len(tasks)
+
+
+def simulate_anchoring_level(rng, weights):
+    params = respondents.DEFAULT_PARAMS["anchoring"]
+    total = np.zeros(weights.shape)
+    for task in tasks:
+        anchors = draw_anchors(rng, task["actual_value"], weights.shape)
+        estimates = respondents.anchoring_estimates(rng, task["actual_value"], anchors.ravel(), weights.ravel(),
+                                                    params["noise_sd"]).reshape(weights.shape)
+        total += anchoring_effect_level(anchors, estimates, task["actual_value"])
+    return total / len(tasks)
+
+
+def simulate_confirming_bias_score(rng, bias):
+    params = respondents.DEFAULT_PARAMS["confirmation"]
+    total = np.zeros(bias.shape)
+    for scenario in scenarios:
+        stance_indices = rng.integers(0, len(scenario["stance_options"]), size=bias.shape)
+        for stance_index, stance in enumerate(scenario["stance_options"]):
+            chosen = stance_indices == stance_index
+            if not chosen.any():
+                continue
+            directions = evidence_directions(scenario, stance)
+            ratings = respondents.evidence_ratings(rng, np.tile(directions, (chosen.sum(), 1)), bias[chosen],
+                                                   params["base_rating"], params["rating_sd"])
+            total[chosen] += confirming_bias_score(ratings, directions)
+    return total / len(scenarios)
+
+
+def simulate_confirming_percent(rng, confirm_probability):
+    tests = respondents.DEFAULT_PARAMS["wason"]["tests"]
+    sequences = respondents.wason_sequences(rng, confirm_probability.ravel(), tests)
+    return confirming_percent(sequences).reshape(confirm_probability.shape)
+
+
+# Metric name -> (respondent parameter name, parameter range, simulate(rng, parameters) -> metric values)
+METRICS = {
+    "anchor_pull": ("anchor weight", (0.0, 0.6), simulate_anchor_pull),
+    "anchoring_effect_level": ("anchor weight", (0.0, 0.6), simulate_anchoring_level),
+    "confirming_bias_score": ("rating bias", (-0.5, 2.0), simulate_confirming_bias_score),
+    "wason_confirming_percent": ("confirming test probability", (0.2, 1.0), simulate_confirming_percent)
+}
+
+
+def check_scoring(rng, n=500):
+    """Compare the array metrics with the app's scalar scoring functions on random inputs."""
+    task = tasks[0]
+    anchors = draw_anchors(rng, task["actual_value"], n)
+    estimates = respondents.anchoring_estimates(rng, task["actual_value"], anchors, rng.uniform(0, 1, n), 0.5)
+    scalar_pull = [anchoring.anchor_pull(a, e, task["actual_value"]) for a, e in zip(anchors, estimates)]
+    scalar_level = [EFFECT_LEVELS[anchoring.classify_anchoring_effect(a, e, task["actual_value"])]
+                    for a, e in zip(anchors, estimates)]
+    if not np.allclose(anchor_pull(anchors, estimates, task["actual_value"]), scalar_pull):
+        raise AssertionError("anchor_pull differs from anchoring.anchor_pull")
+    if not np.array_equal(anchoring_effect_level(anchors, estimates, task["actual_value"]), scalar_level):
+        raise AssertionError("anchoring_effect_level differs from anchoring.classify_anchoring_effect")
+
+    scenario = scenarios[0]
+    stance = scenario["stance_options"][0]
+    directions = evidence_directions(scenario, stance)
+    ratings = rng.integers(1, 11, size=(n, len(directions)))
+    scalar_scores = []
+    for row in ratings.tolist():
+        evidence_ratings = {}
+        confirmation.update_evidence_ratings(evidence_ratings, scenario["id"], stance,
+                                             {evidence["id"]: rating for evidence, rating in zip(scenario["evidence"], row)})
+        scalar_scores.append(confirmation.confirming_bias_score(evidence_ratings, scenario["id"]))
+    if not np.allclose(confirming_bias_score(ratings, directions), scalar_scores):
+        raise AssertionError("confirming_bias_score differs from confirmation.confirming_bias_score")
+
+    sequences = respondents.wason_sequences(rng, rng.uniform(0, 1, n), 8)
+    scalar_percent = [100 * np.mean([is_potentially_confirming(sequence) for sequence in row])
+                      for row in sequences.tolist()]
+    if not np.allclose(confirming_percent(sequences), scalar_percent):
+        raise AssertionError("confirming_percent differs from wason.is_potentially_confirming")
+
+
+def rank(values):
+    """Ranks of a 1-D array, with ties given their average rank."""
+    order = np.argsort(values, kind="mergesort")
+    ranks = np.empty(len(values))
+    ranks[order] = np.arange(len(values))
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    # Average rank of each group of equal values
+    group_sums = np.bincount(inverse, weights=ranks)
+    return (group_sums / counts)[inverse]
+
+
+def spearman(x, y):
+    return float(np.corrcoef(rank(x), rank(y))[0, 1])
+
+
+def calibrate(rng, metric, n=50000):
+    """
+    Fit metric = intercept + slope * parameter over the metric's full parameter range.
+
+    Inverting this fit, rather than regressing the parameter on the
+    metric, keeps the cohort mean free of shrinkage towards the centre of
+    the range wherever the metric is linear in the parameter.
+    """
+    _, (low, high), simulate = METRICS[metric]
+    parameters = rng.uniform(low, high, size=(1, n))
+    values = simulate(rng, parameters)
+    slope, intercept = np.polyfit(parameters.ravel(), values.ravel(), 1)
+    return intercept, slope, spearman(values.ravel(), parameters.ravel())
+
+
+def recover(rng, metric, true_means, sample_sizes, replications=200, spread=0.1):
+    """
+    Bias, variance and RMSE of the calibrated cohort mean for each true mean and sample size.
+
+    Respondents' parameters are drawn uniformly within spread (as a share
+    of the parameter range) around the true mean.
+    """
+    _, (low, high), simulate = METRICS[metric]
+    intercept, slope, rank_correlation = calibrate(rng, metric)
+    half_width = spread * (high - low)
+    rows = []
+    for true_mean in true_means:
+        for n in sample_sizes:
+            parameters = np.clip(true_mean + rng.uniform(-half_width, half_width, size=(replications, n)), low, high)
+            estimates = ((simulate(rng, parameters) - intercept) / slope).mean(axis=1)
+            errors = estimates - parameters.mean(axis=1)
+            rows.append({
+                "metric": metric,
+                "true_mean": float(true_mean),
+                "n": n,
+                "bias": float(errors.mean()),
+                "variance": float(estimates.var(ddof=1)),
+                "rmse": float(np.sqrt((errors ** 2).mean())),
+                "rank_correlation": rank_correlation
+            })
+    return rows
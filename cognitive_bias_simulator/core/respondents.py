@@ -0,0 +1,106 @@
+"""
+Simulated respondents with known bias parameters.
+
+Every function draws a whole batch at once from a NumPy Generator, so the
+same models serve the offline simulation runner and the parameter
+recovery benchmark. The models are deliberately simple: each has one
+parameter per respondent that sets how strongly the bias acts.
+"""
+import numpy as np
+
+from core.catalogs import classical_findings
+
+DEFAULT_PARAMS = {
+    "anchoring": {
+        # Weight of the anchor in the log-scale estimate; 0 is unbiased
+        "weight_low": 0.0,
+        "weight_high": 0.6,
+        "noise_sd": 0.3
+    },
+    "framing": {
+        # 1 reproduces the classical findings' gap between frames
+        "susceptibility_low": 0.0,
+        "susceptibility_high": 2.0,
+        "base_rating": 5.5,
+        "rating_sd": 1.5
+    },
+    "confirmation": {
+        # Rating boost for supporting evidence and penalty for contradicting evidence
+        "bias_low": -0.5,
+        "bias_high": 2.0,
+        "base_rating": 5.5,
+        "rating_sd": 1.5
+    },
+    "wason": {
+        # Probability that each tested sequence is a confirming one
+        "confirm_low": 0.2,
+        "confirm_high": 1.0,
+        "tests": 8
+    }
+}
+
+
+def draw_parameters(rng, n, low, high):
+    return rng.uniform(low, high, size=n)
+
+
+def anchoring_estimates(rng, actual_value, anchors, weights, noise_sd):
+    """Estimates pulled towards the anchors on a log scale by each respondent's weight."""
+    log_estimate = weights * np.log(anchors) + (1 - weights) * np.log(actual_value)
+    log_estimate += rng.normal(0, noise_sd, size=len(anchors))
+    return np.round(np.exp(log_estimate))
+
+
+def frame_shifts(experiment_type):
+    """How far each frame moves the response in the classical findings, centred on their mean."""
+    findings = classical_findings[experiment_type]
+    if experiment_type == "risk":
+        # Share choosing the sure option A under each frame
+        findings = {frame: choices["A"] / 100 for frame, choices in findings.items()}
+    mean = sum(findings.values()) / len(findings)
+    return {frame: value - mean for frame, value in findings.items()}
+
+
+def framing_responses(rng, experiment_type, frames, susceptibility, base_rating, rating_sd):
+    """Risk framing choices ("A"/"B") or 1-10 ratings for respondents shown the given frames."""
+    shifts = frame_shifts(experiment_type)
+    shift = np.array([shifts[frame] for frame in frames])
+    if experiment_type == "risk":
+        share_a = np.clip(0.5 + susceptibility * shift, 0, 1)
+        return np.where(rng.random(len(frames)) < share_a, "A", "B")
+    ratings = base_rating + susceptibility * shift + rng.normal(0, rating_sd, size=len(frames))
+    return np.clip(np.round(ratings), 1, 10).astype(int)
+
+
+def evidence_ratings(rng, directions, bias, base_rating, rating_sd):
+    """
+    1-10 ratings of a scenario's evidence.
+
+    directions holds +1 for supporting, -1 for contradicting and 0 for
+    neutral evidence, with one row per respondent; the result has the same
+    shape.
+    """
+    ratings = base_rating + bias[:, None] * directions
+    ratings = ratings + rng.normal(0, rating_sd, size=directions.shape)
+    return np.clip(np.round(ratings), 1, 10).astype(int)
+
+
+def wason_sequences(rng, confirm_probability, tests):
+    """
+    Tested 2-4-6 sequences, shape (respondents, tests, 3).
+
+    Confirming tests are ascending arithmetic sequences like 2-4-6; the
+    others break the pattern, either ascending with uneven steps or not
+    ascending at all.
+    """
+    n = len(confirm_probability)
+    start = rng.integers(1, 50, size=(n, tests))
+    step = rng.integers(1, 10, size=(n, tests))
+    confirming = np.stack([start, start + step, start + 2 * step], axis=-1)
+
+    # A second step that differs from the first guarantees a non-arithmetic sequence
+    other_step = step + rng.integers(1, 10, size=(n, tests)) * rng.choice([-1, 1], size=(n, tests))
+    disconfirming = np.stack([start, start + step, start + step + other_step], axis=-1)
+
+    is_confirming = rng.random((n, tests)) < confirm_probability[:, None]
+    return np.where(is_confirming[..., None], confirming, disconfirming)
@@ -0,0 +1,185 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Path of the results database; persistence is off when it is not set
+DB_PATH_ENV = "BIAS_SIMULATOR_RESULTS_DB"
+
+
+def configured_path():
+    return os.environ.get(DB_PATH_ENV) or None
+
+
+# The record field naming what a result answers: a session's later result
+# for the same task or scenario is a retry that replaces the earlier one.
+# Framing results are all kept, as in the app.
+ATTEMPT_FIELDS = {
+    "anchoring": "task_id",
+    "confirmation": "scenario_id"
+}
+
+
+def attempt_key(bias, session_id, record):
+    """(session, task or scenario) of a result, or None if no later result replaces it."""
+    field = ATTEMPT_FIELDS.get(bias)
+    return None if field is None else (session_id, record[field])
+
+
+def latest_attempts(bias, records):
+    """A session's records of a bias without the attempts retried later, ordered by their latest attempt."""
+    latest = {}
+    for index, record in enumerate(records):
+        key = attempt_key(bias, None, record) or index
+        # Re-inserted so a retried task moves to the end, as the app's results list does
+        latest.pop(key, None)
+        latest[key] = record
+    return list(latest.values())
+
+
+class ResultsStore:
+    """
+    SQLite store for completed result records.
+
+    Each row keeps the session it came from, the bias ("anchoring",
+    "confirmation" or "framing") and the record itself as JSON, so every
+    experiment's result schema fits the same table.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        # Used from the write-behind thread as well as the callers' threads
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    id INTEGER PRIMARY KEY,
+                    session_id TEXT NOT NULL,
+                    bias TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    record TEXT NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS results_session ON results (session_id, bias)")
+            # Quantile sketches saved by each process, merged when loaded
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS sketches (
+                    source TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (source, key)
+                )
+            """)
+            # Session state moved out of memory while its session is idle
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS offloaded_state (
+                    session_id TEXT PRIMARY KEY,
+                    data BLOB NOT NULL
+                )
+            """)
+
+    def insert_many(self, rows):
+        """Insert (session_id, bias, record) rows in a single transaction; records may be already serialized JSON."""
+        now = time.time()
+        params = [(session_id, bias, now, record if isinstance(record, str) else json.dumps(record))
+                  for session_id, bias, record in rows]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO results (session_id, bias, created, record) VALUES (?, ?, ?, ?)", params)
+        return len(params)
+
+    def load(self, session_id, bias=None):
+        """Records stored for a session, oldest first."""
+        query = "SELECT record FROM results WHERE session_id = ?"
+        params = [session_id]
+        if bias is not None:
+            query += " AND bias = ?"
+            params.append(bias)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY id", params).fetchall()
+        return [json.loads(record) for (record,) in rows]
+
+    def session_ids(self):
+        """Every session with stored records, in sorted order."""
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT session_id FROM results ORDER BY session_id").fetchall()
+        return [session_id for (session_id,) in rows]
+
+    def iter_records(self, bias=None, batch_size=1000, with_session=False):
+        """
+        Yield every stored record of a bias in insertion order, batch_size
+        rows at a time, as (session_id, record) pairs with with_session.
+        """
+        last_id = 0
+        while True:
+            query = "SELECT id, session_id, record FROM results WHERE id > ?"
+            params = [last_id]
+            if bias is not None:
+                query += " AND bias = ?"
+                params.append(bias)
+            with self._lock:
+                rows = self._conn.execute(query + " ORDER BY id LIMIT ?", params + [batch_size]).fetchall()
+            if not rows:
+                return
+            for _, session_id, record in rows:
+                yield (session_id, json.loads(record)) if with_session else json.loads(record)
+            last_id = rows[-1][0]
+
+    def iter_batches(self, after_id=0, batch_size=1000):
+        """
+        Yield the rows stored after after_id in insertion order, as lists of
+        up to batch_size (id, bias, created, record) tuples, so a reader can
+        resume from the last id it saw.
+        """
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, bias, created, record FROM results WHERE id > ? ORDER BY id LIMIT ?",
+                    (after_id, batch_size)).fetchall()
+            if not rows:
+                return
+            yield [(row_id, bias, created, json.loads(record)) for row_id, bias, created, record in rows]
+            after_id = rows[-1][0]
+
+    def count(self, bias=None):
+        query = "SELECT COUNT(*) FROM results"
+        params = []
+        if bias is not None:
+            query += " WHERE bias = ?"
+            params.append(bias)
+        with self._lock:
+            return self._conn.execute(query, params).fetchone()[0]
+
+    def save_sketches(self, source, rows):
+        """Replace a source's saved sketches with (key, data) rows."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sketches WHERE source = ?", (source,))
+            self._conn.executemany("INSERT INTO sketches (source, key, data) VALUES (?, ?, ?)",
+                                   [(source, key, data) for key, data in rows])
+
+    def load_sketches(self):
+        """(source, key, data) rows of every saved sketch."""
+        with self._lock:
+            return self._conn.execute("SELECT source, key, data FROM sketches").fetchall()
+
+    def save_session_state(self, session_id, data):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO offloaded_state (session_id, data) VALUES (?, ?)",
+                               (session_id, data))
+
+    def pop_session_state(self, session_id):
+        """Remove and return a session's offloaded state, or None if it has none."""
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT data FROM offloaded_state WHERE session_id = ?",
+                                     (session_id,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("DELETE FROM offloaded_state WHERE session_id = ?", (session_id,))
+        return row[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
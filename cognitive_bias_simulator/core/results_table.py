@@ -0,0 +1,66 @@
+import pandas as pd
+
+from core import tracing
+
+
+class ResultsTable:
+    """
+    A session's results as DataFrames, kept up to date as results are recorded.
+
+    The results list in session state stays the source of truth; sync()
+    adds whatever was appended to it since the last call, so each rerun
+    costs only the new rows. Rows are formatted for display once, when
+    they are added, and the DataFrames built from them are cached until
+    the next change. If earlier results were replaced or removed (a
+    retried anchoring task), the table is rebuilt.
+    """
+
+    def __init__(self, format_row=None, include=None):
+        self.format_row = format_row
+        self.include = include
+        self.rows = []
+        self.display_rows = []
+        self._seen = 0
+        self._last = None
+        self._frames = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def sync(self, results):
+        seen = self._seen
+        if seen > len(results) or (seen and results[seen - 1] is not self._last):
+            self.clear()
+            seen = 0
+        for result in results[seen:]:
+            if self.include is None or self.include(result):
+                self.append(result)
+        self._seen = len(results)
+        self._last = results[-1] if results else None
+        return self
+
+    def append(self, result):
+        self.rows.append(result)
+        if self.format_row is not None:
+            self.display_rows.append(self.format_row(result))
+        self._frames.clear()
+
+    def clear(self):
+        self.rows = []
+        self.display_rows = []
+        self._seen = 0
+        self._last = None
+        self._frames.clear()
+
+    def derived(self, name, build):
+        """build(table), computed once and reused until the table changes."""
+        if name not in self._frames:
+            with tracing.span("dataframe.build", frame=name, rows=len(self.rows)):
+                self._frames[name] = build(self)
+        return self._frames[name]
+
+    def frame(self):
+        return self.derived("frame", lambda table: pd.DataFrame(table.rows))
+
+    def display_frame(self):
+        return self.derived("display_frame", lambda table: pd.DataFrame(table.display_rows))
@@ -0,0 +1,222 @@
+import os
+import pickle
+import sys
+import threading
+import time
+import weakref
+from array import array
+
+# Session state keys holding completed work, which is what grows over a long session
+OFFLOAD_KEYS = (
+    "results",
+    "completed_tasks",
+    "framing_results",
+    "framing_completed_scenarios",
+    "wason_session",
+    "evidence_ratings",
+    "user_stance",
+    "stance_strength"
+)
+
+# Caches derived from the keys above, dropped on offload and rebuilt when next needed
+DERIVED_KEYS = ("results_tables",)
+
+DEFAULT_BUDGET_BYTES = 256 * 1024 * 1024
+DEFAULT_IDLE_SECONDS = 600
+
+BUDGET_MB_ENV = "BIAS_SIMULATOR_MEMORY_BUDGET_MB"
+IDLE_SECONDS_ENV = "BIAS_SIMULATOR_IDLE_SECONDS"
+
+
+def configured_budget_bytes():
+    value = os.environ.get(BUDGET_MB_ENV)
+    return int(float(value) * 1024 * 1024) if value else DEFAULT_BUDGET_BYTES
+
+
+def configured_idle_seconds():
+    value = os.environ.get(IDLE_SECONDS_ENV)
+    return float(value) if value else DEFAULT_IDLE_SECONDS
+
+
+def approximate_size(value, _seen=None):
+    """Approximate memory footprint of a value and everything it contains."""
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+
+    size = sys.getsizeof(value)
+    if isinstance(value, (str, bytes, int, float, bool, array)) or value is None:
+        return size
+    # pandas objects report their own buffers, which getsizeof doesn't see
+    memory_usage = getattr(value, "memory_usage", None)
+    if callable(memory_usage):
+        usage = memory_usage(deep=True)
+        return size + int(usage.sum() if hasattr(usage, "sum") else usage)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += approximate_size(key, _seen) + approximate_size(item, _seen)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += approximate_size(item, _seen)
+    elif hasattr(value, "__dict__"):
+        size += approximate_size(vars(value), _seen)
+    return size
+
+
+def _reference(state):
+    # Hold the framework's state objects weakly so closed sessions can be
+    # garbage collected; plain dicts can't be weakly referenced
+    try:
+        return weakref.ref(state)
+    except TypeError:
+        return lambda: state
+
+
+class _Session:
+    __slots__ = ("ref", "accessor", "size", "last_seen", "offloaded")
+
+    def __init__(self, owner):
+        self.ref = _reference(owner)
+        self.accessor = None
+        self.size = 0
+        self.last_seen = 0.0
+        self.offloaded = False
+
+    def state(self):
+        """The state to read and write through: the locked accessor while it exists, else the state itself."""
+        accessor = self.accessor() if self.accessor is not None else None
+        return accessor if accessor is not None else self.ref()
+
+
+class SessionMemoryManager:
+    """
+    Keeps the completed work held in session state within a memory budget.
+
+    touch() is called at the start of every rerun of a session. It reloads
+    the session's state if it was offloaded, re-measures it, and when the
+    sessions together exceed budget_bytes, moves the OFFLOAD_KEYS of the
+    longest-idle sessions to the results store until they fit again. Only
+    sessions idle for at least idle_seconds are offloaded, and they get
+    their state back on their next touch().
+
+    States only need `in`, item access and `del`, so Streamlit's session
+    state and a plain dict both work. Sessions are told apart by owner, the
+    object that lives as long as the session (Streamlit's SessionState),
+    while state is what reads and writes go through. For Streamlit that is
+    the script run's SafeSessionState, which takes the lock the session's
+    script thread uses; it only lives as long as the script runner, and
+    once it is gone no script can be touching the owner directly.
+    """
+
+    def __init__(self, store, budget_bytes=DEFAULT_BUDGET_BYTES, idle_seconds=DEFAULT_IDLE_SECONDS,
+                 clock=time.monotonic):
+        self.store = store
+        self.budget_bytes = budget_bytes
+        self.idle_seconds = idle_seconds
+        self.clock = clock
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self.offloads = 0
+        self.reloads = 0
+
+    def _session(self, session_id, state, owner):
+        owner = state if owner is None else owner
+        session = self._sessions.get(session_id)
+        if session is None or session.ref() is not owner:
+            offloaded = session is not None and session.offloaded
+            session = self._sessions[session_id] = _Session(owner)
+            session.offloaded = offloaded
+        if state is not owner:
+            session.accessor = _reference(state)
+        return session
+
+    def reload(self, session_id, state, owner=None):
+        """
+        Restore a session's state if it was offloaded and mark it active, without
+        re-measuring it. Cheap enough to call before every fragment rerun, which
+        reads and writes the state without a full rerun's touch().
+        """
+        with self._lock:
+            session = self._session(session_id, state, owner)
+            if session.offloaded:
+                self._reload(session_id, state)
+                session.offloaded = False
+            session.last_seen = self.clock()
+
+    def touch(self, session_id, state, owner=None):
+        """Record activity for a session, restoring its state first if it was offloaded."""
+        with self._lock:
+            session = self._session(session_id, state, owner)
+            if session.offloaded:
+                self._reload(session_id, state)
+                session.offloaded = False
+            session.last_seen = self.clock()
+            session.size = self.measure(state)
+            self._enforce_budget(session_id)
+
+    @staticmethod
+    def measure(state):
+        # One seen set, so results shared by a results table and its list are counted once
+        seen = set()
+        return sum(approximate_size(state[key], seen) for key in OFFLOAD_KEYS + DERIVED_KEYS if key in state)
+
+    def resident_bytes(self):
+        return sum(session.size for session in self._sessions.values() if not session.offloaded)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "offloaded_sessions": sum(session.offloaded for session in self._sessions.values()),
+                "resident_bytes": self.resident_bytes(),
+                "budget_bytes": self.budget_bytes,
+                "offloads": self.offloads,
+                "reloads": self.reloads
+            }
+
+    def _reload(self, session_id, state):
+        data = self.store.pop_session_state(session_id)
+        if data is not None:
+            for key, value in pickle.loads(data).items():
+                # Anything the session has set since (a reset, a new result list) is newer
+                if key not in state:
+                    state[key] = value
+            self.reloads += 1
+
+    def _offload(self, session_id, state):
+        saved = {key: state[key] for key in OFFLOAD_KEYS if key in state}
+        self.store.save_session_state(session_id, pickle.dumps(saved, protocol=pickle.HIGHEST_PROTOCOL))
+        for key in saved:
+            del state[key]
+        for key in DERIVED_KEYS:
+            if key in state:
+                del state[key]
+        self.offloads += 1
+
+    def _enforce_budget(self, active_session_id):
+        # Sessions whose state was garbage collected no longer use memory
+        for session_id in [sid for sid, s in self._sessions.items() if s.ref() is None]:
+            if self._sessions.pop(session_id).offloaded:
+                self.store.pop_session_state(session_id)
+
+        resident = self.resident_bytes()
+        if resident <= self.budget_bytes:
+            return
+
+        idle_before = self.clock() - self.idle_seconds
+        candidates = sorted(
+            (s.last_seen, sid) for sid, s in self._sessions.items()
+            if sid != active_session_id and not s.offloaded and s.size and s.last_seen <= idle_before
+        )
+        for _, session_id in candidates:
+            if resident <= self.budget_bytes:
+                break
+            session = self._sessions[session_id]
+            state = session.state()
+            if state is None:
+                continue
+            self._offload(session_id, state)
+            session.offloaded = True
+            resident -= session.size
@@ -0,0 +1,115 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Reruns slower than this (wall-clock milliseconds) are logged with the session's stage and state sizes
+SLOW_RERUN_MS_ENV = "BIAS_SIMULATOR_SLOW_RERUN_MS"
+DEFAULT_SLOW_RERUN_MS = 1000
+
+# Sessions tracked at once; the least recently active are forgotten first
+DEFAULT_MAX_SESSIONS = 10000
+
+
+def configured_slow_rerun_seconds():
+    value = os.environ.get(SLOW_RERUN_MS_ENV)
+    return (float(value) if value else DEFAULT_SLOW_RERUN_MS) / 1000
+
+
+class _SessionStats:
+    __slots__ = ("reruns", "cpu_seconds", "wall_seconds", "slowest_seconds", "slowest_stage", "slow_reruns",
+                 "stage", "last_seen")
+
+    def __init__(self):
+        self.reruns = 0
+        self.cpu_seconds = 0.0
+        self.wall_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_stage = None
+        self.slow_reruns = 0
+        self.stage = None
+        self.last_seen = 0.0
+
+
+class SessionCpuTracker:
+    """
+    CPU time and rerun counts accumulated per session.
+
+    Streamlit runs each session's reruns on that session's script thread,
+    so the thread's CPU time over a rerun is the session's own. Reruns
+    slower than slow_seconds are counted and logged with the stage and
+    the sizes returned by describe(), which is only called for those.
+    """
+
+    def __init__(self, slow_seconds, max_sessions=DEFAULT_MAX_SESSIONS, log=logger, clock=time.time):
+        self.slow_seconds = slow_seconds
+        self.max_sessions = max_sessions
+        self.log = log
+        self.clock = clock
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def measure(self, session_id, stage, func, describe=None):
+        """Call func and charge its thread CPU and wall time to the session, even if it raises."""
+        cpu_start = time.thread_time()
+        wall_start = time.perf_counter()
+        try:
+            return func()
+        finally:
+            self.record(session_id, stage, time.thread_time() - cpu_start, time.perf_counter() - wall_start,
+                        describe)
+
+    def record(self, session_id, stage, cpu_seconds, wall_seconds, describe=None):
+        with self._lock:
+            stats = self._sessions.get(session_id)
+            if stats is None:
+                stats = self._sessions[session_id] = _SessionStats()
+                if len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session_id)
+            stats.reruns += 1
+            stats.cpu_seconds += cpu_seconds
+            stats.wall_seconds += wall_seconds
+            if wall_seconds >= stats.slowest_seconds:
+                stats.slowest_seconds = wall_seconds
+                stats.slowest_stage = stage
+            stats.stage = stage
+            stats.last_seen = self.clock()
+            slow = wall_seconds > self.slow_seconds
+            if slow:
+                stats.slow_reruns += 1
+
+        if slow:
+            sizes = describe() if describe is not None else {}
+            self.log.warning("Slow rerun in session %s at stage %s: %.0f ms (%.0f ms CPU); %s",
+                             session_id, stage, wall_seconds * 1000, cpu_seconds * 1000,
+                             ", ".join(f"{key}={value:,}" for key, value in sizes.items()) or "no state sizes")
+
+    def top(self, n=10):
+        """The n sessions that used the most CPU, as dicts, most expensive first."""
+        with self._lock:
+            rows = [{
+                "session_id": session_id,
+                "reruns": stats.reruns,
+                "cpu_seconds": stats.cpu_seconds,
+                "cpu_ms_per_rerun": stats.cpu_seconds * 1000 / stats.reruns,
+                "slowest_ms": stats.slowest_seconds * 1000,
+                "slowest_stage": stats.slowest_stage,
+                "slow_reruns": stats.slow_reruns,
+                "stage": stats.stage,
+                "last_seen": stats.last_seen
+            } for session_id, stats in self._sessions.items()]
+        return sorted(rows, key=lambda row: -row["cpu_seconds"])[:n]
+
+    def totals(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "reruns": sum(stats.reruns for stats in self._sessions.values()),
+                "cpu_seconds": sum(stats.cpu_seconds for stats in self._sessions.values()),
+                "slow_reruns": sum(stats.slow_reruns for stats in self._sessions.values())
+            }
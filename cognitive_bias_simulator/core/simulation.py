@@ -0,0 +1,242 @@
+"""
+Offline cohort simulation across all three biases.
+
+Respondents are simulated in shards on a process pool. Each shard gets
+its own RNG stream spawned from one seed and returns a Summary of
+mergeable statistics instead of raw rows, so the parent process only ever
+holds one summary per bias. The parent merges the shards in plan order
+with its own seeded RNG, so a run is reproducible whatever the number of
+workers or the order the shards finish in.
+"""
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from core import anchor_design, anchoring, confirmation, respondents
+from core.catalogs import framing_scenarios, frame_types, scenarios, tasks
+from core.sketch import KLLSketch
+from core.wason import WasonSession
+
+BIASES = ("anchoring", "framing", "confirmation")
+
+DEFAULT_SHARD_SIZE = 5000
+
+
+class RunningStats:
+    """Count, mean and variance that can be merged (Chan et al.'s parallel update)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other):
+        if other.count:
+            total = self.count + other.count
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / total
+            self.m2 += other.m2 + delta * delta * self.count * other.count / total
+            self.count = total
+        return self
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+
+class Summary:
+    """Per-metric statistics, quantile sketches and label counts for a set of respondents."""
+
+    def __init__(self, rng=None):
+        self.respondents = 0
+        self.stats = {}
+        self.sketches = {}
+        self.counts = {}
+        self._rng = rng
+
+    def add(self, key, value):
+        if key not in self.stats:
+            self.stats[key] = RunningStats()
+            self.sketches[key] = KLLSketch(rng=self._rng)
+        self.stats[key].add(value)
+        self.sketches[key].add(value)
+
+    def count(self, key, label):
+        counts = self.counts.setdefault(key, {})
+        counts[label] = counts.get(label, 0) + 1
+
+    def merge(self, other):
+        self.respondents += other.respondents
+        for key, stats in other.stats.items():
+            if key not in self.stats:
+                # Copied into a sketch of our own, so later compactions use our generator
+                self.stats[key] = RunningStats()
+                self.sketches[key] = KLLSketch(other.sketches[key].k, rng=self._rng)
+            self.stats[key].merge(stats)
+            self.sketches[key].merge(other.sketches[key])
+        for key, counts in other.counts.items():
+            merged = self.counts.setdefault(key, {})
+            for label, count in counts.items():
+                merged[label] = merged.get(label, 0) + count
+        return self
+
+    def rows(self):
+        """One row per metric with its count, mean, standard deviation and quartiles."""
+        rows = []
+        for key in sorted(self.stats):
+            stats = self.stats[key]
+            p25, p50, p75 = self.sketches[key].quantiles([0.25, 0.5, 0.75])
+            rows.append({
+                "metric": " / ".join(key),
+                "n": stats.count,
+                "mean": stats.mean,
+                "std": stats.std,
+                "p25": p25,
+                "median": p50,
+                "p75": p75
+            })
+        return rows
+
+
+def simulate_anchoring(rng, py_rng, n, params, summary):
+    weights = respondents.draw_parameters(rng, n, params["weight_low"], params["weight_high"])
+    design = params.get("design", "log_uniform")
+    for task in tasks:
+        anchors = np.array([anchor_design.generate_anchor(task, design, py_rng) for _ in range(n)])
+        estimates = respondents.anchoring_estimates(rng, task["actual_value"], anchors, weights, params["noise_sd"])
+        for anchor, estimate in zip(anchors.tolist(), estimates.tolist()):
+            # The higher/lower guess follows the respondent's own belief
+            guess = "higher" if estimate > anchor else "lower"
+            guess_correct = guess == anchoring.actual_comparison(task["actual_value"], anchor)
+            result = anchoring.score_estimate(task, anchor, estimate, guess, guess_correct, design)
+            summary.add(("anchor_pull", task["id"]), result["anchor_pull"])
+            summary.add(("percentage_diff", task["id"]), result["percentage_diff"])
+            summary.count(("anchoring_effect", task["id"]),
+                          anchoring.classify_anchoring_effect(anchor, estimate, task["actual_value"]))
+
+
+def simulate_framing(rng, py_rng, n, params, summary):
+    susceptibility = respondents.draw_parameters(rng, n, params["susceptibility_low"], params["susceptibility_high"])
+    for experiment_type, experiment_scenarios in framing_scenarios.items():
+        for scenario in experiment_scenarios:
+            frames = rng.choice(frame_types[experiment_type], size=n)
+            responses = respondents.framing_responses(rng, experiment_type, frames, susceptibility,
+                                                      params["base_rating"], params["rating_sd"])
+            for frame, response in zip(frames.tolist(), responses.tolist()):
+                if experiment_type == "risk":
+                    summary.count(("choice", scenario["id"], frame), response)
+                else:
+                    summary.add(("rating", scenario["id"], frame), response)
+
+
+def simulate_confirmation(rng, py_rng, n, params, summary):
+    bias = respondents.draw_parameters(rng, n, params["bias_low"], params["bias_high"])
+    for scenario in scenarios:
+        evidence_ids = [evidence["id"] for evidence in scenario["evidence"]]
+        stance_indices = rng.integers(0, len(scenario["stance_options"]), size=n)
+        for stance_index in range(len(scenario["stance_options"])):
+            rows = np.flatnonzero(stance_indices == stance_index)
+            if not len(rows):
+                continue
+            stance = scenario["stance_options"][stance_index]
+            evidence_types = confirmation.get_evidence_types(scenario["id"], stance)
+            direction = np.array([{"supporting": 1, "contradicting": -1}.get(evidence_types[evidence_id], 0)
+                                  for evidence_id in evidence_ids])
+            ratings = respondents.evidence_ratings(rng, np.tile(direction, (len(rows), 1)), bias[rows],
+                                                   params["base_rating"], params["rating_sd"])
+            for row_ratings in ratings.tolist():
+                evidence_ratings = {}
+                confirmation.update_evidence_ratings(evidence_ratings, scenario["id"], stance,
+                                                     dict(zip(evidence_ids, row_ratings)))
+                score = confirmation.confirming_bias_score(evidence_ratings, scenario["id"])
+                summary.add(("confirming_bias_score", scenario["id"]), score)
+                summary.count(("confirming_bias", scenario["id"]), confirmation.classify_confirming_bias(score))
+
+    wason = params.get("wason", respondents.DEFAULT_PARAMS["wason"])
+    confirm_probability = respondents.draw_parameters(rng, n, wason["confirm_low"], wason["confirm_high"])
+    for sequences in respondents.wason_sequences(rng, confirm_probability, wason["tests"]).tolist():
+        session = WasonSession()
+        for sequence in sequences:
+            session.test_sequence(sequence, timestamp=0.0)
+        summary.add(("wason_confirming_percent",), session.strategy_stats()["confirming_percent"])
+
+
+SIMULATORS = {
+    "anchoring": simulate_anchoring,
+    "framing": simulate_framing,
+    "confirmation": simulate_confirmation
+}
+
+
+def simulate_shard(bias, n, seed, params=None):
+    """Simulate n respondents of one bias from a seed sequence and summarise them."""
+    if params is None:
+        params = respondents.DEFAULT_PARAMS[bias]
+    rng = np.random.default_rng(seed)
+    # The anchor designs and sketches use the standard library's generator interface
+    py_rng = random.Random(int(seed.generate_state(1)[0]))
+    summary = Summary(rng=py_rng)
+    SIMULATORS[bias](rng, py_rng, n, params, summary)
+    summary.respondents = n
+    return summary
+
+
+def plan_shards(biases, n_respondents, shard_size, seed):
+    """(bias, size, seed sequence) for every shard, with one independent RNG stream each."""
+    sizes = []
+    for bias in biases:
+        full, rest = divmod(n_respondents, shard_size)
+        sizes += [(bias, shard_size)] * full + ([(bias, rest)] if rest else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    return [(bias, size, shard_seed) for (bias, size), shard_seed in zip(sizes, seeds)]
+
+
+def run(biases=BIASES, n_respondents=10000, shard_size=DEFAULT_SHARD_SIZE, workers=None, seed=0,
+        params=None, progress=None):
+    """
+    Simulate n_respondents per bias and return a Summary for each bias.
+
+    progress, if given, is called as progress(done_shards, total_shards,
+    respondents_done, elapsed_seconds) after every shard.
+    """
+    params = params or {}
+    shards = plan_shards(biases, n_respondents, shard_size, seed)
+    # The root sequence's own state is independent of the streams spawned from it for the shards
+    parent_seeds = np.random.SeedSequence(seed).generate_state(len(biases))
+    summaries = {bias: Summary(rng=random.Random(int(parent_seed)))
+                 for bias, parent_seed in zip(biases, parent_seeds)}
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    done = 0
+    respondents_done = 0
+    # Shards that finished ahead of an earlier one wait here to be merged in plan order
+    finished = {}
+    next_index = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(simulate_shard, bias, size, shard_seed, params.get(bias)): index
+            for index, (bias, size, shard_seed) in enumerate(shards)
+        }
+        for future in as_completed(futures):
+            summary = future.result()
+            finished[futures[future]] = summary
+            while next_index in finished:
+                summaries[shards[next_index][0]].merge(finished.pop(next_index))
+                next_index += 1
+            done += 1
+            respondents_done += summary.respondents
+            if progress is not None:
+                progress(done, len(shards), respondents_done, time.perf_counter() - start)
+
+    return summaries
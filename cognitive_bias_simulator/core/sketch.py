@@ -0,0 +1,220 @@
+import json
+import math
+import random
+import threading
+import uuid
+from bisect import bisect_right
+
+DEFAULT_K = 200
+
+
+class KLLSketch:
+    """
+    KLL streaming quantile sketch (Karnin, Lang & Liberty, 2016).
+
+    Keeps O(k) values however many are added: level h holds values that
+    each stand for 2**h originals, and a full level is compacted by sorting
+    it and promoting every other value to the next level. Ranks are
+    accurate to about 1.7/k of n. Sketches of the same k can be merged, so
+    per-process sketches combine into one for the whole cohort.
+    """
+
+    def __init__(self, k=DEFAULT_K, rng=None):
+        self.k = k
+        self.n = 0
+        self.min = None
+        self.max = None
+        self.levels = [[]]
+        self._rng = rng or random.Random()
+        self._cdf = None
+        self._retained = 0
+        self._limit = self._max_retained()
+
+    def __len__(self):
+        return self.n
+
+    def _capacity(self, level):
+        # Lower levels get geometrically smaller capacities, with at least 2 slots
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _max_retained(self):
+        return sum(self._capacity(level) for level in range(len(self.levels)))
+
+    def _grow(self):
+        self.levels.append([])
+        self._limit = self._max_retained()
+
+    def add(self, value):
+        value = float(value)
+        self.levels[0].append(value)
+        self.n += 1
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        self._cdf = None
+        self._retained += 1
+        if self._retained >= self._limit:
+            self._compress()
+
+    def _compress(self):
+        for level in range(len(self.levels)):
+            if len(self.levels[level]) >= self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self._grow()
+                items = sorted(self.levels[level])
+                # An odd value out stays behind so no weight is lost
+                keep = [items.pop()] if len(items) % 2 else []
+                offset = self._rng.randint(0, 1)
+                promoted = items[offset::2]
+                self._retained -= len(self.levels[level]) - len(keep) - len(promoted)
+                self.levels[level + 1].extend(promoted)
+                self.levels[level] = keep
+                if self._retained < self._limit:
+                    break
+
+    def merge(self, other):
+        """Add another sketch's values to this one."""
+        if other.k != self.k:
+            raise ValueError("Only sketches with the same k can be merged")
+        while len(self.levels) < len(other.levels):
+            self._grow()
+        for level, items in enumerate(other.levels):
+            self.levels[level].extend(items)
+            self._retained += len(items)
+        self.n += other.n
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        self._cdf = None
+        while self._retained >= self._limit:
+            self._compress()
+        return self
+
+    def copy(self):
+        return KLLSketch.from_dict(self.to_dict())
+
+    def _weighted_cdf(self):
+        if self._cdf is None:
+            weighted = sorted((value, 2 ** level) for level, items in enumerate(self.levels) for value in items)
+            values = []
+            cumulative = []
+            total = 0
+            for value, weight in weighted:
+                total += weight
+                values.append(value)
+                cumulative.append(total)
+            self._cdf = (values, cumulative, total)
+        return self._cdf
+
+    def rank(self, value):
+        """Approximate fraction of added values that are <= value."""
+        if not self.n:
+            return None
+        values, cumulative, total = self._weighted_cdf()
+        index = bisect_right(values, value)
+        return cumulative[index - 1] / total if index else 0.0
+
+    def quantile(self, q):
+        """Approximate value at fraction q (0 to 1) of the distribution."""
+        if not self.n:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        values, cumulative, total = self._weighted_cdf()
+        index = bisect_right(cumulative, q * total)
+        return values[min(index, len(values) - 1)]
+
+    def quantiles(self, qs):
+        return [self.quantile(q) for q in qs]
+
+    def histogram(self, edges):
+        """Approximate counts of values between consecutive edges."""
+        if not self.n:
+            return [0] * (len(edges) - 1)
+        ranks = [self.rank(edge) for edge in edges]
+        return [round((upper - lower) * self.n) for lower, upper in zip(ranks, ranks[1:])]
+
+    def to_dict(self):
+        return {"k": self.k, "n": self.n, "min": self.min, "max": self.max, "levels": self.levels}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["k"])
+        sketch.n = data["n"]
+        sketch.min = data["min"]
+        sketch.max = data["max"]
+        sketch.levels = [list(items) for items in data["levels"]]
+        sketch._retained = sum(len(items) for items in sketch.levels)
+        sketch._limit = sketch._max_retained()
+        return sketch
+
+
+# Sketches of the values recorded by this process, and of everything
+# loaded from the results store when it started
+_local = {}
+_baseline = {}
+_merged = {}
+_lock = threading.Lock()
+
+# Identifies this process's rows in the results store
+SOURCE = uuid.uuid4().hex
+
+
+def record_value(key, value):
+    with _lock:
+        if key not in _local:
+            _local[key] = KLLSketch()
+        _local[key].add(value)
+        _merged.pop(key, None)
+
+
+def get(key):
+    """The combined sketch for a key, or None if nothing was recorded for it."""
+    with _lock:
+        if key not in _merged:
+            parts = [sketches[key] for sketches in (_baseline, _local) if key in sketches]
+            if not parts:
+                return None
+            merged = parts[0].copy()
+            for part in parts[1:]:
+                merged.merge(part)
+            _merged[key] = merged
+        return _merged[key]
+
+
+def keys():
+    with _lock:
+        return sorted(set(_baseline) | set(_local))
+
+
+def _encode_key(key):
+    return json.dumps(list(key))
+
+
+def save(store):
+    """Write this process's sketches to the results store, replacing its earlier save."""
+    with _lock:
+        rows = [(_encode_key(key), json.dumps(sketch.to_dict())) for key, sketch in _local.items()]
+    store.save_sketches(SOURCE, rows)
+
+
+def load(store):
+    """Merge the sketches other processes saved to the results store into the baseline."""
+    loaded = {}
+    for source, key, data in store.load_sketches():
+        if source == SOURCE:
+            continue
+        key = tuple(json.loads(key))
+        sketch = KLLSketch.from_dict(json.loads(data))
+        if key in loaded:
+            loaded[key].merge(sketch)
+        else:
+            loaded[key] = sketch
+    with _lock:
+        _baseline.clear()
+        _baseline.update(loaded)
+        _merged.clear()
@@ -0,0 +1,177 @@
+"""
+Span tracing with a local file exporter.
+
+Code marks the work it does with `with tracing.span(name, **attributes)`.
+Spans nest through a context variable, each outermost span starts a new
+trace, and a trace's spans are written together when it ends, in Chrome's
+trace-event format (JSON array of complete "X" events), which
+chrome://tracing, Perfetto and speedscope open directly. The closing
+bracket of the array is optional in that format, so events are simply
+appended to the file.
+
+Until configure() is given a path, span() returns a shared no-op span.
+"""
+import contextvars
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+
+# File traces are appended to; tracing is off when it is not set
+TRACE_FILE_ENV = "BIAS_SIMULATOR_TRACE_FILE"
+
+
+def configured_path():
+    return os.environ.get(TRACE_FILE_ENV) or None
+
+
+class ChromeTraceExporter:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+        if self._file.tell() == 0:
+            self._file.write("[\n")
+            self._file.flush()
+
+    def export(self, spans):
+        pid = os.getpid()
+        lines = []
+        for span in spans:
+            args = dict(span.attributes, trace_id=span.trace_id, span_id=span.span_id)
+            if span.parent is not None:
+                args["parent_id"] = span.parent.span_id
+            lines.append(json.dumps({
+                "name": span.name,
+                "cat": "bias_simulator",
+                "ph": "X",
+                "ts": span.start_ns / 1000,
+                "dur": span.duration_ns / 1000,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": args
+            }, default=str) + ",\n")
+        with self._lock:
+            self._file.write("".join(lines))
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class Span:
+    __slots__ = ("name", "attributes", "parent", "trace", "trace_id", "span_id", "thread_id",
+                 "start_ns", "duration_ns", "_start_counter")
+
+    def __init__(self, name, attributes, parent, span_id):
+        self.name = name
+        self.attributes = attributes
+        self.parent = parent
+        self.span_id = span_id
+        # Every span of a trace shares the root's list, which is exported when the root ends
+        self.trace = parent.trace if parent is not None else []
+        self.trace_id = parent.trace_id if parent is not None else span_id
+        self.thread_id = threading.get_ident()
+        self.start_ns = time.time_ns()
+        self.duration_ns = 0
+        self._start_counter = time.perf_counter_ns()
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **attributes):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _ActiveSpan:
+    """Context manager that starts a span on enter and records it on exit."""
+
+    __slots__ = ("tracer", "name", "attributes", "span", "token")
+
+    def __init__(self, tracer, name, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self):
+        self.span = self.tracer.start(self.name, self.attributes)
+        self.token = self.tracer.current.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is not None:
+            # Includes Streamlit's rerun and stop exceptions, which end a rerun early
+            self.span.attributes["exception"] = exc_type.__name__
+        self.tracer.current.reset(self.token)
+        self.tracer.finish(self.span)
+        return False
+
+
+class Tracer:
+    def __init__(self, exporter):
+        self.exporter = exporter
+        self.current = contextvars.ContextVar("current_span", default=None)
+        self._ids = itertools.count(1)
+
+    def span(self, name, **attributes):
+        return _ActiveSpan(self, name, attributes)
+
+    def start(self, name, attributes):
+        # Spans from different processes appending to one file still get distinct ids
+        span_id = f"{os.getpid():x}-{next(self._ids):x}"
+        return Span(name, attributes, self.current.get(), span_id)
+
+    def finish(self, span):
+        span.duration_ns = time.perf_counter_ns() - span._start_counter
+        span.trace.append(span)
+        if span.parent is None:
+            self.exporter.export(span.trace)
+
+
+_tracer = None
+
+
+def configure(path):
+    """Send spans to the trace file at path, or turn tracing off if path is None."""
+    global _tracer
+    previous = _tracer
+    _tracer = Tracer(ChromeTraceExporter(path)) if path else None
+    if previous is not None:
+        previous.exporter.close()
+
+
+def enabled():
+    return _tracer is not None
+
+
+def span(name, **attributes):
+    if _tracer is None:
+        return NULL_SPAN
+    return _tracer.span(name, **attributes)
+
+
+def traced(name):
+    """Decorator that runs each call of a function in a span called name."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with _tracer.span(name, function=func.__name__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,96 @@
+from array import array
+from datetime import datetime
+import time
+
+
+def is_ascending_sequence(sequence):
+    """Check if a sequence is strictly ascending."""
+    if len(sequence) < 2:
+        return False
+    return all(sequence[i] < sequence[i+1] for i in range(len(sequence)-1))
+
+# This function checks if the user might be testing the common misconception
+# that the rule is "increasing by 2 each time"
+def is_potentially_confirming(sequence):
+    """Determine if a sequence is potentially confirming a +2 pattern."""
+    if len(sequence) < 3:
+        return False
+
+    # Check if the sequence follows a +2 pattern or any other simple arithmetic pattern
+    differences = [sequence[i+1] - sequence[i] for i in range(len(sequence)-1)]
+    return len(set(differences)) == 1
+
+
+class WasonSession:
+    """
+    One participant's sequence tests in the Wason 2-4-6 task.
+
+    Tests are stored in an append-only table of typed columns, and the
+    confirming/disconfirming counts are kept up to date as tests are added,
+    so recording a test and reading the strategy statistics are O(1)
+    however many sequences have been tested.
+    """
+
+    def __init__(self):
+        self.first = array('q')
+        self.second = array('q')
+        self.third = array('q')
+        self.follows_rule = array('b')
+        self.is_confirming = array('b')
+        self.timestamps = array('d')
+        self.confirming_tests = 0
+        self.disconfirming_tests = 0
+        self.rule_guesses = []
+        # History rows formatted for display, extended only with new tests
+        self._history_rows = []
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def test_sequence(self, sequence, timestamp=None):
+        """Record a tested sequence and return whether it follows the rule."""
+        follows_rule = is_ascending_sequence(sequence)
+        is_confirming = is_potentially_confirming(sequence)
+
+        self.first.append(int(sequence[0]))
+        self.second.append(int(sequence[1]))
+        self.third.append(int(sequence[2]))
+        self.follows_rule.append(follows_rule)
+        self.is_confirming.append(is_confirming)
+        self.timestamps.append(time.time() if timestamp is None else timestamp)
+
+        if is_confirming:
+            self.confirming_tests += 1
+        else:
+            self.disconfirming_tests += 1
+
+        return follows_rule
+
+    def sequence(self, index):
+        return (self.first[index], self.second[index], self.third[index])
+
+    def strategy_stats(self):
+        """Return the counts and percentages of confirming and disconfirming tests."""
+        total_tests = self.confirming_tests + self.disconfirming_tests
+        if total_tests == 0:
+            confirming_percent = disconfirming_percent = 0.0
+        else:
+            confirming_percent = (self.confirming_tests / total_tests) * 100
+            disconfirming_percent = (self.disconfirming_tests / total_tests) * 100
+        return {
+            "total_tests": total_tests,
+            "confirming_tests": self.confirming_tests,
+            "disconfirming_tests": self.disconfirming_tests,
+            "confirming_percent": confirming_percent,
+            "disconfirming_percent": disconfirming_percent
+        }
+
+    def history_rows(self):
+        """Return the display rows for all tests, formatting only tests added since the last call."""
+        for i in range(len(self._history_rows), len(self)):
+            self._history_rows.append({
+                "Sequence": ", ".join(str(n) for n in self.sequence(i)),
+                "Follows Rule": "✅ Yes" if self.follows_rule[i] else "❌ No",
+                "Time": datetime.fromtimestamp(self.timestamps[i]).strftime("%H:%M:%S")
+            })
+        return self._history_rows
@@ -0,0 +1,136 @@
+import atexit
+import json
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+# Attempts at writing a batch before its records are logged and dropped
+WRITE_ATTEMPTS = 3
+RETRY_DELAY = 0.5
+
+
+class WriteBehindQueue:
+    """
+    Buffers result records in memory and writes them to a ResultsStore in
+    batches from a background thread.
+
+    put() serializes the record and enqueues it without blocking, so the
+    caller never waits on the database and later changes to the record
+    don't reach the store. When the queue is full the record is dropped
+    and logged rather than holding up the caller. A batch that fails to
+    write is retried, then its records are logged and dropped. Records
+    still queued are flushed on close() and at exit.
+
+    on_batch, if given, is called on the writer thread after every batch
+    written, e.g. to save state that should stay in step with the stored
+    results.
+    """
+
+    def __init__(self, store, max_size=10000, batch_size=500, flush_interval=0.5, on_batch=None):
+        self.store = store
+        self.on_batch = on_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_size)
+        self._thread = None
+        self._closed = False
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="results-write-behind", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+        return self
+
+    def put(self, session_id, bias, record):
+        """Queue a record for writing; returns False if the queue was full and it was dropped."""
+        if self._closed:
+            raise RuntimeError("write-behind queue is closed")
+        row = (session_id, bias, json.dumps(record))
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+            logger.error("Write-behind queue full, dropped %s result for session %s: %s", bias, session_id, row[2])
+            return False
+        return True
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def flush(self):
+        """Block until every record queued so far has been written."""
+        self._queue.join()
+
+    def close(self):
+        """Write out the queued records and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+        atexit.unregister(self.close)
+
+    def _next_batch(self):
+        try:
+            first = self._queue.get(timeout=self.flush_interval)
+        except queue.Empty:
+            return []
+        batch = [first]
+        while first is not _STOP and len(batch) < self.batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            if item is _STOP:
+                break
+        return batch
+
+    def _write(self, rows):
+        for attempt in range(1, WRITE_ATTEMPTS + 1):
+            try:
+                self.written += self.store.insert_many(rows)
+                self.batches += 1
+                break
+            except Exception:
+                if attempt < WRITE_ATTEMPTS:
+                    logger.warning("Failed to write %d result records, retrying", len(rows), exc_info=True)
+                    time.sleep(RETRY_DELAY * attempt)
+                else:
+                    logger.exception("Failed to write %d result records, dropping them", len(rows))
+        else:
+            self.failed += len(rows)
+            # The lost records are logged in full so they can be recovered by hand
+            for row in rows:
+                logger.error("Dropped %s result for session %s: %s", row[1], row[0], row[2])
+            return
+
+        if self.on_batch is not None:
+            try:
+                self.on_batch()
+            except Exception:
+                logger.exception("on_batch failed after writing %d result records", len(rows))
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = self._next_batch()
+            if not batch:
+                continue
+            stopping = batch[-1] is _STOP
+            rows = batch[:-1] if stopping else batch
+            if rows:
+                self._write(rows)
+            for _ in batch:
+                self._queue.task_done()
@@ -0,0 +1,75 @@
+"""
+Import results collected outside the app into the results database.
+
+    python import_results.py survey.csv paper.jsonl --db results.db
+
+Files are streamed and written in chunks, so they can be larger than
+memory; progress and throughput are printed to stderr after every chunk,
+and rows that can't be scored are reported and skipped. The row format is
+described in core/importer.py.
+"""
+import argparse
+import sys
+
+from core import importer, sketch
+from core.results_store import ResultsStore, configured_path
+
+
+def print_progress(stats):
+    elapsed = stats["elapsed"]
+    rows_rate = stats["rows"] / elapsed if elapsed else 0.0
+    bytes_rate = stats["bytes"] / elapsed / 2 ** 20 if elapsed else 0.0
+    print(f"\r{stats['rows']:,} rows, {stats['imported']:,} imported, {stats['skipped']:,} skipped, "
+          f"{rows_rate:,.0f} rows/s, {bytes_rate:,.1f} MiB/s", end="", file=sys.stderr)
+
+
+def error_reporter(path, max_errors):
+    """on_error callback that prints skipped rows and stops the file after max_errors of them."""
+    count = 0
+
+    def report(row, message):
+        nonlocal count
+        count += 1
+        print(f"\n{path}: row {row}: {message}", file=sys.stderr)
+        if count >= max_errors:
+            raise importer.RowError(f"Stopped after {max_errors} skipped rows; the chunks before were imported")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("files", nargs="+", help="CSV or JSON Lines exports")
+    parser.add_argument("--db", default=configured_path(),
+                        help="results database (default: $BIAS_SIMULATOR_RESULTS_DB)")
+    parser.add_argument("--format", choices=importer.FORMATS, default=None,
+                        help="file format (default: from each file's extension)")
+    parser.add_argument("--bias", choices=list(importer.SCORERS), default=None,
+                        help="bias of every row, for files without a bias column")
+    parser.add_argument("--chunk-size", type=int, default=importer.DEFAULT_CHUNK_SIZE,
+                        help="rows scored and written per transaction")
+    parser.add_argument("--max-errors", type=int, default=100, help="stop a file after this many skipped rows")
+    args = parser.parse_args(argv)
+    if not args.db:
+        parser.error("no results database given and BIAS_SIMULATOR_RESULTS_DB is not set")
+
+    store = ResultsStore(args.db)
+    try:
+        for path in args.files:
+            print(f"Importing {path}", file=sys.stderr)
+            try:
+                stats = importer.import_file(store, path, args.format, args.bias, args.chunk_size,
+                                             on_error=error_reporter(path, args.max_errors),
+                                             progress=print_progress)
+            except importer.RowError as e:
+                print(f"\n{path}: {e}", file=sys.stderr)
+                continue
+            print(f"\n{path}: {stats['imported']:,} of {stats['rows']:,} rows imported in {stats['elapsed']:,.1f} s",
+                  file=sys.stderr)
+    finally:
+        # The imported results' sketches join the cohort the next time the app loads them
+        sketch.save(store)
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
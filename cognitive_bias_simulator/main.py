@@ -2,6 +2,10 @@ import streamlit as st
 import confirmation_bias as cb
 import anchoring_bias as ab
 import framing_effect as fe
+from core import tracing
+from core.flow import choose_bias
+import admin
+from ui_helpers import run_rerun, track_session, warm_up_server
 
 # Set page configuration
 st.set_page_config(
@@ -16,6 +20,13 @@ if 'stage' not in st.session_state:
 if 'bias_type' not in st.session_state:
     st.session_state.bias_type = None
 
+# Each bias runs its own stage flow once selected
+simulators = {
+    "confirmation": cb.run_confirmation_bias_simulator,
+    "anchoring": ab.run_anchoring_bias_simulator,
+    "framing": fe.run_framing_effect_simulator
+}
+
 def reset_all():
     st.session_state.stage = 'intro'
     st.session_state.bias_type = None
@@ -24,6 +35,12 @@ def reset_all():
     fe.reset_framing_experiment()
 
 def main():
+    # Renders the cached charts and primes fonts while the first participant reads the intro
+    warm_up_server()
+
+    # Restores this session's results if they were offloaded while it was idle
+    track_session()
+
     st.title("🧠 Cognitive Bias Simulator")
 
     # Main application logic
@@ -52,32 +69,30 @@ def main():
         
         with col1:
             if st.button("Explore Confirmation Bias"):
-                st.session_state.bias_type = "confirmation"
-                st.session_state.stage = "bias_intro"
+                choose_bias(st.session_state, "confirmation")
                 st.rerun()
         
         with col2:
             if st.button("Explore Anchoring Bias"):
-                st.session_state.bias_type = "anchoring"
-                st.session_state.stage = "bias_intro"
+                choose_bias(st.session_state, "anchoring")
                 st.rerun()
         
         with col3:
             if st.button("Explore Framing Effect"):
-                st.session_state.bias_type = "framing"
-                st.session_state.stage = "bias_intro"
+                choose_bias(st.session_state, "framing")
                 st.rerun()
     
     # Run the appropriate bias simulator based on the user's selection
-    elif st.session_state.bias_type == "confirmation":
-        cb.run_confirmation_bias_simulator()
-    elif st.session_state.bias_type == "anchoring":
-        ab.run_anchoring_bias_simulator()
-    elif st.session_state.bias_type == "framing":
-        fe.run_framing_effect_simulator()
+    elif st.session_state.bias_type in simulators:
+        simulator = simulators[st.session_state.bias_type]
+        with tracing.span(simulator.__name__, stage=st.session_state.stage):
+            simulator()
 
     st.markdown("---")
     st.markdown("Created with Streamlit • Cognitive Bias Simulator")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if admin.admin_requested():
+        admin.display_admin_page()
+    else:
+        run_rerun(main)
\ No newline at end of file
@@ -0,0 +1,327 @@
+"""
+Write a report for every participant in the results database.
+
+    python reports.py results.db --out reports --workers 8 --format pdf
+
+Sessions are split into batches that are rendered on a process pool, each
+worker reading its sessions through its own database connection. Reports
+show the same charts as the app's result pages, with the results behind
+them as tables. Progress and reports/s are printed to stderr as batches
+finish, as are the sessions whose reports couldn't be written; the other
+reports are still written.
+"""
+import argparse
+import base64
+import html
+import math
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_pdf import PdfPages
+
+import charts
+from core import anchoring
+from core.confirmation import group_evidence_ratings
+from core.results_store import ResultsStore, configured_path, latest_attempts
+
+FORMATS = ("html", "pdf")
+
+DEFAULT_BATCH_SIZE = 50
+
+# Resolution of charts embedded in HTML reports
+HTML_DPI = 100
+
+# Framing experiment type -> (title, record field shown, its column heading)
+FRAMING_SECTIONS = {
+    "risk": ("Risk/Choice Framing", "user_choice", "Your Choice"),
+    "attribute": ("Attribute Framing", "user_rating", "Your Rating"),
+    "goal": ("Goal Framing", "user_rating", "Your Rating")
+}
+
+
+def anchoring_items(results):
+    yield "heading", "Anchoring Bias"
+    yield "table", ["Task", "Anchor", "Your Estimate", "Actual Value", "Error"], [
+        [result["task"], f"{int(result['anchor']):,} {result['unit']}", f"{int(result['estimate']):,} {result['unit']}",
+         f"{int(result['actual_value']):,} {result['unit']}", f"{result['percentage_diff']:.1f}%"]
+        for result in results]
+    yield "figure", charts.anchoring_results_figure(results)
+    fig = charts.anchoring_effects_figure(*anchoring.count_anchoring_effects(results))
+    if fig is not None:
+        yield "figure", fig
+
+
+def confirmation_items(results):
+    yield "heading", "Confirmation Bias"
+    yield "table", ["Scenario", "Stance", "Bias Score", "Confirmation Bias"], [
+        [result["scenario_title"], result["stance"], f"{result['confirming_bias_score']:.2f}",
+         result["confirming_bias"].capitalize()]
+        for result in results]
+    # Records stored before ratings were kept have no evidence chart
+    for result in results:
+        if result.get("ratings"):
+            grouped = group_evidence_ratings(result["scenario_id"], result["stance"], result["ratings"])
+            yield "subheading", f"Evidence Ratings: {result['scenario_title']}"
+            yield "figure", charts.evidence_ratings_figure(grouped)
+            neutral_ratings, neutral_texts = grouped["neutral"]
+            if neutral_ratings:
+                yield "table", ["Neutral Evidence", "Your Rating"], [
+                    [text, rating] for text, rating in zip(neutral_texts, neutral_ratings)]
+
+
+def framing_items(results):
+    yield "heading", "Framing Effect"
+    for experiment_type, (title, field, label) in FRAMING_SECTIONS.items():
+        type_results = [result for result in results if result["experiment_type"] == experiment_type]
+        if not type_results:
+            continue
+        yield "subheading", title
+        yield "table", ["Scenario", "Frame Type", label, "Date/Time"], [
+            [result["scenario_title"], result["frame_type"].capitalize(), result[field], result["timestamp"]]
+            for result in type_results]
+        # As in the app, the frames are only compared once there are two results
+        if len(type_results) >= 2:
+            yield "figure", charts.FRAMING_RESULTS_FIGURES[experiment_type](type_results)
+
+
+SECTIONS = {
+    "anchoring": anchoring_items,
+    "confirmation": confirmation_items,
+    "framing": framing_items
+}
+
+
+def report_items(records):
+    """
+    The contents of a report, in order, as ("heading", text),
+    ("subheading", text), ("table", columns, rows) and ("figure", fig)
+    items. Figures are created as the items are consumed and must be
+    closed by the consumer.
+    """
+    for bias, items in SECTIONS.items():
+        if records.get(bias):
+            yield from items(records[bias])
+
+
+def _html_table(columns, rows):
+    head = "".join(f"<th>{html.escape(str(column))}</th>" for column in columns)
+    body = "".join("<tr>" + "".join(f"<td>{html.escape(str(cell))}</td>" for cell in row) + "</tr>" for row in rows)
+    return f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+
+
+def write_html(path, session_id, records):
+    parts = []
+    for item in report_items(records):
+        kind = item[0]
+        if kind == "heading":
+            parts.append(f"<h2>{html.escape(item[1])}</h2>")
+        elif kind == "subheading":
+            parts.append(f"<h3>{html.escape(item[1])}</h3>")
+        elif kind == "table":
+            parts.append(_html_table(item[1], item[2]))
+        else:
+            image = base64.b64encode(charts.figure_png(item[1], dpi=HTML_DPI)).decode("ascii")
+            parts.append(f'<img src="data:image/png;base64,{image}" alt="">')
+
+    title = html.escape(f"Cognitive Bias Simulator: {session_id}")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<style>
+body {{ font-family: sans-serif; max-width: 60em; margin: 2em auto; }}
+table {{ border-collapse: collapse; margin: 1em 0; }}
+th, td {{ border: 1px solid #ccc; padding: 0.3em 0.6em; text-align: left; }}
+img {{ max-width: 100%; }}
+</style></head>
+<body><h1>{title}</h1>
+{chr(10).join(parts)}
+</body></html>
+""")
+
+
+def _text_page(lines):
+    """A page listing headings and tables, since PDF pages hold whole figures."""
+    fig = plt.figure(figsize=(8.27, 11.69))
+    y = 0.95
+    for kind, *content in lines:
+        if kind in ("heading", "subheading"):
+            fig.text(0.05, y, content[0], fontsize=16 if kind == "heading" else 13, weight="bold", va="top")
+            y -= 0.05
+        else:
+            columns, rows = content
+            height = 0.03 * (len(rows) + 1)
+            ax = fig.add_axes([0.05, y - height, 0.9, height])
+            ax.axis("off")
+            table = ax.table(cellText=[[str(cell) for cell in row] for row in rows], colLabels=columns,
+                             loc="upper center", cellLoc="left")
+            table.auto_set_font_size(False)
+            table.set_fontsize(8)
+            y -= height + 0.04
+    return fig
+
+
+def write_pdf(path, session_id, records):
+    with PdfPages(path) as pdf:
+        pdf.infodict()["Title"] = f"Cognitive Bias Simulator: {session_id}"
+        # Headings and tables are gathered onto a page until the next chart
+        lines = []
+        for item in report_items(records):
+            if item[0] == "figure":
+                if lines:
+                    fig = _text_page(lines)
+                    pdf.savefig(fig)
+                    plt.close(fig)
+                    lines = []
+                pdf.savefig(item[1], bbox_inches="tight")
+                plt.close(item[1])
+            else:
+                lines.append(item)
+        if lines:
+            fig = _text_page(lines)
+            pdf.savefig(fig)
+            plt.close(fig)
+
+
+WRITERS = {
+    "html": write_html,
+    "pdf": write_pdf
+}
+
+
+def report_path(directory, session_id, fmt):
+    return os.path.join(directory, re.sub(r"[^\w.-]", "_", session_id) + "." + fmt)
+
+
+def write_report(store, session_id, directory, fmt):
+    path = report_path(directory, session_id, fmt)
+    # Every attempt is stored; reports show the latest, as the app's results pages do
+    records = {bias: latest_attempts(bias, store.load(session_id, bias)) for bias in SECTIONS}
+    # Written next to the report and renamed over it, so a failed report
+    # never leaves a half-written file behind
+    temp_path = path + ".tmp"
+    try:
+        WRITERS[fmt](temp_path, session_id, records)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        plt.close("all")
+
+
+def write_batch(db_path, session_ids, directory, fmt):
+    """
+    Write the reports of a batch of sessions; runs in a worker process.
+    Returns how many were written and (session id, error) for the rest.
+    """
+    written = 0
+    failed = []
+    store = ResultsStore(db_path)
+    try:
+        for session_id in session_ids:
+            try:
+                write_report(store, session_id, directory, fmt)
+                written += 1
+            except Exception as e:
+                failed.append((session_id, f"{type(e).__name__}: {e}"))
+    finally:
+        store.close()
+    return written, failed
+
+
+def batch_size_for(sessions, workers, batch_size=None):
+    """Sessions per batch: at most DEFAULT_BATCH_SIZE, and small enough to give every worker a batch."""
+    if batch_size:
+        return batch_size
+    return max(1, min(DEFAULT_BATCH_SIZE, math.ceil(sessions / workers)))
+
+
+def write_reports(db_path, directory, fmt="html", session_ids=None, batch_size=None,
+                  workers=None, progress=None, on_error=None):
+    """
+    Write a report for each session (every session in the database by
+    default) and return how many were written.
+
+    Sessions whose report can't be written are skipped and passed to
+    on_error(session_id, message) if it is given. progress, if given, is
+    called as progress(done, total, elapsed_seconds) after every batch,
+    done counting the skipped sessions too.
+    """
+    if session_ids is None:
+        store = ResultsStore(db_path)
+        try:
+            session_ids = store.session_ids()
+        finally:
+            store.close()
+    os.makedirs(directory, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    batch_size = batch_size_for(len(session_ids), workers, batch_size)
+    batches = [session_ids[i:i + batch_size] for i in range(0, len(session_ids), batch_size)]
+    start = time.perf_counter()
+    written = 0
+    done = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(write_batch, db_path, batch, directory, fmt): batch for batch in batches}
+        for future in as_completed(futures):
+            try:
+                batch_written, failed = future.result()
+            except Exception as e:
+                # The whole batch failed, e.g. its worker couldn't open the database or died
+                batch_written, failed = 0, [(session_id, f"{type(e).__name__}: {e}") for session_id in futures[future]]
+            written += batch_written
+            done += batch_written + len(failed)
+            if on_error is not None:
+                for session_id, message in failed:
+                    on_error(session_id, message)
+            if progress is not None:
+                progress(done, len(session_ids), time.perf_counter() - start)
+
+    return written
+
+
+def print_progress(done, total, elapsed):
+    rate = done / elapsed if elapsed else 0.0
+    print(f"\r{done:,}/{total:,} reports, {rate:,.1f} reports/s", end="" if done < total else "\n",
+          file=sys.stderr)
+
+
+def error_reporter():
+    """An on_error callback printing each skipped session to stderr, with a count of them."""
+    def report(session_id, message):
+        report.count += 1
+        print(f"\nSkipped {session_id}: {message}", file=sys.stderr)
+
+    report.count = 0
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("db", nargs="?", default=configured_path(),
+                        help="results database (default: $BIAS_SIMULATOR_RESULTS_DB)")
+    parser.add_argument("--out", default="reports", help="directory to write reports to")
+    parser.add_argument("--format", choices=FORMATS, default="html")
+    parser.add_argument("--sessions", nargs="+", help="only these sessions (default: every session)")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help=f"sessions per worker task (default: up to {DEFAULT_BATCH_SIZE}, spread over the workers)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    args = parser.parse_args(argv)
+    if not args.db:
+        parser.error("no results database given and BIAS_SIMULATOR_RESULTS_DB is not set")
+
+    on_error = error_reporter()
+    written = write_reports(args.db, args.out, args.format, args.sessions, args.batch_size, args.workers,
+                            progress=print_progress, on_error=on_error)
+    print(f"{written:,} reports written to {args.out}, {on_error.count:,} skipped")
+
+
+if __name__ == "__main__":
+    main()
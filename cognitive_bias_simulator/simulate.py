@@ -0,0 +1,59 @@
+"""
+Simulate cohorts of respondents for the bias experiments.
+
+    python simulate.py --respondents 100000 --workers 8
+
+Shards run on a process pool and are merged into one summary per bias;
+progress and throughput are printed to stderr as shards finish.
+"""
+import argparse
+import sys
+
+from core import simulation
+
+
+def print_progress(done, total, respondents_done, elapsed):
+    rate = respondents_done / elapsed if elapsed else 0.0
+    print(f"\r{done}/{total} shards, {respondents_done:,} respondents, {rate:,.0f} respondents/s",
+          end="" if done < total else "\n", file=sys.stderr)
+
+
+def format_value(value):
+    return f"{value:,.3f}" if isinstance(value, float) else f"{value:,}"
+
+
+def print_summary(bias, summary):
+    print(f"\n== {bias} ({summary.respondents:,} respondents)")
+    rows = summary.rows()
+    if rows:
+        columns = list(rows[0])
+        table = [columns] + [[format_value(row[column]) if column != "metric" else row[column] for column in columns]
+                             for row in rows]
+        widths = [max(len(line[i]) for line in table) for i in range(len(columns))]
+        for line in table:
+            print("  ".join(cell.ljust(width) if i == 0 else cell.rjust(width)
+                            for i, (cell, width) in enumerate(zip(line, widths))))
+    for key in sorted(summary.counts):
+        counts = summary.counts[key]
+        total = sum(counts.values())
+        shares = ", ".join(f"{label} {count / total:.1%}" for label, count in sorted(counts.items()))
+        print(f"{' / '.join(key)}: {shares}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--biases", nargs="+", choices=simulation.BIASES, default=list(simulation.BIASES))
+    parser.add_argument("--respondents", type=int, default=10000, help="respondents per bias")
+    parser.add_argument("--shard-size", type=int, default=simulation.DEFAULT_SHARD_SIZE)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    summaries = simulation.run(args.biases, args.respondents, args.shard_size, args.workers, args.seed,
+                               progress=print_progress)
+    for bias, summary in summaries.items():
+        print_summary(bias, summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+import atexit
+import functools
+import os
+import tempfile
+import threading
+import uuid
+
+import streamlit as st
+
+import content
+import warmup
+from chart_pool import ChartPool, ChartTimeout, configured_timeout, configured_workers
+from core import cohort, sketch, tracing
+from core.allocations import AllocationTracker, configured_log_path, file_logger
+from core.profiling import ProfileStore, configured_directory
+from core.results_store import ResultsStore, configured_path
+from core.results_table import ResultsTable
+from core.session_memory import SessionMemoryManager, configured_budget_bytes, configured_idle_seconds
+from core.session_stats import SessionCpuTracker, configured_slow_rerun_seconds
+from core.write_behind import WriteBehindQueue
+
+try:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+except ImportError:
+    get_script_run_ctx = None
+
+
+def _passthrough(func):
+    return func
+
+
+# st.fragment was called st.experimental_fragment in older Streamlit releases.
+# Without either, sections simply render as part of the full rerun.
+_st_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or _passthrough
+
+
+def fragment(func):
+    """
+    st.fragment, restoring offloaded session state before the fragment's
+    own reruns and measuring, profiling and tracing them as run_rerun()
+    does full reruns.
+    """
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        # A fragment rerun skips main() and its track_session(), so an offloaded
+        # session would otherwise run (and write) without its state
+        reload_session()
+        if getattr(_full_rerun, "active", False):
+            # Part of a full rerun, which is already measured as a whole
+            return func(*args, **kwargs)
+        stage = st.session_state.get("stage", "intro")
+        return _run_measured("fragment", lambda: func(*args, **kwargs), stage, f"{stage}.{func.__name__}",
+                             fragment=func.__name__)
+    return _st_fragment(run)
+
+# st.toggle is newer than st.checkbox, which works the same way here
+toggle = getattr(st, "toggle", None) or st.checkbox
+
+# Long educational sections start collapsed and are only sent once opened
+LAZY_SECTIONS = True
+
+
+def query_param(name):
+    """A query string parameter of the current page, or None."""
+    query_params = getattr(st, "query_params", None)
+    if query_params is not None:
+        return query_params.get(name)
+    # Releases before st.query_params return a list per parameter
+    values = st.experimental_get_query_params().get(name)
+    return values[0] if values else None
+
+
+def show_section(name):
+    st.markdown(content.section(name))
+
+
+@fragment
+def lazy_section(name, label):
+    """Show a content section behind a toggle; opening it only reruns this fragment."""
+    if not LAZY_SECTIONS or toggle(label, key=f"show_{name}"):
+        st.markdown(content.section(name))
+
+
+@st.cache_resource
+def warm_up_server():
+    """Start the warm-up steps once per server process, without holding up this rerun."""
+    return warmup.start(warmup.SERVER_STEPS)
+
+
+@st.cache_resource
+def profile_store():
+    return ProfileStore(configured_directory())
+
+
+@st.cache_resource
+def allocation_tracker():
+    """The process-wide allocation tracker, or None when allocation tracking is off."""
+    path = configured_log_path()
+    if path is None:
+        return None
+    return AllocationTracker(log=file_logger(path))
+
+
+@st.cache_resource
+def configure_tracing():
+    """Point span tracing at BIAS_SIMULATOR_TRACE_FILE, once per process."""
+    tracing.configure(tracing.configured_path())
+    return tracing.enabled()
+
+
+@st.cache_resource
+def results_store():
+    """The process-wide results store, or None when persistence is off."""
+    path = configured_path()
+    if path is None:
+        return None
+    store = ResultsStore(path)
+    # Cohort comparisons include everyone stored so far, not just this process's sessions
+    cohort.load_results(store)
+    sketch.load(store)
+    atexit.register(sketch.save, store)
+    return store
+
+
+@st.cache_resource
+def results_writer():
+    """The process-wide write-behind queue, or None when persistence is off."""
+    store = results_store()
+    if store is None:
+        return None
+    # Sketches are saved with every batch, so a crash can't leave them behind the stored results
+    return WriteBehindQueue(store, on_batch=functools.partial(sketch.save, store)).start()
+
+
+@st.cache_resource
+def session_memory():
+    store = results_store()
+    if store is None:
+        # Offloaded sessions still need somewhere to go when results aren't stored
+        store = ResultsStore(os.path.join(tempfile.gettempdir(), f"bias_simulator_sessions_{os.getpid()}.db"))
+    return SessionMemoryManager(store, configured_budget_bytes(), configured_idle_seconds())
+
+
+@st.cache_resource
+def chart_pool():
+    return ChartPool(configured_workers(), configured_timeout())
+
+
+@st.cache_data
+@tracing.traced("chart.render")
+def cached_chart(name, *args, _background=False):
+    """
+    A chart whose plot data is hashable (counts, a response), rendered once
+    per distinct data. _background renders it at low priority (see
+    ChartPool.render) and, like every underscored argument, isn't part of
+    the cache key.
+    """
+    return chart_pool().render(name, *args, background=_background)
+
+
+@st.cache_resource
+def session_cpu():
+    return SessionCpuTracker(configured_slow_rerun_seconds())
+
+
+def session_id():
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    return st.session_state.session_id
+
+
+def persist_result(bias, result):
+    """Queue a completed result for storage without waiting on the database."""
+    writer = results_writer()
+    if writer is not None:
+        writer.put(session_id(), bias, result)
+
+
+def results_table(name, results, format_row=None, include=None):
+    """This session's results table called name, brought up to date with the results list."""
+    if "results_tables" not in st.session_state:
+        st.session_state.results_tables = {}
+    tables = st.session_state.results_tables
+    if name not in tables:
+        tables[name] = ResultsTable(format_row, include)
+    return tables[name].sync(results)
+
+
+def _session_state_objects():
+    """
+    (locked state, owner) of the running session, or (None, None).
+
+    st.session_state is a proxy that resolves to whichever session is
+    running; the memory manager needs this session's own objects so it can
+    offload it later from another session's rerun. Reads and writes go
+    through the run's SafeSessionState, which holds the lock the session's
+    script thread uses; its SessionState identifies the session.
+    """
+    ctx = get_script_run_ctx() if get_script_run_ctx is not None else None
+    state = getattr(ctx, "session_state", None)
+    return state, getattr(state, "_state", None)
+
+
+def track_session():
+    """Report this rerun to the memory manager, reloading offloaded state if needed."""
+    state, owner = _session_state_objects()
+    if owner is not None:
+        session_memory().touch(session_id(), state, owner)
+
+
+def reload_session():
+    """Restore this session's offloaded state, if any, without a full touch()."""
+    state, owner = _session_state_objects()
+    if owner is not None:
+        session_memory().reload(session_id(), state, owner)
+
+
+def session_counts():
+    """Sizes of the session's completed work, recorded on each rerun's trace."""
+    wason_session = st.session_state.get("wason_session")
+    return {
+        "anchoring_results": len(st.session_state.get("results", ())),
+        "framing_results": len(st.session_state.get("framing_results", ())),
+        "evidence_ratings": len(st.session_state.get("evidence_ratings", ())),
+        "wason_tests": len(wason_session) if wason_session is not None else 0
+    }
+
+
+def session_sizes():
+    """Result counts and approximate bytes of the session's completed work, logged for slow reruns."""
+    return dict(session_counts(), state_bytes=SessionMemoryManager.measure(st.session_state))
+
+
+def _run_main(main, stage):
+    store = profile_store()
+    if store.profile_all or query_param("profile") == "1":
+        return store.profile(stage, main)
+    return main()
+
+
+# Set on the script thread while a full rerun runs, so fragments drawn as
+# part of it aren't measured a second time
+_full_rerun = threading.local()
+
+
+def _run_measured(span_name, main, stage, profile_stage, **attributes):
+    configure_tracing()
+    with tracing.span(span_name, session_id=session_id(), stage=stage,
+                      bias_type=st.session_state.get("bias_type"), **attributes) as span:
+        try:
+            return session_cpu().measure(session_id(), stage, lambda: _run_main(main, profile_stage),
+                                         describe=session_sizes)
+        finally:
+            if tracing.enabled():
+                span.set(**session_counts())
+
+
+def run_rerun(main):
+    """
+    Run one rerun of the app and charge its CPU time to the session.
+
+    The rerun runs under the profiler when this session asked for it with
+    ?profile=1 or an admin turned profiling on for everyone, and in a
+    trace span when tracing is on. Fragment reruns (see fragment()) get
+    the same treatment, profiled as <stage>.<fragment name>.
+    """
+    stage = st.session_state.get("stage", "intro")
+    _full_rerun.active = True
+    try:
+        _run_measured("rerun", main, stage, stage)
+    finally:
+        _full_rerun.active = False
+
+
+def run_stage_view(view):
+    """
+    Show the current stage's page in its own trace span, logging the
+    memory it retains when allocation tracking is on.
+    """
+    tracker = allocation_tracker()
+    with tracing.span(view.__name__, stage=st.session_state.stage):
+        if tracker is None:
+            view()
+        else:
+            tracker.track(view.__name__, view)
+
+
+def show_chart(name, *args, cached=False):
+    """Show a chart from charts.FIGURES, rendered in the chart pool; cached uses cached_chart."""
+    try:
+        if cached:
+            png = cached_chart(name, *args)
+        else:
+            with tracing.span("chart.render", chart=name):
+                png = chart_pool().render(name, *args)
+    except ChartTimeout:
+        st.info("This chart is taking longer than usual to draw and will be shown the next time the page updates.")
+        return
+    if png is not None:
+        st.image(png)
+
+
+def show_cohort_percentile(key, value, description):
+    """Show where a participant's value falls among everyone's results for the same cohort."""
+    rank = cohort.percentile(key, value)
+    if rank is None:
+        st.caption("Not enough participants yet to compare your result with others.")
+        return
+    percentile, size = rank
+    st.markdown(f"Your {description} is higher than **{percentile:.0f}%** of {size:,} results from all participants.")
+    st.progress(min(int(round(percentile)), 100))
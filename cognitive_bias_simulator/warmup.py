@@ -0,0 +1,152 @@
+"""
+Warm-up for a freshly started server.
+
+The first participant after a deploy would otherwise pay for importing
+the plotting stack, building the catalog lookups, loading fonts and
+rendering the first charts. Each step here does that work up front and
+is timed; a step that fails is recorded in failures and the rest still
+run:
+
+    python warmup.py            # all steps, e.g. as a deploy readiness check
+    python warmup.py catalogs   # selected steps
+
+The Streamlit app runs SERVER_STEPS on a background thread once per
+server process (see ui_helpers.warm_up_server); fonts are loaded by the
+chart workers that draw with them (see chart_pool.start_worker). The
+JSON API runs the catalog step on startup and reports it from GET /ready.
+"""
+import importlib
+import sys
+import threading
+import time
+
+MODULES = (
+    "numpy", "pandas", "matplotlib.pyplot", "seaborn",
+    "core.catalogs", "core.anchoring", "core.anchor_design", "core.confirmation", "core.framing",
+    "core.wason", "core.flow", "core.cohort", "core.sketch", "content",
+    "charts", "anchoring_bias", "confirmation_bias", "framing_effect"
+)
+
+# Step name -> seconds it took in the last run
+report = {}
+# Step name -> error, for the steps that failed in the last run
+failures = {}
+ready = threading.Event()
+_lock = threading.Lock()
+
+
+def import_modules():
+    import matplotlib
+
+    # The server renders to PNG bytes, never to a window
+    matplotlib.use("Agg")
+    for name in MODULES:
+        importlib.import_module(name)
+
+
+def compile_catalogs():
+    # Importing the catalogs builds tasks_dict, scenarios_dict and the framing lookups
+    from core import anchor_design, confirmation
+    from core.catalogs import scenarios, tasks
+
+    for task in tasks:
+        anchor_design.design_table(task["actual_value"])
+    for scenario in scenarios:
+        confirmation.get_shuffled_evidence(scenario["id"])
+        for stance in scenario["stance_options"]:
+            confirmation.get_evidence_types(scenario["id"], stance)
+
+
+def prime_fonts():
+    import matplotlib
+    import matplotlib.pyplot as plt
+    from matplotlib import font_manager
+
+    # Loads (or builds) the font list and the default font's glyph cache
+    font_manager.findfont(font_manager.FontProperties(family=matplotlib.rcParams["font.family"]))
+    fig, ax = plt.subplots()
+    ax.set_title("Warm-up 0123456789 %")
+    fig.canvas.draw()
+    plt.close(fig)
+
+
+def render_static_charts():
+    """
+    Render every classical findings chart a participant can be shown into
+    the chart cache, at low priority so participants' own charts go first.
+    """
+    import ui_helpers
+    from chart_pool import ChartTimeout
+    from core.catalogs import frame_types
+
+    charts = [(f"classical_{experiment_type}", frame_type, response)
+              for experiment_type, frames in frame_types.items()
+              for frame_type in frames
+              for response in (("A", "B") if experiment_type == "risk" else range(1, 11))]
+    timed_out = 0
+    for chart in charts:
+        try:
+            ui_helpers.cached_chart(*chart, _background=True)
+        except ChartTimeout:
+            # Left for the first participant who needs it
+            timed_out += 1
+    if timed_out:
+        raise ChartTimeout(f"{timed_out} of {len(charts)} charts timed out")
+
+
+STEPS = {
+    "modules": import_modules,
+    "catalogs": compile_catalogs,
+    "fonts": prime_fonts,
+    "charts": render_static_charts
+}
+
+# The server process never draws charts itself, so it leaves fonts to the chart workers
+SERVER_STEPS = ("modules", "catalogs", "charts")
+
+
+def run(steps=tuple(STEPS)):
+    """
+    Run the given steps in order and return how long each took, in
+    seconds. A step that raises is recorded in failures; `ready` is set
+    once every step has run, whether or not they all succeeded.
+    """
+    with _lock:
+        failures.clear()
+        start = time.perf_counter()
+        try:
+            for name in steps:
+                step_start = time.perf_counter()
+                try:
+                    STEPS[name]()
+                except Exception as e:
+                    failures[name] = f"{type(e).__name__}: {e}"
+                report[name] = time.perf_counter() - step_start
+            report["total"] = time.perf_counter() - start
+        finally:
+            ready.set()
+        return dict(report)
+
+
+def start(steps=tuple(STEPS)):
+    """Run the steps on a daemon thread, so serving isn't held up; `ready` is set when they finish."""
+    thread = threading.Thread(target=run, args=(steps,), name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def main(argv=None):
+    steps = (argv if argv is not None else sys.argv[1:]) or tuple(STEPS)
+    unknown = [name for name in steps if name not in STEPS]
+    if unknown:
+        sys.exit(f"Unknown warm-up steps: {', '.join(unknown)} (choose from {', '.join(STEPS)})")
+    for name, seconds in run(steps).items():
+        print(f"{name:<10} {seconds * 1000:8.1f} ms")
+    for name, error in failures.items():
+        print(f"{name} failed: {error}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()